@@ -0,0 +1,61 @@
+# Sepehr Vahedi
+# 99170615
+
+# Seconds to parse one program with the table-driven `Parser.parse`, with and without its parse tree, and with the
+# `GeneratedParser` that grammar_compiler.py writes. Each parser runs with the real code generator and with one that
+# does nothing, which leaves the cost of parsing alone.
+
+import argparse
+
+from workload import program, import_tree, add_tree_argument, best_time
+
+argument_parser = argparse.ArgumentParser(description='table-driven parser against the generated parser')
+add_tree_argument(argument_parser)
+argument_parser.add_argument('--size', type=int, default=33_000, help='characters in the generated program')
+argument_parser.add_argument('--repeat', type=int, default=3, help='runs, of which the fastest counts')
+arguments = argument_parser.parse_args()
+import_tree(arguments.tree)
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from parser import Parser
+from generated_parser import GeneratedParser
+from intermediate_code_generator.expression_processor import CodeGenerator
+
+
+class NullCodeGenerator:
+    is_erroneous = False
+
+    def code_gen(self, action_symbol, current_token):
+        pass
+
+    def semantic_check(self, check_symbol, current_token):
+        pass
+
+
+parsers = {
+    'Parser.parse, parse tree': lambda lexer, generator, diagnostics: Parser(lexer, generator, diagnostics),
+    'Parser.parse, no tree': lambda lexer, generator, diagnostics: Parser(lexer, generator, diagnostics,
+                                                                          build_tree=False),
+    'GeneratedParser': GeneratedParser,
+}
+code_generators = {
+    'with code generation': lambda symbol_table, diagnostics: CodeGenerator(symbol_table, diagnostics),
+    'parse only': lambda symbol_table, diagnostics: NullCodeGenerator(),
+}
+
+
+def parse(make_parser, make_code_generator, text):
+    symbol_table, diagnostics = SymbolTable(), Diagnostics(buffered=True)
+    lexer = Lexer(text, symbol_table, retain_tokens=False, diagnostics=diagnostics)
+    make_parser(lexer, make_code_generator(symbol_table, diagnostics), diagnostics).parse()
+    return diagnostics.count()
+
+
+text = program(arguments.size)
+for parser_name, make_parser in parsers.items():
+    for generator_name, make_code_generator in code_generators.items():
+        elapsed, error_count = best_time(lambda: parse(make_parser, make_code_generator, text), arguments.repeat)
+        assert error_count == 0
+        print(f'{parser_name:25} {generator_name:21} {len(text)} characters: {elapsed:.3f} s')
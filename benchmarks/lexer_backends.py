@@ -0,0 +1,44 @@
+# Sepehr Vahedi
+# 99170615
+
+# Characters per second of the DFA lexer and of the regex master-pattern backend on the same inputs: the generated
+# program as it is, and the program with a long comment in front of every function, where whole comments are skipped
+# by one regex match but still walked character by character by the DFA.
+
+import argparse
+import re
+
+from workload import program, import_tree, add_tree_argument, best_time
+
+argument_parser = argparse.ArgumentParser(description='DFA lexer against the regex backend')
+add_tree_argument(argument_parser)
+argument_parser.add_argument('--size', type=int, default=160_000, help='characters in the generated program')
+argument_parser.add_argument('--repeat', type=int, default=5, help='runs, of which the fastest counts')
+arguments = argument_parser.parse_args()
+import_tree(arguments.tree)
+
+from symbols import SymbolTable
+from lexer import Lexer
+from regex_lexer import RegexLexer
+
+comment = '/* ' + 'documentation of the function that follows, kept as prose. ' * 8 + '*/\n'
+inputs = {
+    'code': program(arguments.size),
+    'commented code': re.sub(r'^(int|void) (?=\w+\()', lambda match: comment + match.group(), program(arguments.size),
+                             flags=re.MULTILINE),
+}
+
+
+def lex(backend, text):
+    lexer = backend(text, SymbolTable(), retain_tokens=False)
+    count = 0
+    while lexer.get_next_token().type != 'END':
+        count += 1
+    return count
+
+
+for name, text in inputs.items():
+    for backend in (Lexer, RegexLexer):
+        elapsed, token_count = best_time(lambda: lex(backend, text), arguments.repeat)
+        print(f'{name:15} {backend.__name__:10} {len(text)} characters, {token_count} tokens: {elapsed:.3f} s, '
+              f'{len(text) / elapsed:,.0f} chars/s')
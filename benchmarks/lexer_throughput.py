@@ -0,0 +1,33 @@
+# Sepehr Vahedi
+# 99170615
+
+# Characters per second of the DFA lexer over a generated program, from the first token to END. Run it once on this
+# tree and once with --tree on a checkout of the commit before the table-driven lexer to compare the two.
+
+import argparse
+
+from workload import program, import_tree, add_tree_argument, best_time
+
+argument_parser = argparse.ArgumentParser(description='DFA lexer throughput')
+add_tree_argument(argument_parser)
+argument_parser.add_argument('--size', type=int, default=160_000, help='characters in the generated program')
+argument_parser.add_argument('--repeat', type=int, default=5, help='runs, of which the fastest counts')
+arguments = argument_parser.parse_args()
+import_tree(arguments.tree)
+
+from symbols import SymbolTable
+from lexer import Lexer
+
+text = program(arguments.size)
+
+
+def lex():
+    lexer = Lexer(text, SymbolTable())
+    count = 0
+    while lexer.get_next_token().type != 'END':
+        count += 1
+    return count
+
+
+elapsed, token_count = best_time(lex, arguments.repeat)
+print(f'{len(text)} characters, {token_count} tokens: {elapsed:.3f} s, {len(text) / elapsed:,.0f} chars/s')
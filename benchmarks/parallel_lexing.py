@@ -0,0 +1,32 @@
+# Sepehr Vahedi
+# 99170615
+
+# Time to lex a generated program serially and with `lex_parallel` on 1, 2, 4 and 8 workers, forced to run in
+# parallel, and with the default that falls back to serial lexing when parallel lexing cannot pay off. Scaling needs
+# as many cores as workers; `os.cpu_count()` is printed with the results.
+
+import argparse
+import os
+
+from workload import program, import_tree, add_tree_argument, best_time
+
+argument_parser = argparse.ArgumentParser(description='parallel lexer scaling')
+add_tree_argument(argument_parser)
+argument_parser.add_argument('--size', type=int, default=2_000_000, help='characters in the generated program')
+argument_parser.add_argument('--repeat', type=int, default=1, help='runs, of which the fastest counts')
+argument_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='worker counts to try')
+arguments = argument_parser.parse_args()
+import_tree(arguments.tree)
+
+from parallel_lexer import lex_parallel, lex_serial
+
+if __name__ == '__main__':
+    text = program(arguments.size)
+    print(f'{len(text)} characters, {os.cpu_count()} CPUs')
+    elapsed, tokens = best_time(lambda: lex_serial(text), arguments.repeat)
+    print(f'serial Lexer         {elapsed:7.2f} s, {len(tokens)} tokens')
+    for workers in arguments.workers:
+        elapsed, tokens = best_time(lambda: lex_parallel(text, workers, always_parallel=True), arguments.repeat)
+        print(f'{workers} workers, forced  {elapsed:7.2f} s, {len(tokens)} tokens')
+        elapsed, tokens = best_time(lambda: lex_parallel(text, workers), arguments.repeat)
+        print(f'{workers} workers, default {elapsed:7.2f} s, {len(tokens)} tokens')
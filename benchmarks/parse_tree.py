@@ -0,0 +1,84 @@
+# Sepehr Vahedi
+# 99170615
+
+# Cost of the parse tree `Parser.parse` records: the seconds to parse with and without it, the memory it keeps
+# (tracemalloc, after parsing), and the seconds to render it in the layout of anytree's `RenderTree`. Trees before
+# parse_tree.py only have the anytree nodes at `Parser.node`; later ones keep a `ParseTreeArena` at `Parser.tree`,
+# which renders itself, and convert it to anytree nodes when `Parser.node` is asked for.
+
+import argparse
+import io
+import tracemalloc
+
+from workload import program, import_tree, add_tree_argument, best_time
+
+argument_parser = argparse.ArgumentParser(description='parse tree time and memory')
+add_tree_argument(argument_parser)
+argument_parser.add_argument('--size', type=int, default=33_000, help='characters in the generated program')
+argument_parser.add_argument('--repeat', type=int, default=3, help='runs, of which the fastest counts')
+arguments = argument_parser.parse_args()
+import_tree(arguments.tree)
+
+from anytree import RenderTree
+
+from symbols import SymbolTable
+from lexer import Lexer
+from parser import Parser
+
+
+class NullCodeGenerator:
+    is_erroneous = False
+
+    def code_gen(self, action_symbol, current_token):
+        pass
+
+    def semantic_check(self, check_symbol, current_token):
+        pass
+
+
+def parse(build_tree):
+    parser = Parser(Lexer(text, SymbolTable(), retain_tokens=False), NullCodeGenerator(), build_tree=build_tree)
+    parser.parse()
+    return parser
+
+
+def retained(build_tree):
+    tracemalloc.start()
+    parser = parse(build_tree)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del parser
+    return size
+
+
+def render_anytree(parser):
+    file = io.StringIO()
+    file.writelines(f'{prefix}{node.name}\n' for prefix, _, node in RenderTree(parser.node))
+    return file
+
+
+def render_arena(parser):
+    file = io.StringIO()
+    parser.tree.write(file)
+    return file
+
+
+text = program(arguments.size)
+print(f'{len(text)} characters')
+for build_tree in (False, True):
+    elapsed, _ = best_time(lambda: parse(build_tree), arguments.repeat)
+    print(f'parse {"with" if build_tree else "without"} tree: {elapsed:.3f} s')
+print(f'tree memory: {(retained(True) - retained(False)) / 2 ** 20:.1f} MiB')
+
+parser = parse(True)
+renderings = {'anytree RenderTree': render_anytree}
+if hasattr(getattr(parser, 'tree', None), 'write'):
+    renderings['ParseTreeArena.write'] = render_arena
+    elapsed, _ = best_time(lambda: parser.tree.to_anytree(), arguments.repeat)
+    print(f'convert to anytree: {elapsed:.3f} s')
+outputs = []
+for name, render in renderings.items():
+    elapsed, file = best_time(lambda: render(parser), arguments.repeat)
+    outputs.append(file.getvalue())
+    print(f'render with {name}: {elapsed:.3f} s, {len(outputs[-1].splitlines())} lines')
+assert all(output == outputs[0] for output in outputs)
@@ -0,0 +1,78 @@
+# Sepehr Vahedi
+# 99170615
+
+# Per-token cost of the table parser's lookahead, and of the whole parse loop with no parse tree and a code generator
+# that does nothing. The lookahead is timed over the same tokens two ways: the terminal code the lexer puts on each
+# token, and the derivation `Parser.__get_token` did before, from the token's type and lexeme through
+# `terminal_codes`. The tokens are lexed beforehand and replayed, so lexing is left out. Only the parse loop depends
+# on `--tree`.
+
+import argparse
+
+from workload import program, import_tree, add_tree_argument, best_time
+
+argument_parser = argparse.ArgumentParser(description='per-token lookahead cost of the table parser')
+add_tree_argument(argument_parser)
+argument_parser.add_argument('--size', type=int, default=110_000, help='characters in the generated program')
+argument_parser.add_argument('--repeat', type=int, default=7, help='runs, of which the fastest counts')
+arguments = argument_parser.parse_args()
+import_tree(arguments.tree)
+
+from symbols import SymbolTable
+from lexer import Lexer
+from parser import Parser
+
+
+class NullCodeGenerator:
+    is_erroneous = False
+
+    def code_gen(self, action_symbol, current_token):
+        pass
+
+    def semantic_check(self, check_symbol, current_token):
+        pass
+
+
+class ReplayLexer:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.index = -1
+
+    def get_next_token(self):
+        self.index = min(self.index + 1, len(self.tokens) - 1)
+        return self.tokens[self.index]
+
+
+def no_lookahead(tokens):
+    for token in tokens:
+        pass
+
+
+def derived_lookahead(tokens):
+    for token in tokens:
+        lookahead = terminal_codes.get(token.lexeme if token.type in ['KEYWORD', 'SYMBOL', 'END'] else token.type)
+
+
+def stored_lookahead(tokens):
+    for token in tokens:
+        lookahead = token.terminal_code
+
+
+def parse(tokens):
+    Parser(ReplayLexer(tokens), NullCodeGenerator(), build_tree=False).parse()
+
+
+lexer = Lexer(program(arguments.size), SymbolTable(), retain_tokens=False)
+tokens = [lexer.get_next_token()]
+while tokens[-1].type != 'END':
+    tokens.append(lexer.get_next_token())
+
+print(f'{len(tokens)} tokens')
+if hasattr(tokens[0], 'terminal_code'):
+    from symbols import terminal_codes
+    for name, lookahead in [('loop alone', no_lookahead), ('derived from type and lexeme', derived_lookahead),
+                            ('terminal_code', stored_lookahead)]:
+        elapsed, _ = best_time(lambda: lookahead(tokens), arguments.repeat * 5)
+        print(f'lookahead, {name}: {elapsed / len(tokens) * 1e9:.0f} ns/token')
+parse_time, _ = best_time(lambda: parse(tokens), arguments.repeat)
+print(f'parse loop: {parse_time / len(tokens) * 1e6:.2f} us/token')
@@ -0,0 +1,107 @@
+# Sepehr Vahedi
+# 99170615
+
+# Throughput of semantic actions: the action and check symbols the parser sends to the code generator for one
+# program are recorded once, together with the tokens it consumes in between, and then replayed into a fresh
+# `CodeGenerator`. Each consumed token is offered to the symbol table as the lexer does, so declarations land where
+# they would in a real run. Parsing and lexing are left out of the time. The script also times writing the code as
+# text and measures the memory the code generator keeps once it is done (tracemalloc). With `--no-interning` every
+# operand is made anew instead of being shared, in trees that keep the code as instructions.Instruction objects.
+
+import argparse
+import hashlib
+import tracemalloc
+
+from workload import program, import_tree, add_tree_argument, best_time
+
+argument_parser = argparse.ArgumentParser(description='semantic action throughput of the code generator')
+add_tree_argument(argument_parser)
+argument_parser.add_argument('--size', type=int, default=110_000, help='characters in the generated program')
+argument_parser.add_argument('--repeat', type=int, default=5, help='runs, of which the fastest counts')
+argument_parser.add_argument('--no-interning', action='store_true',
+                             help='make a new operand every time one is asked for')
+arguments = argument_parser.parse_args()
+import_tree(arguments.tree)
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from parser import Parser
+from intermediate_code_generator.expression_processor import CodeGenerator
+
+token_event, action_event, check_event = range(3)
+
+
+class NotInterned(dict):
+    # An operand table that never keeps what is put in it, so every lookup misses.
+    def __setitem__(self, key, value):
+        pass
+
+
+if arguments.no_interning:
+    from intermediate_code_generator import instructions
+    for table in (instructions.direct_operands, instructions.immediate_operands, instructions.indirect_operands):
+        table.clear()
+    instructions.direct_operands = NotInterned()
+    instructions.immediate_operands = NotInterned()
+    instructions.indirect_operands = NotInterned()
+
+
+class RecordingLexer:
+    def __init__(self, lexer, events):
+        self.lexer = lexer
+        self.events = events
+
+    def get_next_token(self):
+        token = self.lexer.get_next_token()
+        self.events.append((token_event, None, token))
+        return token
+
+
+class RecordingCodeGenerator:
+    is_erroneous = False
+
+    def __init__(self, events):
+        self.events = events
+
+    def code_gen(self, action_symbol, current_token):
+        self.events.append((action_event, action_symbol, current_token))
+
+    def semantic_check(self, check_symbol, current_token):
+        self.events.append((check_event, check_symbol, current_token))
+
+
+def replay(events):
+    symbol_table = SymbolTable()
+    code_generator = CodeGenerator(symbol_table, Diagnostics(buffered=True))
+    handlers = (lambda symbol, token: symbol_table.add_to_symbol_table(token.type, token.lexeme),
+                code_generator.code_gen, code_generator.semantic_check)
+    for kind, symbol, token in events:
+        handlers[kind](symbol, token)
+    return code_generator
+
+
+events = []
+lexer = RecordingLexer(Lexer(program(arguments.size), SymbolTable(), retain_tokens=False), events)
+Parser(lexer, RecordingCodeGenerator(events), Diagnostics(buffered=True), build_tree=False).parse()
+symbol_count = sum(kind != token_event for kind, _, _ in events)
+
+
+
+def retained():
+    tracemalloc.start()
+    code_generator = replay(events)
+    code_generator.program_block
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+elapsed, code_generator = best_time(lambda: replay(events), arguments.repeat)
+program_block = code_generator.program_block
+write_time, code = best_time(lambda: '\n'.join(str(instruction) for instruction in program_block), arguments.repeat)
+print(f'{symbol_count} action and check symbols, {len(program_block)} instructions: {elapsed:.3f} s, '
+      f'{elapsed / symbol_count * 1e6:.2f} us/symbol')
+print(f'written as text in {write_time:.3f} s')
+print(f'code generator memory {retained() / 2 ** 20:.1f} MiB')
+print(f'code digest {hashlib.md5(code.encode()).hexdigest()}')
@@ -0,0 +1,72 @@
+# Sepehr Vahedi
+# 99170615
+
+# Memory taken by a lexed stream of about a million tokens, kept three ways: a list of Token objects with a __dict__
+# (as before token_store.py), a list of __slots__ Token objects, and a TokenStore. Measured with tracemalloc as the
+# memory still allocated once lexing is done, so the lexeme strings each Token object holds count towards it.
+
+import argparse
+import tracemalloc
+
+from workload import program, import_tree, add_tree_argument
+
+argument_parser = argparse.ArgumentParser(description='memory of retained tokens')
+add_tree_argument(argument_parser)
+argument_parser.add_argument('--tokens', type=int, default=1_000_000, help='tokens in the generated program, about')
+arguments = argument_parser.parse_args()
+import_tree(arguments.tree)
+
+from symbols import SymbolTable
+from lexer import Lexer
+
+# The generated program has one token per 2.94 characters.
+text = program(int(arguments.tokens * 2.94))
+
+
+class DictToken:
+    def __init__(self, value, token_type, line_number, offset, column, terminal_code):
+        self.lexeme = value
+        self.type = token_type
+        self.line_number = line_number
+        self.offset = offset
+        self.column = column
+        self.terminal_code = terminal_code
+
+
+def as_dict_tokens(token):
+    return DictToken(token.lexeme, token.type, token.line_number, token.offset, token.column, token.terminal_code)
+
+
+def retained(convert):
+    # Memory left allocated by lexing the text into a list of `convert(token)`, or into the lexer's TokenStore when
+    # `convert` is None, and what is kept.
+    tracemalloc.start()
+    lexer = Lexer(text, SymbolTable(), retain_tokens=convert is None)
+    tokens = []
+    while True:
+        token = lexer.get_next_token()
+        if convert is not None:
+            tokens.append(convert(token))
+        if token.type == 'END':
+            break
+    kept = lexer.tokens if convert is None else tokens
+    del lexer, token
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, kept
+
+
+results = {'list of dict-based Token objects': retained(as_dict_tokens),
+           'list of __slots__ Token objects': retained(lambda token: token),
+           'TokenStore': retained(None)}
+baseline = results['list of dict-based Token objects'][0]
+for name, (size, kept) in results.items():
+    print(f'{name:34} {size / len(kept):6.1f} B/token ({size / 2 ** 20:6.1f} MiB, {len(kept)} tokens), '
+          f'{baseline / size:.1f}x smaller than dict-based')
+
+# What a TokenStore row is made of; the rest of its memory is the arrays' room to grow, the line starts and the
+# interned lexemes.
+store = results['TokenStore'][1]
+row_columns = [store.type_codes, store.offsets, store.lexeme_ids, store.line_numbers, store.terminal_codes]
+print(f'TokenStore row: {sum(column.itemsize for column in row_columns)} B, '
+      f'{len(store.line_starts)} line starts, {len(store.lexemes)} lexemes')
@@ -0,0 +1,67 @@
+# Sepehr Vahedi
+# 99170615
+
+import os
+import sys
+import time
+
+repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One unit of the benchmark program: a recursive function, a loop over an array with a comment in it and a function
+# that fills the array. Every unit gets its own names, so the program stays valid C-minus however many units it has.
+unit = '''int g{index};
+int fact{index}(int n) {{
+    if (n < 2) {{ return 1; }} else {{ return n * fact{index}(n - 1); }} endif
+}}
+int sum{index}(int a[], int n) {{
+    int k; int s;
+    k = 0; s = 0;
+    /* adds up the first n cells */
+    while (k < n) {{ s = s + a[k]; k = k + 1; }}
+    return s;
+}}
+void fill{index}(int a[], int n) {{
+    int k;
+    k = 0;
+    while (k < n) {{ a[k] = k * k + g{index}; k = k + 1; }} // squares
+}}
+'''
+main = '''void main(void) {
+    int cells[10];
+    fill0(cells, 10);
+    output(sum0(cells, 10) + fact0(5));
+}
+'''
+
+
+def program(size):
+    # A valid program of at least `size` characters.
+    units = []
+    length = len(main)
+    while length < size:
+        units.append(unit.format(index=len(units)))
+        length += len(units[-1])
+    return ''.join(units) + main
+
+
+def import_tree(tree):
+    # Makes the modules of `tree` the ones that get imported, so that a checkout of an older commit (e.g. a
+    # `git worktree`) can be measured with the same script.
+    sys.path.insert(0, os.path.abspath(tree))
+
+
+def add_tree_argument(argument_parser):
+    argument_parser.add_argument('--tree', default=repository,
+                                 help='checkout whose modules are measured, e.g. a git worktree of an older commit')
+
+
+def best_time(function, repeat):
+    # The fastest of `repeat` runs, in seconds, and what the last run returned.
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
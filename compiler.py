@@ -1,21 +1,28 @@
 # Sepehr Vahedi
 # 99170615
 
+import argparse
+import sys
+from functools import partial
+
 from symbols import SymbolTable
+from diagnostics import Diagnostics, OutputFormats, TooManyErrors
 from lexer import Lexer
-from parser import Parser
+from regex_lexer import RegexLexer
+from parser import Parser, RecoveryModes
+from generated_parser import GeneratedParser
 from intermediate_code_generator.expression_processor import CodeGenerator
-
-def read_code(address):
-    with open(address) as file:
-        input_text = file.read()
-    return input_text
-
+from intermediate_code_generator.ast_builder import AstBuilder
+from intermediate_code_generator.ast_lowering import AstLowering
+from optimizer.constants import propagate_constants
+from optimizer.deadcode import remove_dead_code
+from optimizer.peephole import peephole
+from optimizer.temporaries import TemporaryAllocator, temporary_cell_count
+from intermediate_code_generator.instructions import stack_pointer
 
 def write_intermediate(codes):
-    text = ''
-    for i, code in enumerate(codes):
-        text += f'{i}\t{code}\n'
+    # Instructions are only turned into text here; a jump that was never backpatched is written as an empty line.
+    text = ''.join([f'{i}\t{"" if code is None else code}\n' for i, code in enumerate(codes)])
     if not text:
         text = 'The output code has not been generated.\n'
 
@@ -23,13 +30,79 @@ def write_intermediate(codes):
         file.write(text)
 
 
-input_text = read_code('input.txt')
+lexer_backends = {'dfa': Lexer, 'regex': RegexLexer}
+# The compiler never looks at the parse tree, so the table-driven parser runs without building one.
+parser_backends = {'table': partial(Parser, build_tree=False), 'generated': GeneratedParser}
+temporary_allocator = TemporaryAllocator()
+optimization_levels = {0: [], 1: [propagate_constants, remove_dead_code, peephole, temporary_allocator.allocate]}
+
+argument_parser = argparse.ArgumentParser(description='C-minus compiler')
+argument_parser.add_argument('--lexer', choices=lexer_backends, default='dfa',
+                             help='lexer backend used to tokenize input.txt; regex is faster on heavily commented '
+                                  'code')
+argument_parser.add_argument('--parser', choices=parser_backends, default='table',
+                             help='table-driven parser or the recursive-descent one from grammar_compiler.py')
+argument_parser.add_argument('--diagnostics-format', choices=[output_format.value for output_format in OutputFormats],
+                             default=OutputFormats.TEXT.value, help='format of the error report')
+argument_parser.add_argument('--max-errors', type=int, default=None,
+                             help='stop compiling at the Nth error of any phase; N errors are reported')
+argument_parser.add_argument('--recovery', choices=[mode.value for mode in RecoveryModes],
+                             default=RecoveryModes.TOKEN.value,
+                             help='syntax error recovery of the table-driven parser: drop one token per error, or '
+                                  'skip to a synchronizing token and report one error per region')
+argument_parser.add_argument('--error-budget', type=int, default=None,
+                             help='stop parsing at the Nth syntax error of the table-driven parser; N syntax errors are '
+                                  'reported')
+argument_parser.add_argument('--ast', action='store_true',
+                             help='build a typed AST while parsing and generate code from it afterwards')
+argument_parser.add_argument('-O', dest='optimization_level', type=int, choices=optimization_levels, default=0,
+                             help='optimize the generated code: 0 leaves it as generated, 1 propagates constants, '
+                                  'removes dead code, runs the peephole pass and reuses temporaries')
+argument_parser.add_argument('--report-temporaries', action='store_true',
+                             help='write how many cells the temporaries take to stderr')
+arguments = argument_parser.parse_args()
+if arguments.parser != 'table' and (arguments.recovery != RecoveryModes.TOKEN.value or
+                                   arguments.error_budget is not None):
+    argument_parser.error('--recovery and --error-budget need --parser table')
+parser_options = {}
+if arguments.parser == 'table':
+    parser_options = {'recovery': RecoveryModes(arguments.recovery), 'error_budget': arguments.error_budget}
 
-symbol_table = SymbolTable()
-lexer = Lexer(input_text, symbol_table)
-code_generator = CodeGenerator(symbol_table)
-parser = Parser(lexer, code_generator)
+# Errors of all phases are collected and written in one go once compilation ends.
+diagnostics = Diagnostics(OutputFormats(arguments.diagnostics_format), arguments.max_errors, buffered=True)
+is_stopped = False
+with open('input.txt') as input_file:
+    symbol_table = SymbolTable()
+    lexer = lexer_backends[arguments.lexer](input_file, symbol_table, retain_tokens=False, diagnostics=diagnostics)
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    # With --ast the parser only builds the tree, and code is generated from it once the whole program has parsed.
+    ast_builder = AstBuilder() if arguments.ast else None
+    parser = parser_backends[arguments.parser](lexer, ast_builder or code_generator, diagnostics, **parser_options)
 
-parser.parse()
+    try:
+        parser.parse()
+        if ast_builder:
+            if ast_builder.is_complete:
+                AstLowering(code_generator).lower(ast_builder.program)
+            is_stopped = not ast_builder.is_complete or code_generator.is_erroneous
+    except TooManyErrors:
+        is_stopped = True
+    finally:
+        diagnostics.flush()
 
-write_intermediate(parser.code_generator.program_block)
+# Only code that compiled without errors is optimized; the passes rely on it being whole. Temporaries that ran into
+# the stack are reused whatever the level, as the code would not work otherwise.
+if not is_stopped and diagnostics.count() == 0:
+    optimizations = optimization_levels[arguments.optimization_level]
+    if code_generator.builder.temporary_counter > stack_pointer.value and \
+            temporary_allocator.allocate not in optimizations:
+        optimizations = optimizations + [temporary_allocator.allocate]
+    code_generator.optimize(*optimizations)
+    if arguments.report_temporaries:
+        if temporary_allocator.cells_after is None:
+            print(f'temporary cells: {temporary_cell_count(code_generator.builder.instruction_list)}',
+                  file=sys.stderr)
+        else:
+            print(f'temporary cells: {temporary_allocator.cells_before} before reuse, '
+                  f'{temporary_allocator.cells_after} after', file=sys.stderr)
+write_intermediate([] if is_stopped else code_generator.program_block)
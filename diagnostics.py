@@ -0,0 +1,78 @@
+# Sepehr Vahedi
+# 99170615
+
+import json
+import sys
+from enum import Enum
+
+
+class Phases(Enum):
+    LEXICAL = 'lexical'
+    SYNTAX = 'syntax'
+    SEMANTIC = 'semantic'
+
+
+class OutputFormats(Enum):
+    TEXT = 'text'
+    JSON_LINES = 'jsonl'
+
+
+class Diagnostic:
+    __slots__ = ('phase', 'line_number', 'kind', 'text')
+
+    def __init__(self, phase: Phases, line_number: int, kind: str, text: str = None):
+        self.phase = phase
+        self.line_number = line_number
+        self.kind = kind
+        self.text = text
+
+    def to_text(self):
+        # Same layout as the one-print-per-field reports this replaces; only lexical errors carry dumped text.
+        if self.phase == Phases.LEXICAL:
+            return f'error_line\n{self.line_number}\ndumped_text\n{self.text}\nerror_message\n{self.kind}\n'
+        return f'error_line\n{self.line_number}\nerror_message\n{self.kind}\n'
+
+    def to_json(self):
+        return json.dumps({'phase': self.phase.value, 'line': self.line_number, 'kind': self.kind, 'text': self.text},
+                          ensure_ascii=False) + '\n'
+
+
+class TooManyErrors(Exception):
+    pass
+
+
+class Diagnostics:
+    # Collects the errors of every phase. A buffered instance keeps the records and writes them with a single call
+    # in `flush`; an unbuffered one writes each record as soon as it is reported, which keeps the output in order
+    # with anything else printed meanwhile. Reaching `max_errors` raises TooManyErrors to stop the compilation.
+    def __init__(self, output_format: OutputFormats = OutputFormats.TEXT, max_errors: int = None,
+                 buffered: bool = False, stream=None):
+        self.output_format = output_format
+        self.max_errors = max_errors
+        self.buffered = buffered
+        self.stream = stream
+        self.records = []
+        self.__written = 0
+
+    def report(self, phase: Phases, line_number: int, kind: str, text: str = None):
+        self.records.append(Diagnostic(phase, line_number, kind, text))
+        if not self.buffered:
+            self.flush()
+        if self.max_errors is not None and len(self.records) >= self.max_errors:
+            raise TooManyErrors(f'stopped after {len(self.records)} errors')
+
+    def count(self, phase: Phases = None):
+        if phase is None:
+            return len(self.records)
+        return sum(1 for record in self.records if record.phase == phase)
+
+    def flush(self):
+        records = self.records[self.__written:]
+        if not records:
+            return
+        if self.output_format == OutputFormats.JSON_LINES:
+            text = ''.join(record.to_json() for record in records)
+        else:
+            text = ''.join(record.to_text() for record in records)
+        (self.stream or sys.stdout).write(text)
+        self.__written = len(self.records)
@@ -0,0 +1,952 @@
+# Sepehr Vahedi
+# 99170615
+# Generated by grammar_compiler.py from the grammar in parser.py; do not edit by hand.
+
+from symbols import ActionSymbols, CheckSymbols
+from diagnostics import Diagnostics, Phases
+from lexer import Lexer
+from intermediate_code_generator.expression_processor import CodeGenerator
+
+grammar_fingerprint = '8cad82b4e641df202aa894ff9029d3315f27c23a3982ade24e74e45db632361f'
+terminal_contents = ('NUM', 'ID', 'if', 'else', 'endif', 'void', 'int', 'while', 'break', 'return', ';', ':', ',', '[', ']', '(', ')', '{', '}', '+', '-', '*', '=', '<', '==', '/', 'epsilon', '$')
+
+
+class UnexpectedEOF(Exception):
+    pass
+
+
+class GeneratedParser:
+    # Recursive-descent version of `Parser.parse` over the same LL(1) table. It reports the same errors, recovers
+    # from them the same way and calls the code generator in the same order, but does not build a parse tree.
+    def __init__(self, lexer: Lexer, code_generator: CodeGenerator, diagnostics: Diagnostics = None):
+        self.lexer = lexer
+        self.code_generator = code_generator
+        self.diagnostics = diagnostics or Diagnostics()
+        self.code_gen = code_generator.code_gen
+        self.semantic_check = code_generator.semantic_check
+        self.token = None
+        self.lookahead = None
+
+    def advance(self):
+        self.token = self.lexer.get_next_token()
+        self.lookahead = self.token.terminal_code
+
+    def match(self, terminal):
+        if self.lookahead == terminal:
+            self.advance()
+        else:
+            self.report_error(f'missing {terminal_contents[terminal]}')
+
+    def report_error(self, message):
+        self.diagnostics.report(Phases.SYNTAX, self.token.line_number, message)
+
+    def parse(self):
+        self.advance()
+        try:
+            self.parse_program()
+        except UnexpectedEOF:
+            pass
+        if self.code_generator.is_erroneous:
+            self.code_generator.discard_code()
+
+    def parse_program(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (5, 6):  # void int
+                self.parse_declaration_list()
+                self.code_gen(ActionSymbols.END_OF_PROGRAM, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('missing Program')
+                return
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_declaration_list(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 7, 8, 9, 10, 15, 17, 18, 19, 20, 27):  # NUM ID if while break return ; ( { } + - $
+                return
+            elif lookahead in (5, 6):  # void int
+                self.parse_declaration()
+                continue
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_declaration(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 7, 8, 9, 10, 15, 17, 18, 19, 20, 27):  # NUM ID if while break return ; ( { } + - $
+                self.report_error('missing Declaration')
+                return
+            elif lookahead in (5, 6):  # void int
+                self.parse_declaration_initial()
+                self.parse_declaration_prime()
+                return
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_declaration_initial(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (5, 6):  # void int
+                self.code_gen(ActionSymbols.SET_DECLARING, self.token)
+                self.code_gen(ActionSymbols.PUSH, self.token)
+                self.parse_type_specifier()
+                self.code_gen(ActionSymbols.UPDATE_TYPE, self.token)
+                self.match(1)
+                return
+            elif lookahead in (10, 12, 13, 15, 16):  # ; , [ ( )
+                self.report_error('missing DeclarationInitial')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_declaration_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 5, 6, 7, 8, 9, 17, 18, 19, 20, 27):  # NUM ID if void int while break return { } + - $
+                self.report_error('missing DeclarationPrime')
+                return
+            elif lookahead in (10, 13):  # ; [
+                self.parse_var_declaration_prime()
+                return
+            elif lookahead == 15:  # (
+                self.parse_fun_declaration_prime()
+                return
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_var_declaration_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 5, 6, 7, 8, 9, 15, 17, 18, 19, 20, 27):  # NUM ID if void int while break return ( { } + - $
+                self.report_error('missing VarDeclarationPrime')
+                return
+            elif lookahead == 10:  # ;
+                self.code_gen(ActionSymbols.UPDATE_VAR_ATTRIBUTES, self.token)
+                self.semantic_check(CheckSymbols.VAR_ARR_IS_INT, self.token)
+                self.advance()
+                return
+            elif lookahead == 13:  # [
+                self.advance()
+                self.code_gen(ActionSymbols.UPDATE_ARR_ATTRIBUTES, self.token)
+                self.semantic_check(CheckSymbols.VAR_ARR_IS_INT, self.token)
+                self.match(0)
+                self.match(14)
+                self.match(10)
+                return
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_fun_declaration_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 5, 6, 7, 8, 9, 10, 17, 18, 19, 20, 27):  # NUM ID if void int while break return ; { } + - $
+                self.report_error('missing FunDeclarationPrime')
+                return
+            elif lookahead == 15:  # (
+                self.code_gen(ActionSymbols.START_FUNCTION, self.token)
+                self.advance()
+                self.parse_params()
+                self.match(16)
+                self.code_gen(ActionSymbols.UPDATE_FUNC_ATTRIBUTES, self.token)
+                self.parse_compound_stmt()
+                self.code_gen(ActionSymbols.RETURN_AT_THE_END_OF_FUNCTION, self.token)
+                self.code_gen(ActionSymbols.END_SCOPE, self.token)
+                return
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_type_specifier(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead == 1:  # ID
+                self.report_error('missing TypeSpecifier')
+                return
+            elif lookahead == 5:  # void
+                self.advance()
+                return
+            elif lookahead == 6:  # int
+                self.advance()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_params(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead == 5:  # void
+                self.advance()
+                return
+            elif lookahead == 6:  # int
+                self.code_gen(ActionSymbols.SET_DECLARING, self.token)
+                self.code_gen(ActionSymbols.PUSH, self.token)
+                self.advance()
+                self.code_gen(ActionSymbols.UPDATE_TYPE, self.token)
+                self.match(1)
+                self.parse_param_prime()
+                self.parse_param_list()
+                return
+            elif lookahead == 16:  # )
+                self.report_error('missing Params')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_param_list(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead == 12:  # ,
+                self.advance()
+                self.parse_param()
+                continue
+            elif lookahead == 16:  # )
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_param(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (5, 6):  # void int
+                self.parse_declaration_initial()
+                self.parse_param_prime()
+                return
+            elif lookahead in (12, 16):  # , )
+                self.report_error('missing Param')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_param_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (12, 16):  # , )
+                self.code_gen(ActionSymbols.UPDATE_VAR_ATTRIBUTES, self.token)
+                self.semantic_check(CheckSymbols.VAR_ARR_IS_INT, self.token)
+                return
+            elif lookahead == 13:  # [
+                self.code_gen(ActionSymbols.UPDATE_ARR_ATTRIBUTES, self.token)
+                self.semantic_check(CheckSymbols.VAR_ARR_IS_INT, self.token)
+                self.advance()
+                self.match(14)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_compound_stmt(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 15, 18, 19, 20, 27):  # NUM ID if else endif void int while break return ; ( } + - $
+                self.report_error('missing CompoundStmt')
+                return
+            elif lookahead == 17:  # {
+                self.code_gen(ActionSymbols.START_SCOPE, self.token)
+                self.advance()
+                self.parse_declaration_list()
+                self.parse_statement_list()
+                self.match(18)
+                self.code_gen(ActionSymbols.END_SCOPE, self.token)
+                return
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_statement_list(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 7, 8, 9, 10, 15, 17, 19, 20):  # NUM ID if while break return ; ( { + -
+                self.parse_statement()
+                continue
+            elif lookahead == 18:  # }
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_statement(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 8, 10, 15, 19, 20):  # NUM ID break ; ( + -
+                self.parse_expression_stmt()
+                return
+            elif lookahead == 2:  # if
+                self.parse_selection_stmt()
+                return
+            elif lookahead in (3, 4, 18):  # else endif }
+                self.report_error('missing Statement')
+                return
+            elif lookahead == 7:  # while
+                self.parse_iteration_stmt()
+                return
+            elif lookahead == 9:  # return
+                self.parse_return_stmt()
+                return
+            elif lookahead == 17:  # {
+                self.parse_compound_stmt()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_expression_stmt(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15, 19, 20):  # NUM ID ( + -
+                self.parse_expression()
+                self.code_gen(ActionSymbols.TYPE_POP, self.token)
+                self.code_gen(ActionSymbols.POP, self.token)
+                self.match(10)
+                return
+            elif lookahead in (2, 3, 4, 7, 9, 17, 18):  # if else endif while return { }
+                self.report_error('missing ExpressionStmt')
+                return
+            elif lookahead == 8:  # break
+                self.semantic_check(CheckSymbols.BREAK_IS_IN_LOOP, self.token)
+                self.advance()
+                self.code_gen(ActionSymbols.BREAK, self.token)
+                self.match(10)
+                return
+            elif lookahead == 10:  # ;
+                self.advance()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_selection_stmt(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 3, 4, 7, 8, 9, 10, 15, 17, 18, 19, 20):  # NUM ID else endif while break return ; ( { } + -
+                self.report_error('missing SelectionStmt')
+                return
+            elif lookahead == 2:  # if
+                self.advance()
+                self.match(15)
+                self.parse_expression()
+                self.code_gen(ActionSymbols.TYPE_POP, self.token)
+                self.match(16)
+                self.code_gen(ActionSymbols.SAVE, self.token)
+                self.parse_statement()
+                self.parse_else_stmt()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_else_stmt(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 7, 8, 9, 10, 15, 17, 18, 19, 20):  # NUM ID if while break return ; ( { } + -
+                self.report_error('missing ElseStmt')
+                return
+            elif lookahead == 3:  # else
+                self.advance()
+                self.code_gen(ActionSymbols.JPF_SAVE, self.token)
+                self.parse_statement()
+                self.code_gen(ActionSymbols.JP, self.token)
+                self.match(4)
+                return
+            elif lookahead == 4:  # endif
+                self.code_gen(ActionSymbols.JPF, self.token)
+                self.advance()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_iteration_stmt(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 3, 4, 8, 9, 10, 15, 17, 18, 19, 20):  # NUM ID if else endif break return ; ( { } + -
+                self.report_error('missing IterationStmt')
+                return
+            elif lookahead == 7:  # while
+                self.advance()
+                self.code_gen(ActionSymbols.SAVE, self.token)
+                self.code_gen(ActionSymbols.LABEL, self.token)
+                self.match(15)
+                self.parse_expression()
+                self.code_gen(ActionSymbols.TYPE_POP, self.token)
+                self.match(16)
+                self.code_gen(ActionSymbols.WHILE_SAVE, self.token)
+                self.parse_statement()
+                self.code_gen(ActionSymbols.WHILE, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_return_stmt(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 2, 3, 4, 7, 8, 10, 15, 17, 18, 19, 20):  # NUM ID if else endif while break ; ( { } + -
+                self.report_error('missing ReturnStmt')
+                return
+            elif lookahead == 9:  # return
+                self.advance()
+                self.parse_return_stmt_prime()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_return_stmt_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15, 19, 20):  # NUM ID ( + -
+                self.parse_expression()
+                self.code_gen(ActionSymbols.RETURN_VALUE, self.token)
+                self.code_gen(ActionSymbols.TYPE_POP, self.token)
+                self.match(10)
+                return
+            elif lookahead in (2, 3, 4, 7, 8, 9, 17, 18):  # if else endif while break return { }
+                self.report_error('missing ReturnStmtPrime')
+                return
+            elif lookahead == 10:  # ;
+                self.code_gen(ActionSymbols.RETURN, self.token)
+                self.advance()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_expression(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 15, 19, 20):  # NUM ( + -
+                self.parse_simple_expression_zegond()
+                return
+            elif lookahead == 1:  # ID
+                self.semantic_check(CheckSymbols.ID_IS_DEFINED, self.token)
+                self.code_gen(ActionSymbols.PUSH_ID, self.token)
+                self.advance()
+                self.parse_b()
+                return
+            elif lookahead in (10, 12, 14, 16):  # ; , ] )
+                self.report_error('missing Expression')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_b(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 15, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ( ) + - * < == /
+                self.parse_simple_expression_prime()
+                return
+            elif lookahead == 13:  # [
+                self.advance()
+                self.parse_expression()
+                self.match(14)
+                self.code_gen(ActionSymbols.UPDATE_ID, self.token)
+                self.parse_h()
+                return
+            elif lookahead == 22:  # =
+                self.advance()
+                self.parse_expression()
+                self.semantic_check(CheckSymbols.TYPE_MATCH, self.token)
+                self.code_gen(ActionSymbols.ASSIGN, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_h(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ) + - * < == /
+                self.parse_g()
+                self.parse_d()
+                self.parse_c()
+                return
+            elif lookahead == 22:  # =
+                self.advance()
+                self.parse_expression()
+                self.semantic_check(CheckSymbols.TYPE_MATCH, self.token)
+                self.code_gen(ActionSymbols.ASSIGN, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_simple_expression_zegond(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 15, 19, 20):  # NUM ( + -
+                self.parse_additive_expression_zegond()
+                self.parse_c()
+                return
+            elif lookahead in (10, 12, 14, 16):  # ; , ] )
+                self.report_error('missing SimpleExpressionZegond')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_simple_expression_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 15, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ( ) + - * < == /
+                self.parse_additive_expression_prime()
+                self.parse_c()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_c(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 16):  # ; , ] )
+                return
+            elif lookahead in (23, 24):  # < ==
+                self.code_gen(ActionSymbols.PUSH, self.token)
+                self.parse_relop()
+                self.parse_additive_expression()
+                self.semantic_check(CheckSymbols.TYPE_MATCH, self.token)
+                self.code_gen(ActionSymbols.OPERATION, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_relop(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15, 19, 20):  # NUM ID ( + -
+                self.report_error('missing Relop')
+                return
+            elif lookahead == 23:  # <
+                self.advance()
+                return
+            elif lookahead == 24:  # ==
+                self.advance()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_additive_expression(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15, 19, 20):  # NUM ID ( + -
+                self.parse_term()
+                self.parse_d()
+                return
+            elif lookahead in (10, 12, 14, 16):  # ; , ] )
+                self.report_error('missing AdditiveExpression')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_additive_expression_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 15, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ( ) + - * < == /
+                self.parse_term_prime()
+                self.parse_d()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_additive_expression_zegond(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 15, 19, 20):  # NUM ( + -
+                self.parse_term_zegond()
+                self.parse_d()
+                return
+            elif lookahead in (10, 12, 14, 16, 23, 24):  # ; , ] ) < ==
+                self.report_error('missing AdditiveExpressionZegond')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_d(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 16, 23, 24):  # ; , ] ) < ==
+                return
+            elif lookahead in (19, 20):  # + -
+                self.code_gen(ActionSymbols.PUSH, self.token)
+                self.parse_addop()
+                self.parse_term()
+                self.semantic_check(CheckSymbols.TYPE_MATCH, self.token)
+                self.code_gen(ActionSymbols.OPERATION, self.token)
+                continue
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_addop(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15):  # NUM ID (
+                self.report_error('missing Addop')
+                return
+            elif lookahead == 19:  # +
+                self.advance()
+                return
+            elif lookahead == 20:  # -
+                self.advance()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_term(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15, 19, 20):  # NUM ID ( + -
+                self.parse_signed_factor()
+                self.parse_g()
+                return
+            elif lookahead in (10, 12, 14, 16, 23, 24):  # ; , ] ) < ==
+                self.report_error('missing Term')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_term_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 15, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ( ) + - * < == /
+                self.parse_signed_factor_prime()
+                self.parse_g()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_term_zegond(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 15, 19, 20):  # NUM ( + -
+                self.parse_signed_factor_zegond()
+                self.parse_g()
+                return
+            elif lookahead in (10, 12, 14, 16, 23, 24):  # ; , ] ) < ==
+                self.report_error('missing TermZegond')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_g(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 16, 19, 20, 23, 24):  # ; , ] ) + - < ==
+                return
+            elif lookahead in (21, 25):  # * /
+                self.code_gen(ActionSymbols.PUSH, self.token)
+                self.parse_mulop()
+                self.parse_signed_factor()
+                self.semantic_check(CheckSymbols.TYPE_MATCH, self.token)
+                self.code_gen(ActionSymbols.OPERATION, self.token)
+                continue
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_mulop(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15, 19, 20):  # NUM ID ( + -
+                self.report_error('missing Mulop')
+                return
+            elif lookahead == 21:  # *
+                self.advance()
+                return
+            elif lookahead == 25:  # /
+                self.advance()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_signed_factor(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15):  # NUM ID (
+                self.parse_factor()
+                return
+            elif lookahead in (10, 12, 14, 16, 21, 23, 24, 25):  # ; , ] ) * < == /
+                self.report_error('missing SignedFactor')
+                return
+            elif lookahead == 19:  # +
+                self.advance()
+                self.parse_factor()
+                return
+            elif lookahead == 20:  # -
+                self.advance()
+                self.parse_factor()
+                self.code_gen(ActionSymbols.NEG, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_signed_factor_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 15, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ( ) + - * < == /
+                self.parse_factor_prime()
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_signed_factor_zegond(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 15):  # NUM (
+                self.parse_factor_zegond()
+                return
+            elif lookahead in (10, 12, 14, 16, 21, 23, 24, 25):  # ; , ] ) * < == /
+                self.report_error('missing SignedFactorZegond')
+                return
+            elif lookahead == 19:  # +
+                self.advance()
+                self.parse_factor()
+                return
+            elif lookahead == 20:  # -
+                self.advance()
+                self.parse_factor()
+                self.code_gen(ActionSymbols.NEG, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_factor(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead == 0:  # NUM
+                self.code_gen(ActionSymbols.SAVE_NUM, self.token)
+                self.advance()
+                return
+            elif lookahead == 1:  # ID
+                self.semantic_check(CheckSymbols.ID_IS_DEFINED, self.token)
+                self.code_gen(ActionSymbols.PUSH_ID, self.token)
+                self.advance()
+                self.parse_var_call_prime()
+                return
+            elif lookahead in (10, 12, 14, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ) + - * < == /
+                self.report_error('missing Factor')
+                return
+            elif lookahead == 15:  # (
+                self.advance()
+                self.parse_expression()
+                self.match(16)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_var_call_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 13, 14, 16, 19, 20, 21, 23, 24, 25):  # ; , [ ] ) + - * < == /
+                self.parse_var_prime()
+                return
+            elif lookahead == 15:  # (
+                self.advance()
+                self.parse_args()
+                self.match(16)
+                self.code_gen(ActionSymbols.CALL, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_var_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ) + - * < == /
+                return
+            elif lookahead == 13:  # [
+                self.advance()
+                self.parse_expression()
+                self.code_gen(ActionSymbols.UPDATE_ID, self.token)
+                self.match(14)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_factor_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (10, 12, 14, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ) + - * < == /
+                return
+            elif lookahead == 15:  # (
+                self.advance()
+                self.parse_args()
+                self.match(16)
+                self.code_gen(ActionSymbols.CALL, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_factor_zegond(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead == 0:  # NUM
+                self.code_gen(ActionSymbols.SAVE_NUM, self.token)
+                self.advance()
+                return
+            elif lookahead in (10, 12, 14, 16, 19, 20, 21, 23, 24, 25):  # ; , ] ) + - * < == /
+                self.report_error('missing FactorZegond')
+                return
+            elif lookahead == 15:  # (
+                self.advance()
+                self.parse_expression()
+                self.match(16)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_args(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15, 19, 20):  # NUM ID ( + -
+                self.code_gen(ActionSymbols.PUSH_ZERO, self.token)
+                self.parse_arg_list()
+                return
+            elif lookahead == 16:  # )
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_arg_list(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead in (0, 1, 15, 19, 20):  # NUM ID ( + -
+                self.semantic_check(CheckSymbols.PARAMETER_NUMBER, self.token)
+                self.parse_expression()
+                self.semantic_check(CheckSymbols.ARG_TYPE, self.token)
+                self.code_gen(ActionSymbols.NEW_ARG, self.token)
+                self.parse_arg_list_prime()
+                return
+            elif lookahead == 16:  # )
+                self.report_error('missing ArgList')
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
+
+    def parse_arg_list_prime(self):
+        while True:
+            lookahead = self.lookahead
+            if lookahead == 12:  # ,
+                self.advance()
+                self.semantic_check(CheckSymbols.PARAMETER_NUMBER, self.token)
+                self.parse_expression()
+                self.semantic_check(CheckSymbols.ARG_TYPE, self.token)
+                self.code_gen(ActionSymbols.NEW_ARG, self.token)
+                continue
+            elif lookahead == 16:  # )
+                self.code_gen(ActionSymbols.POP, self.token)
+                return
+            elif lookahead == 27:  # $
+                self.report_error('Unexpected EOF')
+                raise UnexpectedEOF
+            self.report_error(f'illegal {terminal_contents[lookahead]}')
+            self.advance()
@@ -0,0 +1,253 @@
+# Sepehr Vahedi
+# 99170615
+
+import argparse
+import os
+
+from symbols import ActionSymbols, CheckSymbols, Terminals
+from parser import NonTerminals, productions, start_symbol
+from parser import symbol_codes, terminal_count, parsing_table, synch_entry
+from parser import grammar_fingerprint
+
+# The productions in the order in which `parser.create_parsing_table` numbers them in the table entries.
+terminal_contents = tuple(terminal.content for terminal in Terminals)
+table_productions = [production for nonterminal in NonTerminals for production in productions[nonterminal]]
+generated_parser_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generated_parser.py')
+
+
+def grammar_symbols_of(production):
+    return [symbol for symbol in production if type(symbol) is Terminals or type(symbol) is NonTerminals]
+
+
+def first_of_sequence(sequence, first_sets):
+    result = set()
+    for symbol in sequence:
+        if symbol == Terminals.EPSILON:
+            continue
+        if type(symbol) is Terminals:
+            result.add(symbol)
+            return result
+        result |= first_sets[symbol] - {Terminals.EPSILON}
+        if Terminals.EPSILON not in first_sets[symbol]:
+            return result
+    result.add(Terminals.EPSILON)
+    return result
+
+
+def derive_first_sets():
+    first_sets = {nonterminal: set() for nonterminal in NonTerminals}
+    is_changed = True
+    while is_changed:
+        is_changed = False
+        for nonterminal in NonTerminals:
+            for production in productions[nonterminal]:
+                derived = first_of_sequence(grammar_symbols_of(production), first_sets)
+                if not derived <= first_sets[nonterminal]:
+                    first_sets[nonterminal] |= derived
+                    is_changed = True
+    return first_sets
+
+
+def derive_follow_sets(first_sets):
+    follow_sets = {nonterminal: set() for nonterminal in NonTerminals}
+    follow_sets[start_symbol].add(Terminals.DOLLAR)
+    is_changed = True
+    while is_changed:
+        is_changed = False
+        for nonterminal in NonTerminals:
+            for production in productions[nonterminal]:
+                sequence = grammar_symbols_of(production)
+                for index, symbol in enumerate(sequence):
+                    if type(symbol) is not NonTerminals:
+                        continue
+                    rest = first_of_sequence(sequence[index + 1:], first_sets)
+                    derived = rest - {Terminals.EPSILON}
+                    if Terminals.EPSILON in rest:
+                        derived |= follow_sets[nonterminal]
+                    if not derived <= follow_sets[symbol]:
+                        follow_sets[symbol] |= derived
+                        is_changed = True
+    return follow_sets
+
+
+def find_conflicts(first_sets, follow_sets):
+    # Two productions of a nonterminal conflict when their predict sets share a terminal.
+    conflicts = []
+    for nonterminal in NonTerminals:
+        predicted = {}
+        for index, production in enumerate(productions[nonterminal]):
+            predict = first_of_sequence(grammar_symbols_of(production), first_sets)
+            if Terminals.EPSILON in predict:
+                predict = (predict - {Terminals.EPSILON}) | follow_sets[nonterminal]
+            for terminal in predict:
+                if terminal in predicted:
+                    conflicts.append((nonterminal, terminal, predicted[terminal], index))
+                else:
+                    predicted[terminal] = index
+    return conflicts
+
+
+def terminal_list(terminals):
+    return ' '.join(sorted(terminal.content for terminal in terminals))
+
+
+def report_grammar(first_sets, follow_sets, conflicts):
+    lines = []
+    for nonterminal, terminal, earlier, later in conflicts:
+        lines.append(f'conflict: {nonterminal.name} on {terminal.content} between productions {earlier} and {later}')
+    for nonterminal in NonTerminals:
+        for set_name, declared, derived in (('FIRST', set(nonterminal.first), first_sets[nonterminal]),
+                                            ('FOLLOW', set(nonterminal.follow), follow_sets[nonterminal])):
+            if declared != derived:
+                lines.append(f'{set_name}({nonterminal.name}) differs from the declared set: '
+                             f'missing [{terminal_list(derived - declared)}], '
+                             f'extra [{terminal_list(declared - derived)}]')
+    return lines
+
+
+def method_name(nonterminal):
+    return 'parse_' + super(NonTerminals, nonterminal).name.lower()
+
+
+def generate_body(nonterminal, production, branch_terminals):
+    # Emits the statements of one production. Actions and checks become direct calls; a trailing self-reference
+    # (right recursion, e.g. Declaration-list -> Declaration Declaration-list) becomes `continue` of the loop.
+    lines = []
+    symbols = [symbol for symbol in production if symbol != Terminals.EPSILON]
+    is_tail_recursive = bool(symbols) and symbols[-1] == nonterminal
+    if is_tail_recursive:
+        symbols = symbols[:-1]
+    is_lookahead_known = True
+    for symbol in symbols:
+        if type(symbol) is ActionSymbols:
+            lines.append(f'self.code_gen(ActionSymbols.{symbol.name}, self.token)')
+        elif type(symbol) is CheckSymbols:
+            lines.append(f'self.semantic_check(CheckSymbols.{symbol.name}, self.token)')
+        elif type(symbol) is Terminals:
+            code = symbol_codes[symbol]
+            if is_lookahead_known and branch_terminals == [code]:
+                lines.append(f'self.advance()')
+            else:
+                lines.append(f'self.match({code})')
+            is_lookahead_known = False
+        else:
+            lines.append(f'self.{method_name(symbol)}()')
+            is_lookahead_known = False
+    lines.append('continue' if is_tail_recursive else 'return')
+    return lines
+
+
+def generate_method(nonterminal):
+    row = parsing_table[(symbol_codes[nonterminal] - terminal_count) * terminal_count:][:terminal_count]
+    branches = {}
+    for terminal_code, entry in enumerate(row):
+        if entry >= 0 or entry == synch_entry:
+            branches.setdefault(entry, []).append(terminal_code)
+
+    lines = [f'    def {method_name(nonterminal)}(self):',
+             '        while True:',
+             '            lookahead = self.lookahead']
+    keyword = 'if'
+    for entry, terminals in branches.items():
+        condition = f'lookahead == {terminals[0]}' if len(terminals) == 1 else \
+            f'lookahead in ({", ".join(map(str, terminals))})'
+        lines.append(f'            {keyword} {condition}:  # {" ".join(terminal_contents[code] for code in terminals)}')
+        keyword = 'elif'
+        if entry == synch_entry:
+            body = [f"self.report_error('missing {nonterminal.name}')", 'return']
+        else:
+            body = generate_body(nonterminal, table_productions[entry], terminals)
+        lines.extend(f'                {statement}' for statement in body)
+    dollar_code = symbol_codes[Terminals.DOLLAR]
+    if not any(dollar_code in terminals for terminals in branches.values()):
+        lines.append(f'            {keyword} lookahead == {dollar_code}:  # $')
+        lines.append("                self.report_error('Unexpected EOF')")
+        lines.append('                raise UnexpectedEOF')
+    lines.append('            self.report_error(f\'illegal {terminal_contents[lookahead]}\')')
+    lines.append('            self.advance()')
+    return lines
+
+
+generated_header = '''# Sepehr Vahedi
+# 99170615
+# Generated by grammar_compiler.py from the grammar in parser.py; do not edit by hand.
+
+from symbols import ActionSymbols, CheckSymbols
+from diagnostics import Diagnostics, Phases
+from lexer import Lexer
+from intermediate_code_generator.expression_processor import CodeGenerator
+
+grammar_fingerprint = {fingerprint!r}
+terminal_contents = {terminal_contents!r}
+
+
+class UnexpectedEOF(Exception):
+    pass
+
+
+class GeneratedParser:
+    # Recursive-descent version of `Parser.parse` over the same LL(1) table. It reports the same errors, recovers
+    # from them the same way and calls the code generator in the same order, but does not build a parse tree.
+    def __init__(self, lexer: Lexer, code_generator: CodeGenerator, diagnostics: Diagnostics = None):
+        self.lexer = lexer
+        self.code_generator = code_generator
+        self.diagnostics = diagnostics or Diagnostics()
+        self.code_gen = code_generator.code_gen
+        self.semantic_check = code_generator.semantic_check
+        self.token = None
+        self.lookahead = None
+
+    def advance(self):
+        self.token = self.lexer.get_next_token()
+        self.lookahead = self.token.terminal_code
+
+    def match(self, terminal):
+        if self.lookahead == terminal:
+            self.advance()
+        else:
+            self.report_error(f'missing {{terminal_contents[terminal]}}')
+
+    def report_error(self, message):
+        self.diagnostics.report(Phases.SYNTAX, self.token.line_number, message)
+
+    def parse(self):
+        self.advance()
+        try:
+            self.{start_method}()
+        except UnexpectedEOF:
+            pass
+        if self.code_generator.is_erroneous:
+            self.code_generator.discard_code()
+'''
+
+
+def generate_parser():
+    source = generated_header.format(fingerprint=grammar_fingerprint(), terminal_contents=terminal_contents,
+                                     start_method=method_name(start_symbol))
+    for nonterminal in NonTerminals:
+        source += '\n' + '\n'.join(generate_method(nonterminal)) + '\n'
+    return source
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='C-minus grammar compiler')
+    argument_parser.add_argument('--check', action='store_true',
+                                 help='only report conflicts and whether generated_parser.py is up to date')
+    arguments = argument_parser.parse_args()
+
+    first_sets = derive_first_sets()
+    follow_sets = derive_follow_sets(first_sets)
+    for line in report_grammar(first_sets, follow_sets, find_conflicts(first_sets, follow_sets)):
+        print(line)
+
+    source = generate_parser()
+    if arguments.check:
+        try:
+            with open(generated_parser_path) as file:
+                is_up_to_date = file.read() == source
+        except OSError:
+            is_up_to_date = False
+        print('generated_parser.py is up to date' if is_up_to_date else 'generated_parser.py is out of date')
+    else:
+        with open(generated_parser_path, 'w') as file:
+            file.write(source)
@@ -0,0 +1,67 @@
+# Sepehr Vahedi
+# 99170615
+
+from symbols import SymbolTable
+from lexer import Lexer, Token
+
+
+def token_end(token: Token):
+    return token.offset + len(token.lexeme)
+
+
+def first_token_ending_at_or_after(tokens, offset):
+    low, high = 0, len(tokens)
+    while low < high:
+        middle = (low + high) // 2
+        if tokens[middle].type != 'END' and token_end(tokens[middle]) < offset:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def relex(text: str, tokens, edit_start: int, edit_end: int, new_text: str, symbol_table: SymbolTable):
+    # Applies the edit that replaces text[edit_start:edit_end] with `new_text` and returns the new source together
+    # with its token stream, given the previous stream `tokens` (ending with the END token).
+    #
+    # Lexing restarts at the end of the last token that ends strictly before the edit. A token always ends in
+    # the start state, so the restart point can never be inside a /* */ comment (states Q6/Q7) or any other
+    # token, and a token that touches the edit is re-lexed because the edit may extend it. Lexing stops as soon
+    # as a token past the edit starts where an old token started (shifted by the edit): both runs are in the
+    # start state there over identical text, so the remaining old tokens are reused with shifted positions.
+    source = text[:edit_start] + new_text + text[edit_end:]
+    shift = len(new_text) - (edit_end - edit_start)
+    edited_end = edit_start + len(new_text)
+
+    restart = first_token_ending_at_or_after(tokens, edit_start)
+    new_tokens = list(tokens[:restart])
+    lexer = Lexer(source, symbol_table, retain_tokens=False)
+    if restart:
+        lexer.seek(token_end(tokens[restart - 1]), tokens[restart - 1].line_number)
+
+    old_index = restart
+    while True:
+        token = lexer.get_next_token()
+        if token.offset >= edited_end:
+            while old_index < len(tokens) and tokens[old_index].offset + shift < token.offset:
+                old_index += 1
+            if old_index < len(tokens):
+                old_token = tokens[old_index]
+                if old_token.offset + shift == token.offset and old_token.lexeme == token.lexeme \
+                        and old_token.type == token.type:
+                    break
+        new_tokens.append(token)
+        if token.type == 'END':
+            return source, new_tokens
+
+    line_shift = token.line_number - old_token.line_number
+    column_shift = token.column - old_token.column
+    line_end = source.find('\n', token.offset)
+    for old_token in tokens[old_index:]:
+        offset = old_token.offset + shift
+        column = old_token.column
+        if line_end < 0 or offset < line_end:
+            column += column_shift
+        new_tokens.append(Token(old_token.lexeme, old_token.type, old_token.line_number + line_shift, offset, column,
+                                old_token.terminal_code))
+    return source, new_tokens
@@ -0,0 +1,231 @@
+# Sepehr Vahedi
+# 99170615
+
+from symbols import ActionSymbols, CheckSymbols
+from lexer import Token
+from intermediate_code_generator.ast_nodes import Program, VarDecl, FunctionDecl, Compound, ExpressionStatement, \
+    If, While, Break, Return, Number, Name, ArrayIndex, BinOp, Negate, Assign, Argument, Call
+
+
+class MalformedTree(Exception):
+    pass
+
+
+class AstBuilder:
+    # Takes the place of `CodeGenerator` for the parser and builds the tree of `ast_nodes` from the same action and
+    # check symbols in one pass. Expressions arrive in postfix order and are combined on `operands`; statements
+    # and declarations are attached to the innermost node in `open_nodes` (program, function, block, if, while).
+    def __init__(self):
+        self.program = Program()
+        self.open_nodes = [self.program]
+        self.operands = []
+        self.is_erroneous = False
+        self.is_malformed = False
+        self.is_ended = False
+        self.__is_declaring = False
+        self.__is_in_params = False
+        self.__type_token = None
+        self.__name_token = None
+        # An expression closed by TYPE_POP, waiting for the action that tells which statement it belongs to.
+        self.__expression = None
+        self.__argument_starts = []
+        self.__break_token = None
+        self.__actions = {
+            ActionSymbols.SET_DECLARING: self.__set_declaring,
+            ActionSymbols.PUSH: self.__push,
+            ActionSymbols.UPDATE_TYPE: self.__update_type,
+            ActionSymbols.UPDATE_VAR_ATTRIBUTES: self.__update_var_attributes,
+            ActionSymbols.UPDATE_ARR_ATTRIBUTES: self.__update_arr_attributes,
+            ActionSymbols.START_FUNCTION: self.__start_function,
+            ActionSymbols.UPDATE_FUNC_ATTRIBUTES: self.__update_func_attributes,
+            ActionSymbols.START_SCOPE: self.__start_scope,
+            ActionSymbols.END_SCOPE: self.__end_scope,
+            ActionSymbols.TYPE_POP: self.__type_pop,
+            ActionSymbols.POP: self.__pop,
+            ActionSymbols.SAVE: self.__save,
+            ActionSymbols.WHILE_SAVE: self.__while_save,
+            ActionSymbols.WHILE: self.__close_statement,
+            ActionSymbols.JPF: self.__close_statement,
+            ActionSymbols.JPF_SAVE: self.__jpf_save,
+            ActionSymbols.JP: self.__close_statement,
+            ActionSymbols.BREAK: self.__break,
+            ActionSymbols.RETURN: self.__return,
+            ActionSymbols.RETURN_VALUE: self.__return_value,
+            ActionSymbols.SAVE_NUM: self.__save_num,
+            ActionSymbols.PUSH_ID: self.__push_id,
+            ActionSymbols.UPDATE_ID: self.__update_id,
+            ActionSymbols.OPERATION: self.__operation,
+            ActionSymbols.NEG: self.__neg,
+            ActionSymbols.ASSIGN: self.__assign,
+            ActionSymbols.PUSH_ZERO: self.__push_zero,
+            ActionSymbols.NEW_ARG: self.__new_arg,
+            ActionSymbols.CALL: self.__call,
+            ActionSymbols.END_OF_PROGRAM: self.__end_of_program,
+        }
+
+    def code_gen(self, action_symbol: ActionSymbols, current_token: Token):
+        # LABEL and RETURN_AT_THE_END_OF_FUNCTION add nothing that the tree does not already show.
+        action = self.__actions.get(action_symbol)
+        if action and not self.is_malformed:
+            try:
+                action(current_token)
+            except (IndexError, AttributeError, MalformedTree):
+                # Recovery from a syntax error can run the actions of a construct only in part; the tree is of no
+                # use then, and building stops.
+                self.is_malformed = True
+
+    @property
+    def is_complete(self):
+        # Whether the actions formed whole constructs only, as they do for a program without syntax errors or with
+        # errors that recovery repairs, e.g. a missing `endif`.
+        return self.is_ended and not self.is_malformed and len(self.open_nodes) == 1 and not self.operands
+
+    def semantic_check(self, check_symbol: CheckSymbols, current_token: Token):
+        # The other checks run at the same token as the action that follows them, which the tree already keeps.
+        if check_symbol == CheckSymbols.PARAMETER_NUMBER:
+            self.__argument_starts.append(current_token)
+        elif check_symbol == CheckSymbols.BREAK_IS_IN_LOOP:
+            self.__break_token = current_token
+
+    def __add_declaration(self, declaration):
+        node = self.open_nodes[-1]
+        if self.__is_in_params:
+            node.params.append(declaration)
+        else:
+            node.declarations.append(declaration)
+
+    def __add_statement(self, statement):
+        node = self.open_nodes[-1]
+        if type(node) is Compound:
+            node.statements.append(statement)
+        elif type(node) is FunctionDecl:
+            node.body = statement
+        elif type(node) is While:
+            node.body = statement
+        elif node.has_else:
+            node.else_branch = statement
+        else:
+            node.then_branch = statement
+
+    def __set_declaring(self, token):
+        if self.__name_token is not None:
+            raise MalformedTree('declaration without a variable or function part')
+        self.__is_declaring = True
+
+    def __push(self, token):
+        # Pushes the type of a declaration, or the operator of a binary operation.
+        if self.__is_declaring:
+            self.__type_token = token
+        else:
+            self.operands.append(token)
+
+    def __update_type(self, token):
+        # The lexer enters the name in the symbol table as it reads the token after the type. If that is no ID, it
+        # enters the next ID it reads anywhere instead, which the tree cannot show.
+        if token.type != 'ID':
+            raise MalformedTree('declaration without a name')
+        self.__is_declaring = False
+        self.__name_token = token
+
+    def __update_var_attributes(self, token):
+        self.__add_declaration(VarDecl(self.__type_token, self.__name_token, False, token))
+        self.__name_token = None
+
+    def __update_arr_attributes(self, token):
+        self.__add_declaration(VarDecl(self.__type_token, self.__name_token, True, token))
+        self.__name_token = None
+
+    def __start_function(self, token):
+        function = FunctionDecl(self.__type_token, self.__name_token)
+        self.__name_token = None
+        self.__add_declaration(function)
+        self.open_nodes.append(function)
+        self.__is_in_params = True
+
+    def __update_func_attributes(self, token):
+        self.__is_in_params = False
+
+    def __start_scope(self, token):
+        self.open_nodes.append(Compound())
+
+    def __end_scope(self, token):
+        node = self.open_nodes.pop()
+        if type(node) is Compound:
+            self.__add_statement(node)
+
+    def __type_pop(self, token):
+        # After RETURN_VALUE the returned expression is already taken.
+        if self.operands:
+            self.__expression = self.operands.pop()
+
+    def __pop(self, token):
+        # Ends an expression statement, or an argument list (whose arguments are already collected).
+        if self.__expression is not None:
+            self.__add_statement(ExpressionStatement(self.__expression))
+            self.__expression = None
+
+    def __save(self, token):
+        # An if saves its jump after the condition; a while saves one before it.
+        if self.__expression is not None:
+            self.open_nodes.append(If(self.__expression))
+            self.__expression = None
+        else:
+            self.open_nodes.append(While())
+
+    def __while_save(self, token):
+        self.open_nodes[-1].condition = self.__expression
+        self.__expression = None
+
+    def __jpf_save(self, token):
+        self.open_nodes[-1].has_else = True
+
+    def __close_statement(self, token):
+        self.__add_statement(self.open_nodes.pop())
+
+    def __break(self, token):
+        self.__add_statement(Break(self.__break_token))
+
+    def __return(self, token):
+        self.__add_statement(Return())
+
+    def __return_value(self, token):
+        self.__add_statement(Return(self.operands.pop()))
+
+    def __save_num(self, token):
+        self.operands.append(Number(token))
+
+    def __push_id(self, token):
+        self.operands.append(Name(token))
+
+    def __update_id(self, token):
+        index = self.operands.pop()
+        self.operands.append(ArrayIndex(self.operands.pop(), index))
+
+    def __operation(self, token):
+        right = self.operands.pop()
+        operator_token = self.operands.pop()
+        self.operands.append(BinOp(operator_token, self.operands.pop(), right, token))
+
+    def __neg(self, token):
+        self.operands.append(Negate(self.operands.pop()))
+
+    def __assign(self, token):
+        value = self.operands.pop()
+        self.operands.append(Assign(self.operands.pop(), value, token))
+
+    def __push_zero(self, token):
+        self.operands.append([])
+
+    def __new_arg(self, token):
+        value = self.operands.pop()
+        self.operands[-1].append(Argument(value, self.__argument_starts.pop(), token))
+
+    def __end_of_program(self, token):
+        if self.__name_token is not None:
+            raise MalformedTree('declaration without a variable or function part')
+        self.program.end_token = token
+        self.is_ended = True
+
+    def __call(self, token):
+        arguments = self.operands.pop() if type(self.operands[-1]) is list else None
+        self.operands.append(Call(self.operands.pop(), arguments))
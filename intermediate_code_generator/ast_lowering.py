@@ -0,0 +1,358 @@
+# Sepehr Vahedi
+# 99170615
+
+from types import GeneratorType
+
+from diagnostics import Phases
+from intermediate_code_generator.ast_nodes import Program, VarDecl, FunctionDecl, Compound, ExpressionStatement, \
+    If, While, Break, Return, Number, Name, ArrayIndex, BinOp, Negate, Assign, Call
+from intermediate_code_generator.instructions import Opcode, Addressing, Operand, Instruction, Label, direct, \
+    immediate, indirect, number, stack_pointer, stack_top, word_size, return_address, return_target, \
+    result_address, zero, evaluate, constant_value
+from intermediate_code_generator.expression_processor import CodeGenerator, operation_commands
+
+
+class AstLowering:
+    # Lowers a tree from `AstBuilder` to three-address code in the builder of `code_generator`, checking it on the way
+    # with the same messages as the semantic checks of a syntax-directed parse; the code is the same as such a parse
+    # generates. There is one visitor per node class. An expression's visitor returns its value, an address or an
+    # operand as on the semantic stack, and its type.
+    #
+    # Visitors that lower child nodes are generators: they yield a child and are sent back what the child's visitor
+    # returns. `lower` keeps the pending visitors on a stack of its own instead of recursing, since left-nested
+    # expressions and else-if chains can be very deep.
+    def __init__(self, code_generator: CodeGenerator):
+        self.builder = code_generator.builder
+        self.symbols = code_generator.symbol_table
+        # The values that enclosing expressions and statements keep while a child is lowered, in the order a
+        # syntax-directed parse keeps them on its semantic stack; a call saves the temporaries among them.
+        self.held = []
+        self.main_slots = []
+        self.__visitors = {
+            Program: self.__program,
+            VarDecl: self.__var_decl,
+            FunctionDecl: self.__function_decl,
+            Compound: self.__compound,
+            ExpressionStatement: self.__expression_statement,
+            If: self.__if,
+            While: self.__while,
+            Break: self.__break,
+            Return: self.__return,
+            Number: self.__number,
+            Name: self.__name,
+            ArrayIndex: self.__array_index,
+            BinOp: self.__bin_op,
+            Negate: self.__negate,
+            Assign: self.__assign,
+            Call: self.__call,
+        }
+
+    def lower(self, program: Program):
+        pending = [self.__visitors[Program](program)]
+        result = None
+        while pending:
+            try:
+                child = pending[-1].send(result)
+            except StopIteration as stop:
+                pending.pop()
+                result = stop.value
+                continue
+            # An empty statement is None and lowers to nothing.
+            result = None
+            if child is not None:
+                lowered = self.__visitors[type(child)](child)
+                if type(lowered) is GeneratorType:
+                    pending.append(lowered)
+                else:
+                    result = lowered
+
+    def __emit(self, opcode, first, second=None, third=None, is_compact=False):
+        self.builder.instruction_list.append(Instruction(opcode, first, second, third, is_compact))
+
+    def __report(self, token, message):
+        self.builder.diagnostics.report(Phases.SEMANTIC, token.line_number, message)
+        self.builder.error_state = True
+
+    def __off_stack(self, value):
+        # A call's result is taken off the runtime stack into a temporary before an operation uses it.
+        if value != stack_top:
+            return value
+        temporary = self.builder.allocate_temporary()
+        self.__emit(Opcode.ASSIGN, stack_top, direct(temporary))
+        self.__emit(Opcode.SUB, stack_pointer, word_size, stack_pointer)
+        return temporary
+
+    def __declare(self, node):
+        # The lexer of a syntax-directed parse enters a declared name as it reads it.
+        self.symbols.is_declaring = True
+        self.symbols.add_to_symbol_table(node.name_token.type, node.name)
+        self.symbols.update_type(node.type_name)
+
+    def __program(self, node):
+        for declaration in node.declarations:
+            yield declaration
+        # Only the last main's jump is filled in.
+        if not self.main_slots:
+            self.__report(node.end_token, 'Jump target lost to a syntax error.')
+            return
+        slot = self.main_slots.pop()
+        self.builder.instruction_list[slot.position] = Instruction(
+            Opcode.ASSIGN, self.builder.address_of(self.builder.place_label()), return_address)
+
+    def __var_decl(self, node):
+        self.__declare(node)
+        function_stack = self.builder.function_stack
+        if node.is_array:
+            size = int(node.size_token.lexeme) if node.size_token.type == 'NUM' else 0
+            symbol = self.symbols.update_last_symbol(is_array=True, size=size)
+            cell_count = symbol.size
+        else:
+            symbol = self.symbols.update_last_symbol()
+            cell_count = 1
+        if function_stack:
+            function_stack[-1].size += cell_count
+        # Parameters and the globals before the first function are not set to zero.
+        if not self.builder.parameter_declaration_mode:
+            for address in range(symbol.address, symbol.address + cell_count * 4, 4):
+                self.__emit(Opcode.ASSIGN, zero, direct(address))
+        if symbol.type == 'void':
+            self.__report(node.size_token, f'Illegal type of void for {symbol.lexeme}.')
+
+    def __function_decl(self, node):
+        self.__declare(node)
+        self.symbols.add_scope()
+        self.builder.parameter_declaration_mode = True
+        for parameter in node.params:
+            yield parameter
+        self.builder.parameter_declaration_mode = False
+        function = self.symbols.update_last_function()
+        function.code_beginning = self.builder.place_label()
+        self.builder.function_stack.append(function)
+        if function.lexeme == 'main':
+            self.__emit(Opcode.ASSIGN, immediate(1000), stack_pointer)
+            for address in range(100, self.symbols.last_used_address() + 4, 4):
+                self.__emit(Opcode.ASSIGN, zero, direct(address))
+            function.code_beginning = self.builder.reserve_slot()
+            self.main_slots.append(function.code_beginning)
+        yield node.body
+        self.builder.function_stack.pop()
+        self.__emit(Opcode.ASSIGN, zero, result_address)
+        self.__emit(Opcode.JP, return_target)
+        if function.lexeme == 'main':
+            # The program starts at the stack pointer setup, before main's cells are set to zero.
+            cell_count = (function.first_address - 100) // 4 + 1
+            self.builder.instruction_list[0] = Instruction(
+                Opcode.JP, self.builder.jump_target(Label(function.code_beginning.position - cell_count)))
+        self.symbols.del_scope()
+
+    def __compound(self, node):
+        self.symbols.add_scope()
+        for declaration in node.declarations:
+            yield declaration
+        for statement in node.statements:
+            yield statement
+        self.symbols.del_scope()
+
+    def __expression_statement(self, node):
+        value, _ = yield node.expression
+        self.builder.pop_function_result(value)
+
+    def __if(self, node):
+        condition, _ = yield node.condition
+        condition = self.__off_stack(condition)
+        slot = self.builder.reserve_slot()
+        self.held.append(condition)
+        yield node.then_branch
+        self.held.pop()
+        if node.has_else:
+            jump = self.builder.reserve_slot()
+            self.builder.instruction_list[slot.position] = Instruction(
+                Opcode.JPF, direct(condition), self.builder.jump_target(self.builder.place_label()), is_compact=True)
+            yield node.else_branch
+            self.builder.instruction_list[jump.position] = Instruction(
+                Opcode.JP, self.builder.jump_target(self.builder.place_label()), is_compact=True)
+        else:
+            self.builder.instruction_list[slot.position] = Instruction(
+                Opcode.JPF, direct(condition), self.builder.jump_target(self.builder.place_label()), is_compact=True)
+
+    def __while(self, node):
+        # The slot before the loop sets the cell that a false condition and a break jump through to the loop's end.
+        slot = self.builder.reserve_slot()
+        start = self.builder.place_label()
+        condition, _ = yield node.condition
+        condition = self.__off_stack(condition)
+        exit_cell = self.builder.allocate_temporary()
+        self.builder.loop_stack.append(exit_cell)
+        self.__emit(Opcode.JPF, direct(condition), indirect(exit_cell), is_compact=True)
+        yield node.body
+        self.__emit(Opcode.JP, self.builder.jump_target(start), is_compact=True)
+        self.builder.instruction_list[slot.position] = Instruction(
+            Opcode.ASSIGN, self.builder.address_of(self.builder.place_label()), direct(exit_cell), is_compact=True)
+        self.builder.loop_stack.pop()
+
+    def __break(self, node):
+        if not self.builder.loop_stack:
+            self.__report(node.token, 'No while found for break.')
+            return
+        self.__emit(Opcode.JP, indirect(self.builder.loop_stack[-1]))
+
+    def __return(self, node):
+        if node.value is None:
+            self.__emit(Opcode.ASSIGN, zero, result_address)
+        else:
+            value, _ = yield node.value
+            self.__emit(Opcode.ASSIGN, direct(value), result_address)
+            self.builder.pop_function_result(value)
+        self.__emit(Opcode.JP, return_target)
+
+    def __number(self, node):
+        token = node.token
+        return number(token.lexeme) if token.type == 'NUM' else immediate(token.lexeme), 'int'
+
+    def __name(self, node):
+        symbol = self.symbols.find_symbol_by_lexeme(node.name)
+        if symbol is None:
+            if node.name != 'output':
+                self.__report(node.token, f'{node.name} is not defined.')
+            return 0, 'int'
+        return symbol.address, 'array' if symbol.is_array else symbol.type
+
+    def __array_index(self, node):
+        array, _ = yield node.array
+        self.held.append(array)
+        index, _ = yield node.index
+        self.held.pop()
+        temporary = direct(self.builder.allocate_temporary())
+        self.__emit(Opcode.MULT, direct(index), word_size, temporary)
+        # An array parameter holds the address of the array, a declared array is at its own address.
+        base = direct(array) if array in self.builder.function_stack[0].parameters else immediate(array)
+        self.__emit(Opcode.ADD, base, temporary, temporary)
+        return indirect(temporary.value), 'int'
+
+    def __bin_op(self, node):
+        left, left_type = yield node.left
+        self.held.append(left)
+        right, right_type = yield node.right
+        self.held.pop()
+        if left_type != right_type:
+            self.__report(node.token, f'Type mismatch in operands, Got {left_type} instead of {right_type}.')
+        command = operation_commands[node.operator]
+        right = self.__off_stack(right)
+        left = self.__off_stack(left)
+        first, second = direct(left), direct(right)
+        # An operation on two constants is done here, and its value goes on as a constant.
+        if constant_value(first) is not None and constant_value(second) is not None:
+            value = evaluate(command, first.value, second.value)
+            if value is not None:
+                return immediate(value), left_type
+        temporary = self.builder.allocate_temporary()
+        self.__emit(command, first, second, direct(temporary))
+        return temporary, left_type
+
+    def __negate(self, node):
+        value, value_type = yield node.operand
+        return self.builder.negated(self.__off_stack(value)), value_type
+
+    def __assign(self, node):
+        target, target_type = yield node.target
+        self.held.append(target)
+        value, value_type = yield node.value
+        self.held.pop()
+        if target_type != value_type:
+            self.__report(node.token, f'Type mismatch in operands, Got {target_type} instead of {value_type}.')
+        target = self.__off_stack(target)
+        value = self.__off_stack(value)
+        self.__emit(Opcode.ASSIGN, direct(value), direct(target))
+        return value, target_type
+
+    def __call(self, node):
+        name = node.callee.name
+        arguments = node.arguments or []
+        function = self.symbols.find_symbol_by_lexeme(name)
+        if function is None and name == 'output':
+            return (yield from self.__output(arguments))
+        if function is None or not function.is_function:
+            # Nothing is called; the arguments are still checked.
+            if function is None:
+                self.__report(node.callee.token, f'{name} is not defined.')
+            for argument in arguments:
+                yield argument.value
+            return 0, 'int'
+
+        saved_cells = self.__save_cells(function)
+        self.builder.function_stack.append(function)
+        parameters = function.parameters
+        for position, argument in enumerate(arguments):
+            if position == len(parameters):
+                self.__report(argument.start_token, f'Mismatch in numbers of arguments of {name}.')
+            value, value_type = yield argument.value
+            if position >= len(parameters):
+                self.builder.pop_function_result(value)
+                continue
+            parameter = self.symbols.find_symbol_by_address(parameters[position])
+            expected_type = 'array' if parameter.is_array else parameter.type
+            if expected_type != value_type:
+                self.__report(argument.end_token, f'Mismatch in type of argument {position + 1} of {name}. '
+                                                  f'Expected {expected_type} but got {value_type} instead.')
+            if not parameter.is_array:
+                self.__emit(Opcode.ASSIGN, direct(value), direct(parameter.address))
+            elif self.__is_array_parameter_of(value, function):
+                self.__emit(Opcode.ASSIGN, direct(value), direct(parameter.address))
+            else:
+                self.__emit(Opcode.ASSIGN, immediate(value), direct(parameter.address))
+            self.builder.pop_function_result(value)
+        self.builder.function_stack.pop()
+
+        return_point = Label()
+        self.__emit(Opcode.ASSIGN, self.builder.address_of(return_point), return_address)
+        self.__emit(Opcode.JP, self.builder.jump_target(function.code_beginning))
+        self.builder.place_label(return_point)
+        for cell in reversed(saved_cells):
+            self.__emit(Opcode.ASSIGN, stack_top, direct(cell))
+            self.__emit(Opcode.SUB, stack_pointer, word_size, stack_pointer)
+        self.__emit(Opcode.ADD, stack_pointer, word_size, stack_pointer)
+        self.__emit(Opcode.ASSIGN, result_address, stack_top)
+        return stack_top, function.type
+
+    def __is_array_parameter_of(self, value, function):
+        # An array parameter passed on to the function it belongs to holds the address of the array already.
+        symbol = self.symbols.find_symbol_by_address(value)
+        return symbol is not None and symbol.is_array and value in function.parameters
+
+    def __output(self, arguments):
+        # The last argument is printed, and each one stays on the semantic stack until then.
+        self.builder.function_stack.append('output')
+        for position, argument in enumerate(arguments):
+            value, value_type = yield argument.value
+            if value_type != 'int':
+                self.__report(argument.end_token, f'Mismatch in type of argument {position + 1} of output. '
+                                                  f'Expected int but got {value_type} instead.')
+            self.held.append(value)
+        self.builder.function_stack.pop()
+        if arguments:
+            self.__emit(Opcode.PRINT, direct(self.held[-1]))
+            self.builder.pop_function_result(self.held[-1])
+            del self.held[-len(arguments):]
+        return 0, 'void'
+
+    def __save_cells(self, function):
+        # The cells saved on the runtime stack around a call to `function`, as `ExpressionProcessor.push_id` picks
+        # them, after they are pushed.
+        function_stack = self.builder.function_stack
+        caller = function_stack[0] if function_stack else function
+        self.builder.call_graph.setdefault(caller, set()).add(function)
+        saved_cells = []
+        for other in dict.fromkeys(function_stack):
+            if other != 'output' and self.builder.may_run(function, other):
+                saved_cells.extend(range(other.first_address, other.first_address + other.size * 4, 4))
+        saved_cells.append(return_address.value)
+        is_reentrant = self.builder.may_run(function, caller)
+        for value in reversed(self.held):
+            if type(value) is Operand and value.addressing is Addressing.INDIRECT:
+                value = value.value
+            if type(value) is int and value >= 500 and (is_reentrant or value == stack_pointer.value):
+                saved_cells.append(value)
+        for cell in saved_cells:
+            self.__emit(Opcode.ADD, stack_pointer, word_size, stack_pointer)
+            self.__emit(Opcode.ASSIGN, direct(cell), stack_top)
+        return saved_cells
@@ -0,0 +1,177 @@
+# Sepehr Vahedi
+# 99170615
+
+# Nodes keep the tokens the parser saw at each of their action and check symbols, so that lowering reports errors
+# with the same lexemes and line numbers as a syntax-directed run.
+
+
+class Program:
+    __slots__ = ('declarations', 'end_token')
+
+    def __init__(self):
+        self.declarations = []
+        self.end_token = None
+
+
+class VarDecl:
+    __slots__ = ('type_token', 'name_token', 'is_array', 'size_token')
+
+    def __init__(self, type_token, name_token, is_array, size_token):
+        # `size_token` is the token at the attribute action: the NUM of an array declaration, anything else for a
+        # scalar or an array parameter.
+        self.type_token = type_token
+        self.name_token = name_token
+        self.is_array = is_array
+        self.size_token = size_token
+
+    @property
+    def name(self):
+        return self.name_token.lexeme
+
+    @property
+    def type_name(self):
+        return self.type_token.lexeme
+
+
+class FunctionDecl:
+    __slots__ = ('type_token', 'name_token', 'params', 'body')
+
+    def __init__(self, type_token, name_token):
+        self.type_token = type_token
+        self.name_token = name_token
+        self.params = []
+        self.body = None
+
+    @property
+    def name(self):
+        return self.name_token.lexeme
+
+    @property
+    def type_name(self):
+        return self.type_token.lexeme
+
+
+class Compound:
+    __slots__ = ('declarations', 'statements')
+
+    def __init__(self):
+        self.declarations = []
+        self.statements = []
+
+
+class ExpressionStatement:
+    __slots__ = ('expression',)
+
+    def __init__(self, expression):
+        self.expression = expression
+
+
+class If:
+    __slots__ = ('condition', 'then_branch', 'has_else', 'else_branch')
+
+    def __init__(self, condition):
+        # A branch that is an empty statement is None, so `has_else` tells `if (c) s; else ; endif` apart.
+        self.condition = condition
+        self.then_branch = None
+        self.has_else = False
+        self.else_branch = None
+
+
+class While:
+    __slots__ = ('condition', 'body')
+
+    def __init__(self):
+        self.condition = None
+        self.body = None
+
+
+class Break:
+    __slots__ = ('token',)
+
+    def __init__(self, token):
+        self.token = token
+
+
+class Return:
+    __slots__ = ('value',)
+
+    def __init__(self, value=None):
+        self.value = value
+
+
+class Number:
+    __slots__ = ('token',)
+
+    def __init__(self, token):
+        self.token = token
+
+    @property
+    def value(self):
+        return int(self.token.lexeme)
+
+
+class Name:
+    __slots__ = ('token',)
+
+    def __init__(self, token):
+        self.token = token
+
+    @property
+    def name(self):
+        return self.token.lexeme
+
+
+class ArrayIndex:
+    __slots__ = ('array', 'index')
+
+    def __init__(self, array, index):
+        self.array = array
+        self.index = index
+
+
+class BinOp:
+    __slots__ = ('operator_token', 'left', 'right', 'token')
+
+    def __init__(self, operator_token, left, right, token):
+        self.operator_token = operator_token
+        self.left = left
+        self.right = right
+        self.token = token
+
+    @property
+    def operator(self):
+        return self.operator_token.lexeme
+
+
+class Negate:
+    __slots__ = ('operand',)
+
+    def __init__(self, operand):
+        self.operand = operand
+
+
+class Assign:
+    __slots__ = ('target', 'value', 'token')
+
+    def __init__(self, target, value, token):
+        self.target = target
+        self.value = value
+        self.token = token
+
+
+class Argument:
+    __slots__ = ('value', 'start_token', 'end_token')
+
+    def __init__(self, value, start_token, end_token):
+        self.value = value
+        self.start_token = start_token
+        self.end_token = end_token
+
+
+class Call:
+    __slots__ = ('callee', 'arguments')
+
+    def __init__(self, callee, arguments=None):
+        # `arguments` is None for `f()`, whose empty argument list runs no actions at all.
+        self.callee = callee
+        self.arguments = arguments
@@ -1,107 +1,136 @@
 # Sepehr Vahedi
 # 99170615
 
-from symbols import ActionSymbols
 from lexer import Token
+from intermediate_code_generator.instructions import Opcode, Instruction, Label, direct, immediate, indirect, \
+    stack_pointer, stack_top, return_target, result_address, zero
 
 
 class CodeGenerationActions:
     def __init__(self, builder):
         self.builder = builder
 
-    def execute_declaration_actions(self, action: ActionSymbols, token: Token):
-        if action == ActionSymbols.SET_DECLARING:
-            self.builder.symbol_registry.is_declaring = True
-        elif action == ActionSymbols.PUSH:
-            self.builder.operand_stack.append(token.lexeme)
-        elif action == ActionSymbols.UPDATE_TYPE:
-            stored_type = self.builder.operand_stack.pop()
+    def set_declaring(self, token: Token):
+        self.builder.symbol_registry.is_declaring = True
+
+    def push_type(self, token: Token):
+        self.builder.operand_stack.append(token.lexeme)
+
+    def update_type(self, token: Token):
+        stored_type = self.builder.operand_stack.pop()
+        # The type is updated before its name is matched; without one no symbol was added, and the parser reports the
+        # missing ID next.
+        if token.type == 'ID':
             self.builder.symbol_registry.update_type(stored_type)
-        elif action == ActionSymbols.UPDATE_VAR_ATTRIBUTES:
-            symbol = self.builder.symbol_registry.update_last_symbol()
-            if self.builder.function_stack:
-                self.builder.function_stack[-1].size += 1
-            if not self.builder.parameter_declaration_mode:
-                self.builder.instruction_list.append(f'(ASSIGN, #0, {symbol.address}, )')
-        elif action == ActionSymbols.UPDATE_ARR_ATTRIBUTES:
-            array_size = int(token.lexeme) if token.type == 'NUM' else 0
-            symbol = self.builder.symbol_registry.update_last_symbol(is_array=True, size=array_size)
-            if self.builder.function_stack:
-                self.builder.function_stack[-1].size += symbol.size
-            if not self.builder.parameter_declaration_mode:
-                current_address = symbol.address
-                for _ in range(symbol.size):
-                    self.builder.instruction_list.append(f'(ASSIGN, #0, {current_address}, )')
-                    current_address += 4
-
-    def execute_scope_actions(self, action: ActionSymbols):
-        if action == ActionSymbols.START_SCOPE:
-            self.builder.symbol_registry.add_scope()
-        elif action == ActionSymbols.START_FUNCTION:
-            self.builder.symbol_registry.add_scope()
-            self.builder.parameter_declaration_mode = True
-        elif action == ActionSymbols.END_SCOPE:
-            self.builder.symbol_registry.del_scope()
-
-    def execute_function_actions(self, action: ActionSymbols):
-        if action == ActionSymbols.UPDATE_FUNC_ATTRIBUTES:
-            self.builder.parameter_declaration_mode = False
-            func_symbol = self.builder.symbol_registry.update_last_function()
-            func_symbol.code_beginning = len(self.builder.instruction_list)
-            self.builder.function_stack.append(func_symbol)
-            if func_symbol.lexeme == 'main':
-                self.builder.instruction_list.append(f'(ASSIGN, #1000, 1000, )')
-                for address in range(100, self.builder.symbol_registry.last_used_address() + 4, 4):
-                    self.builder.instruction_list.append(f'(ASSIGN, #0, {address}, )')
-                self.builder.operand_stack.append(len(self.builder.instruction_list))
-                func_symbol.code_beginning = len(self.builder.instruction_list)
-                self.builder.instruction_list.append('')
-        elif action == ActionSymbols.RETURN_AT_THE_END_OF_FUNCTION:
-            symbol = self.builder.function_stack.pop()
-            self.builder.instruction_list.append(f'(ASSIGN, #0, 504, )')
-            self.builder.instruction_list.append(f'(JP, @500, , )')
-            if symbol.lexeme == 'main':
-                param_count = int((symbol.first_address - 100) / 4) + 1
-                self.builder.instruction_list[0] = f'(JP, {symbol.code_beginning - param_count}, , )'
-
-    def execute_control_flow_actions(self, action: ActionSymbols):
-        if action == ActionSymbols.LABEL:
-            self.builder.operand_stack.append(len(self.builder.instruction_list))
-        elif action == ActionSymbols.SAVE:
-            self.builder.operand_stack.append(len(self.builder.instruction_list))
-            self.builder.instruction_list.append('')
-        elif action == ActionSymbols.WHILE_SAVE:
+
+    def update_var_attributes(self, token: Token):
+        symbol = self.builder.symbol_registry.update_last_symbol()
+        if self.builder.function_stack:
+            self.builder.function_stack[-1].size += 1
+        if not self.builder.parameter_declaration_mode:
+            self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, zero, direct(symbol.address)))
+
+    def update_arr_attributes(self, token: Token):
+        array_size = int(token.lexeme) if token.type == 'NUM' else 0
+        symbol = self.builder.symbol_registry.update_last_symbol(is_array=True, size=array_size)
+        if self.builder.function_stack:
+            self.builder.function_stack[-1].size += symbol.size
+        if not self.builder.parameter_declaration_mode:
+            current_address = symbol.address
+            for _ in range(symbol.size):
+                self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, zero, direct(current_address)))
+                current_address += 4
+
+    def start_scope(self, token: Token):
+        self.builder.symbol_registry.add_scope()
+
+    def start_function(self, token: Token):
+        self.builder.symbol_registry.add_scope()
+        self.builder.parameter_declaration_mode = True
+
+    def end_scope(self, token: Token):
+        self.builder.symbol_registry.del_scope()
+
+    def update_func_attributes(self, token: Token):
+        self.builder.parameter_declaration_mode = False
+        func_symbol = self.builder.symbol_registry.update_last_function()
+        func_symbol.code_beginning = self.builder.place_label()
+        self.builder.function_stack.append(func_symbol)
+        if func_symbol.lexeme == 'main':
+            self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, immediate(1000), stack_pointer))
+            for address in range(100, self.builder.symbol_registry.last_used_address() + 4, 4):
+                self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, zero, direct(address)))
+            func_symbol.code_beginning = self.builder.reserve_slot()
+            self.builder.operand_stack.append(func_symbol.code_beginning)
+
+    def return_at_the_end_of_function(self, token: Token):
+        symbol = self.builder.function_stack.pop()
+        self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, zero, result_address))
+        self.builder.instruction_list.append(Instruction(Opcode.JP, return_target))
+        if symbol.lexeme == 'main':
+            param_count = int((symbol.first_address - 100) / 4) + 1
+            self.builder.instruction_list[0] = Instruction(
+                Opcode.JP, self.builder.jump_target(Label(symbol.code_beginning.position - param_count)))
+
+    def label(self, token: Token):
+        self.builder.operand_stack.append(self.builder.place_label())
+
+    def save(self, token: Token):
+        # The condition of an if is taken off the runtime stack before its jump, not squeezed in before it later.
+        if self.builder.operand_stack and self.builder.operand_stack[-1] == stack_top:
             self.builder.handle_function_result(-1)
-            temp_address = self.builder.allocate_temporary()
-            self.builder.loop_stack.append(temp_address)
-            self.builder.instruction_list.append(f'(JPF, {self.builder.operand_stack[-1]}, @{temp_address},)')
-            self.builder.pop_operands(1)
-        elif action == ActionSymbols.WHILE:
-            current_index = len(self.builder.instruction_list)
-            self.builder.instruction_list[self.builder.operand_stack[-2]] = f'(ASSIGN, #{current_index + 1}, {self.builder.loop_stack[-1]},)'
-            self.builder.instruction_list.append(f'(JP, {self.builder.operand_stack[-1]}, ,)')
-            self.builder.loop_stack.pop()
-            self.builder.pop_operands(2)
-        elif action == ActionSymbols.JPF_SAVE:
-            current_index = len(self.builder.instruction_list)
-            if self.builder.handle_function_result(-2, self.builder.operand_stack[-1]):
-                self.builder.instruction_list[self.builder.operand_stack[-1] + 2] = f'(JPF, {self.builder.operand_stack[-2]}, {current_index + 3},)'
-            else:
-                self.builder.instruction_list[self.builder.operand_stack[-1]] = f'(JPF, {self.builder.operand_stack[-2]}, {current_index + 1},)'
-            self.builder.pop_operands(2)
-            self.builder.operand_stack.append(len(self.builder.instruction_list))
-            self.builder.instruction_list.append('')
-        elif action == ActionSymbols.JP:
-            current_index = len(self.builder.instruction_list)
-            self.builder.instruction_list[self.builder.operand_stack[-1]] = f'(JP, {current_index}, ,)'
-            self.builder.pop_operands(1)
-        elif action == ActionSymbols.JPF:
-            current_index = len(self.builder.instruction_list)
-            if self.builder.handle_function_result(-2, self.builder.operand_stack[-1]):
-                self.builder.instruction_list[self.builder.operand_stack[-1] + 2] = f'(JPF, {self.builder.operand_stack[-2]}, {current_index + 2},)'
-            else:
-                self.builder.instruction_list[self.builder.operand_stack[-1]] = f'(JPF, {self.builder.operand_stack[-2]}, {current_index},)'
-            self.builder.pop_operands(2)
-        elif action == ActionSymbols.BREAK:
-            if self.builder.loop_stack:
-                self.builder.instruction_list.append(f'(JP, @{self.builder.loop_stack[-1]}, , )')
+        self.builder.operand_stack.append(self.builder.reserve_slot())
+
+    def while_save(self, token: Token):
+        self.builder.handle_function_result(-1)
+        temp_address = self.builder.allocate_temporary()
+        self.builder.loop_stack.append(temp_address)
+        self.builder.instruction_list.append(Instruction(Opcode.JPF, direct(self.builder.operand_stack[-1]),
+                                                         indirect(temp_address), is_compact=True))
+        self.builder.pop_operands(1)
+
+    def end_while(self, token: Token):
+        slot = self.builder.reserved_slot(-2, 2, token)
+        if slot is None:
+            del self.builder.loop_stack[-1:]
+            return
+        start = self.builder.jump_target(self.builder.operand_stack[-1])
+        self.builder.instruction_list.append(Instruction(Opcode.JP, start, is_compact=True))
+        self.builder.instruction_list[slot.position] = Instruction(
+            Opcode.ASSIGN, self.builder.address_of(self.builder.place_label()), direct(self.builder.loop_stack[-1]),
+            is_compact=True)
+        self.builder.loop_stack.pop()
+        self.builder.pop_operands(2)
+
+    def jpf_save(self, token: Token):
+        slot = self.builder.reserved_slot(-1, 2, token)
+        jump = self.builder.reserve_slot()
+        if slot is None:
+            self.builder.operand_stack.append(jump)
+            return
+        self.builder.instruction_list[slot.position] = Instruction(
+            Opcode.JPF, direct(self.builder.operand_stack[-2]), self.builder.jump_target(self.builder.place_label()),
+            is_compact=True)
+        self.builder.pop_operands(2)
+        self.builder.operand_stack.append(jump)
+
+    def jp(self, token: Token):
+        slot = self.builder.reserved_slot(-1, 1, token)
+        if slot is None:
+            return
+        self.builder.instruction_list[slot.position] = Instruction(
+            Opcode.JP, self.builder.jump_target(self.builder.place_label()), is_compact=True)
+        self.builder.pop_operands(1)
+
+    def jpf(self, token: Token):
+        slot = self.builder.reserved_slot(-1, 2, token)
+        if slot is None:
+            return
+        self.builder.instruction_list[slot.position] = Instruction(
+            Opcode.JPF, direct(self.builder.operand_stack[-2]), self.builder.jump_target(self.builder.place_label()),
+            is_compact=True)
+        self.builder.pop_operands(2)
+
+    def break_loop(self, token: Token):
+        if self.builder.loop_stack:
+            self.builder.instruction_list.append(Instruction(Opcode.JP, indirect(self.builder.loop_stack[-1])))
@@ -6,213 +6,283 @@ from lexer import Token
 
 from symbols import CheckSymbols
 from intermediate_code_generator.intermediate_code_builder import IntermediateCodeBuilder
+from intermediate_code_generator.code_generation_actions import CodeGenerationActions
+from intermediate_code_generator.instructions import Opcode, Addressing, Operand, Instruction, direct, immediate, \
+    number, indirect, Label, stack_pointer, stack_top, word_size, return_address, return_target, result_address, \
+    zero, evaluate, constant_value
 from symbols import SymbolTable
+from diagnostics import Diagnostics, Phases
+
+operation_commands = {'*': Opcode.MULT, '/': Opcode.DIV, '+': Opcode.ADD, '-': Opcode.SUB, '<': Opcode.LT,
+                      '==': Opcode.EQ}
 
 
 class ExpressionProcessor:
     def __init__(self, builder):
         self.builder = builder
+        actions = CodeGenerationActions(builder)
+        handlers = {
+            ActionSymbols.SET_DECLARING: actions.set_declaring,
+            ActionSymbols.PUSH: actions.push_type,
+            ActionSymbols.UPDATE_TYPE: actions.update_type,
+            ActionSymbols.UPDATE_VAR_ATTRIBUTES: actions.update_var_attributes,
+            ActionSymbols.UPDATE_ARR_ATTRIBUTES: actions.update_arr_attributes,
+            ActionSymbols.START_SCOPE: actions.start_scope,
+            ActionSymbols.START_FUNCTION: actions.start_function,
+            ActionSymbols.END_SCOPE: actions.end_scope,
+            ActionSymbols.UPDATE_FUNC_ATTRIBUTES: actions.update_func_attributes,
+            ActionSymbols.RETURN_AT_THE_END_OF_FUNCTION: actions.return_at_the_end_of_function,
+            ActionSymbols.LABEL: actions.label,
+            ActionSymbols.SAVE: actions.save,
+            ActionSymbols.WHILE_SAVE: actions.while_save,
+            ActionSymbols.WHILE: actions.end_while,
+            ActionSymbols.JPF_SAVE: actions.jpf_save,
+            ActionSymbols.JP: actions.jp,
+            ActionSymbols.JPF: actions.jpf,
+            ActionSymbols.BREAK: actions.break_loop,
+            ActionSymbols.PUSH_ID: self.push_id,
+            ActionSymbols.ASSIGN: self.assign,
+            ActionSymbols.OPERATION: self.operation,
+            ActionSymbols.NEG: self.negate,
+            ActionSymbols.UPDATE_ID: self.update_id,
+            ActionSymbols.SAVE_NUM: self.save_num,
+            ActionSymbols.POP: self.pop,
+            ActionSymbols.PUSH_ZERO: self.push_zero,
+            ActionSymbols.TYPE_POP: self.type_pop,
+            ActionSymbols.NEW_ARG: self.new_arg,
+            ActionSymbols.CALL: self.call,
+            ActionSymbols.END_OF_PROGRAM: self.end_of_program,
+            ActionSymbols.RETURN: self.return_void,
+            ActionSymbols.RETURN_VALUE: self.return_value,
+        }
+        # Handlers are bound once and looked up by the value of the action symbol.
+        self.handlers = [None] * (max(action.value for action in ActionSymbols) + 1)
+        for action, handler in handlers.items():
+            self.handlers[action.value] = handler
 
-    def process_identifiers(self, action: ActionSymbols, token: Token):
-        if action == ActionSymbols.PUSH_ID:
-            symbol = self.builder.symbol_registry.find_symbol_by_lexeme(token.lexeme)
-            if not symbol:
-                if token.lexeme == 'output':
-                    self.builder.function_stack.append('output')
-                    self.builder.data_type_stack.append('void')
-            elif symbol.is_function:
-                self.builder.function_stack.append(symbol)
-                current_addr = symbol.first_address
-                for _ in range(symbol.size):
-                    self.builder.instruction_list.append(f'(ADD, 1000, #4, 1000)')
-                    self.builder.instruction_list.append(f'(ASSIGN, {current_addr}, @1000, )')
-                    current_addr += 4
-                self.builder.instruction_list.append(f'(ADD, 1000, #4, 1000)')
-                self.builder.instruction_list.append(f'(ASSIGN, 500, @1000, )')
-
-                for stack_item in reversed(self.builder.operand_stack):
-                    if type(stack_item) is int and stack_item >= 500:
-                        self.builder.instruction_list.append(f'(ADD, 1000, #4, 1000)')
-                        self.builder.instruction_list.append(f'(ASSIGN, {stack_item}, @1000, )')
-                    if type(stack_item) is str and stack_item[0] == '@' and int(stack_item[1:]) >= 500:
-                        self.builder.instruction_list.append(f'(ADD, 1000, #4, 1000)')
-                        self.builder.instruction_list.append(f'(ASSIGN, {stack_item[1:]}, @1000, )')
-                self.builder.data_type_stack.append(symbol.type)
+    def push_id(self, token: Token):
+        symbol = self.builder.symbol_registry.find_symbol_by_lexeme(token.lexeme)
+        if not symbol:
+            if token.lexeme == 'output':
+                self.builder.function_stack.append('output')
+                self.builder.data_type_stack.append('void')
+        elif symbol.is_function:
+            caller = self.builder.function_stack[0] if self.builder.function_stack else symbol
+            self.builder.call_graph.setdefault(caller, set()).add(symbol)
+            # The parameters and locals of a function are saved only when the call can run it again while they are in
+            # use: the function being generated calls itself, or a call to the function is waiting on this one for
+            # the rest of its arguments. The temporaries on the operand stack are live across the call, but only a
+            # call that comes back to the function being generated can write them. A result waiting on the runtime
+            # stack keeps the stack pointer saved.
+            saved_cells = []
+            for function in dict.fromkeys(self.builder.function_stack):
+                if function != 'output' and self.builder.may_run(symbol, function):
+                    saved_cells.extend(range(function.first_address, function.first_address + function.size * 4, 4))
+            saved_cells.append(return_address.value)
+            is_reentrant = self.builder.may_run(symbol, caller)
+            for stack_item in reversed(self.builder.operand_stack):
+                if type(stack_item) is Operand and stack_item.addressing is Addressing.INDIRECT:
+                    stack_item = stack_item.value
+                if type(stack_item) is int and stack_item >= 500 and (is_reentrant or
+                                                                       stack_item == stack_pointer.value):
+                    saved_cells.append(stack_item)
+            self.builder.function_stack.append(symbol)
+            for cell in saved_cells:
+                self.builder.instruction_list.append(Instruction(Opcode.ADD, stack_pointer, word_size, stack_pointer))
+                self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, direct(cell), stack_top))
+            self.builder.saved_cells_stack.append(saved_cells)
+            self.builder.data_type_stack.append(symbol.type)
+        else:
+            self.builder.operand_stack.append(symbol.address)
+            if symbol.is_array:
+                self.builder.data_type_stack.append('array')
             else:
-                self.builder.operand_stack.append(symbol.address)
-                if symbol.is_array:
-                    self.builder.data_type_stack.append('array')
-                else:
-                    self.builder.data_type_stack.append(symbol.type)
+                self.builder.data_type_stack.append(symbol.type)
 
-    def process_operations(self, action: ActionSymbols):
-        if action == ActionSymbols.ASSIGN:
-            self.builder.handle_function_result(-2)
-            self.builder.handle_function_result(-1)
-            self.builder.instruction_list.append(f'(ASSIGN, {self.builder.operand_stack[-1]}, {self.builder.operand_stack[-2]}, )')
-            self.builder.operand_stack.pop(-2)
-            self.builder.data_type_stack.pop()
-        elif action == ActionSymbols.OPERATION:
-            operator = self.builder.operand_stack.pop(-2)
-            operation_map = {'*': 'MULT', '/': 'DIV', '+': 'ADD', '-': 'SUB', '<': 'LT', '==': 'EQ'}
-            command = operation_map[operator]
-            self.builder.handle_function_result(-1)
-            self.builder.handle_function_result(-2)
+    def assign(self, token: Token):
+        self.builder.handle_function_result(-2)
+        self.builder.handle_function_result(-1)
+        self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, direct(self.builder.operand_stack[-1]),
+                                                         direct(self.builder.operand_stack[-2])))
+        self.builder.operand_stack.pop(-2)
+        self.builder.data_type_stack.pop()
+
+    def operation(self, token: Token):
+        operator = self.builder.operand_stack.pop(-2)
+        command = operation_commands[operator]
+        self.builder.handle_function_result(-1)
+        self.builder.handle_function_result(-2)
+        first, second = direct(self.builder.operand_stack[-2]), direct(self.builder.operand_stack[-1])
+        # An operation on two constants is done here, and its value goes on as a constant.
+        value = None
+        if constant_value(first) is not None and constant_value(second) is not None:
+            value = evaluate(command, first.value, second.value)
+        self.builder.pop_operands(2)
+        if value is not None:
+            self.builder.operand_stack.append(immediate(value))
+        else:
             temp_location = self.builder.allocate_temporary()
-            self.builder.instruction_list.append(f'({command}, {self.builder.operand_stack[-2]}, {self.builder.operand_stack[-1]}, {temp_location})')
-            self.builder.pop_operands(2)
+            self.builder.instruction_list.append(Instruction(command, first, second, direct(temp_location)))
             self.builder.operand_stack.append(temp_location)
-            self.builder.data_type_stack.pop()
-        elif action == ActionSymbols.NEG:
-            self.builder.handle_function_result(-1)
-            self.builder.instruction_list.append(f'(MULT, {self.builder.operand_stack[-1]}, #-1, {self.builder.operand_stack[-1]})')
-        elif action == ActionSymbols.UPDATE_ID:
-            temp_location = self.builder.allocate_temporary()
-            self.builder.instruction_list.append(f'(MULT, {self.builder.operand_stack[-1]}, #4, {temp_location})')
-            if self.builder.operand_stack[-2] in self.builder.function_stack[0].parameters:
-                self.builder.instruction_list.append(f'(ADD, {self.builder.operand_stack[-2]}, {temp_location}, {temp_location})')
-            else:
-                self.builder.instruction_list.append(f'(ADD, #{self.builder.operand_stack[-2]}, {temp_location}, {temp_location})')
-            self.builder.pop_operands(2)
-            self.builder.operand_stack.append(f'@{temp_location}')
-            self.builder.data_type_stack.pop()
-            self.builder.data_type_stack.pop()
-            self.builder.data_type_stack.append('int')
-
-    def process_literals_and_cleanup(self, action: ActionSymbols, token: Token):
-        if action == ActionSymbols.SAVE_NUM:
-            self.builder.operand_stack.append(f'#{token.lexeme}')
-            self.builder.data_type_stack.append('int')
-        elif action == ActionSymbols.POP:
-            if self.builder.operand_stack[-1] == '@1000':
-                self.builder.instruction_list.append(f'(SUB, 1000, #4, 1000)')
-            self.builder.pop_operands()
-        elif action == ActionSymbols.PUSH_ZERO:
+        self.builder.data_type_stack.pop()
+
+    def negate(self, token: Token):
+        self.builder.handle_function_result(-1)
+        self.builder.operand_stack[-1] = self.builder.negated(self.builder.operand_stack[-1])
+
+    def update_id(self, token: Token):
+        temp_location = self.builder.allocate_temporary()
+        temp_operand = direct(temp_location)
+        self.builder.instruction_list.append(Instruction(Opcode.MULT, direct(self.builder.operand_stack[-1]), word_size,
+                                                         temp_operand))
+        # An array parameter holds the address of the array, a declared array is at its own address.
+        if self.builder.operand_stack[-2] in self.builder.function_stack[0].parameters:
+            base = direct(self.builder.operand_stack[-2])
+        else:
+            base = immediate(self.builder.operand_stack[-2])
+        self.builder.instruction_list.append(Instruction(Opcode.ADD, base, temp_operand, temp_operand))
+        self.builder.pop_operands(2)
+        self.builder.operand_stack.append(indirect(temp_location))
+        self.builder.data_type_stack.pop()
+        self.builder.data_type_stack.pop()
+        self.builder.data_type_stack.append('int')
+
+    def save_num(self, token: Token):
+        # Recovery from a missing number runs this action at another token, whose lexeme is kept as it is.
+        self.builder.operand_stack.append(number(token.lexeme) if token.type == 'NUM' else immediate(token.lexeme))
+        self.builder.data_type_stack.append('int')
+
+    def pop(self, token: Token):
+        self.builder.pop_function_result(self.builder.operand_stack[-1])
+        self.builder.pop_operands()
+
+    def push_zero(self, token: Token):
+        self.builder.operand_stack.append(0)
+
+    def type_pop(self, token: Token):
+        self.builder.data_type_stack.pop()
+
+    def new_arg(self, token: Token):
+        if self.builder.function_stack[-1] == 'output':
+            self.builder.operand_stack.pop(-2)
             self.builder.operand_stack.append(0)
-        elif action == ActionSymbols.TYPE_POP:
-            self.builder.data_type_stack.pop()
-
-    def process_function_calls(self, action: ActionSymbols):
-        if action == ActionSymbols.NEW_ARG:
-            if self.builder.function_stack[-1] == 'output':
-                self.builder.operand_stack.pop(-2)
-                self.builder.operand_stack.append(0)
-            else:
-                arg_value = self.builder.operand_stack.pop()
-                arg_position = self.builder.operand_stack.pop()
-                if arg_position < len(self.builder.function_stack[-1].parameters):
-                    param_addr = self.builder.function_stack[-1].parameters[arg_position]
-                    if self.builder.symbol_registry.find_symbol_by_address(param_addr).is_array:
-                        if self.builder.symbol_registry.find_symbol_by_address(arg_value) \
-                                and self.builder.symbol_registry.find_symbol_by_address(arg_value).is_array \
-                                and arg_value in self.builder.function_stack[-1].parameters:
-                            self.builder.instruction_list.append(f'(ASSIGN, {arg_value}, {param_addr}, )')
-                        else:
-                            self.builder.instruction_list.append(f'(ASSIGN, #{arg_value}, {param_addr}, )')
+        else:
+            arg_value = self.builder.operand_stack.pop()
+            arg_position = self.builder.operand_stack.pop()
+            if arg_position < len(self.builder.function_stack[-1].parameters):
+                param_addr = self.builder.function_stack[-1].parameters[arg_position]
+                if self.builder.symbol_registry.find_symbol_by_address(param_addr).is_array:
+                    if self.builder.symbol_registry.find_symbol_by_address(arg_value) \
+                            and self.builder.symbol_registry.find_symbol_by_address(arg_value).is_array \
+                            and arg_value in self.builder.function_stack[-1].parameters:
+                        self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, direct(arg_value),
+                                                                         direct(param_addr)))
                     else:
-                        self.builder.instruction_list.append(f'(ASSIGN, {arg_value}, {param_addr}, )')
-                self.builder.operand_stack.append(arg_position + 1)
-        elif action == ActionSymbols.CALL:
-            function_called = self.builder.function_stack.pop()
-            if function_called == 'output':
-                output_value = self.builder.operand_stack.pop()
-                self.builder.instruction_list.append(f'(PRINT, {output_value}, , )')
-                self.builder.operand_stack.append(0)
-            else:
-                current_index = len(self.builder.instruction_list)
-                self.builder.instruction_list.append(f'(ASSIGN, #{current_index + 2}, 500, )')
-                self.builder.instruction_list.append(f'(JP, {function_called.code_beginning}, , )')
-
-                for stack_item in self.builder.operand_stack:
-                    if type(stack_item) is int and stack_item >= 500:
-                        self.builder.instruction_list.append(f'(ASSIGN, @1000, {stack_item}, )')
-                        self.builder.instruction_list.append(f'(SUB, 1000, #4, 1000)')
-                    if type(stack_item) is str and stack_item[0] == '@' and int(stack_item[1:]) >= 500:
-                        self.builder.instruction_list.append(f'(ASSIGN, @1000, {stack_item[1:]}, )')
-                        self.builder.instruction_list.append(f'(SUB, 1000, #4, 1000)')
-
-                self.builder.instruction_list.append(f'(ASSIGN, @1000, 500, )')
-                self.builder.instruction_list.append(f'(SUB, 1000, #4, 1000)')
-                final_address = function_called.first_address + (function_called.size - 1) * 4
-                current_addr = final_address
-                for _ in range(function_called.size):
-                    self.builder.instruction_list.append(f'(ASSIGN, @1000, {current_addr}, )')
-                    self.builder.instruction_list.append(f'(SUB, 1000, #4, 1000)')
-                    current_addr -= 4
-                self.builder.instruction_list.append(f'(ADD, 1000, #4, 1000)')
-                self.builder.instruction_list.append(f'(ASSIGN, 504, @1000, )')
-                self.builder.operand_stack.append('@1000')
-
-    def process_return_statements(self, action: ActionSymbols):
-        if action == ActionSymbols.END_OF_PROGRAM:
-            program_address = self.builder.operand_stack.pop()
-            final_index = len(self.builder.instruction_list)
-            self.builder.instruction_list[program_address] = f'(ASSIGN, #{final_index}, 500, )'
-        elif action == ActionSymbols.RETURN:
-            self.builder.instruction_list.append(f'(ASSIGN, #0, 504, )')
-            self.builder.instruction_list.append(f'(JP, @500, , )')
-        elif action == ActionSymbols.RETURN_VALUE:
-            return_value = self.builder.operand_stack.pop()
-            self.builder.instruction_list.append(f'(ASSIGN, {return_value}, 504, )')
-            self.builder.instruction_list.append(f'(JP, @500, , )')
+                        self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, immediate(arg_value),
+                                                                         direct(param_addr)))
+                else:
+                    self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, direct(arg_value),
+                                                                     direct(param_addr)))
+            self.builder.pop_function_result(arg_value)
+            self.builder.operand_stack.append(arg_position + 1)
 
-    def execute_code_generation(self, action_type: ActionSymbols, current_token: Token):
-        action_processor = CodeGenerationActions(self.builder)
-
-        # Declaration actions
-        if action_type in [ActionSymbols.SET_DECLARING, ActionSymbols.PUSH, ActionSymbols.UPDATE_TYPE,
-                           ActionSymbols.UPDATE_VAR_ATTRIBUTES, ActionSymbols.UPDATE_ARR_ATTRIBUTES]:
-            action_processor.execute_declaration_actions(action_type, current_token)
-
-        # Scope actions
-        elif action_type in [ActionSymbols.START_SCOPE, ActionSymbols.START_FUNCTION, ActionSymbols.END_SCOPE]:
-            action_processor.execute_scope_actions(action_type)
-
-        # Function actions
-        elif action_type in [ActionSymbols.UPDATE_FUNC_ATTRIBUTES, ActionSymbols.RETURN_AT_THE_END_OF_FUNCTION]:
-            action_processor.execute_function_actions(action_type)
-
-        # Control flow actions
-        elif action_type in [ActionSymbols.LABEL, ActionSymbols.SAVE, ActionSymbols.WHILE_SAVE, ActionSymbols.WHILE,
-                             ActionSymbols.JPF_SAVE, ActionSymbols.JP, ActionSymbols.JPF, ActionSymbols.BREAK]:
-            action_processor.execute_control_flow_actions(action_type)
-
-        # Expression and operation actions
-        elif action_type in [ActionSymbols.PUSH_ID]:
-            self.process_identifiers(action_type, current_token)
-        elif action_type in [ActionSymbols.ASSIGN, ActionSymbols.OPERATION, ActionSymbols.NEG, ActionSymbols.UPDATE_ID]:
-            self.process_operations(action_type)
-        elif action_type in [ActionSymbols.SAVE_NUM, ActionSymbols.POP, ActionSymbols.PUSH_ZERO, ActionSymbols.TYPE_POP]:
-            self.process_literals_and_cleanup(action_type, current_token)
-        elif action_type in [ActionSymbols.NEW_ARG, ActionSymbols.CALL]:
-            self.process_function_calls(action_type)
-        elif action_type in [ActionSymbols.END_OF_PROGRAM, ActionSymbols.RETURN, ActionSymbols.RETURN_VALUE]:
-            self.process_return_statements(action_type)
+    def call(self, token: Token):
+        function_called = self.builder.function_stack.pop()
+        if function_called == 'output':
+            output_value = self.builder.operand_stack.pop()
+            self.builder.instruction_list.append(Instruction(Opcode.PRINT, direct(output_value)))
+            self.builder.pop_function_result(output_value)
+            self.builder.operand_stack.append(0)
+        else:
+            return_point = Label()
+            self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, self.builder.address_of(return_point),
+                                                             return_address))
+            self.builder.instruction_list.append(Instruction(Opcode.JP,
+                                                             self.builder.jump_target(function_called.code_beginning)))
+            self.builder.place_label(return_point)
 
+            saved_cells = self.builder.saved_cells_stack.pop() if self.builder.saved_cells_stack else []
+            for cell in reversed(saved_cells):
+                self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, stack_top, direct(cell)))
+                self.builder.instruction_list.append(Instruction(Opcode.SUB, stack_pointer, word_size, stack_pointer))
+            self.builder.instruction_list.append(Instruction(Opcode.ADD, stack_pointer, word_size, stack_pointer))
+            self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, result_address, stack_top))
+            self.builder.operand_stack.append(stack_top)
 
-from intermediate_code_generator.code_generation_actions import CodeGenerationActions
+    def end_of_program(self, token: Token):
+        program_slot = self.builder.reserved_slot(-1, 1, token)
+        if program_slot is None:
+            return
+        self.builder.operand_stack.pop()
+        self.builder.instruction_list[program_slot.position] = Instruction(
+            Opcode.ASSIGN, self.builder.address_of(self.builder.place_label()), return_address)
+
+    def return_void(self, token: Token):
+        self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, zero, result_address))
+        self.builder.instruction_list.append(Instruction(Opcode.JP, return_target))
+
+    def return_value(self, token: Token):
+        return_value = self.builder.operand_stack.pop()
+        self.builder.instruction_list.append(Instruction(Opcode.ASSIGN, direct(return_value), result_address))
+        self.builder.pop_function_result(return_value)
+        self.builder.instruction_list.append(Instruction(Opcode.JP, return_target))
+
+    def execute_code_generation(self, action_type: ActionSymbols, current_token: Token):
+        self.handlers[action_type.value](current_token)
 
 
 class CodeGenerator:
-    def __init__(self, symbol_table: SymbolTable):
-        self.builder = IntermediateCodeBuilder(symbol_table)
+    def __init__(self, symbol_table: SymbolTable, diagnostics: Diagnostics = None):
+        self.builder = IntermediateCodeBuilder(symbol_table, diagnostics)
         self.processor = ExpressionProcessor(self.builder)
+        self.is_stalled = False
 
     def print_pb(self):
         self.builder.display_instructions()
 
     def semantic_check(self, check_symbol: CheckSymbols, current_token: Token):
-        self.builder.validate_semantics(check_symbol, current_token)
+        if self.is_stalled:
+            return
+        try:
+            self.builder.validators[check_symbol.value](current_token)
+        except (IndexError, KeyError, AttributeError, TypeError):
+            self.__stall()
 
     def code_gen(self, action_symbol: ActionSymbols, current_token: Token):
-        self.processor.execute_code_generation(action_symbol, current_token)
+        if self.is_stalled:
+            return
+        try:
+            self.processor.handlers[action_symbol.value](current_token)
+        except (IndexError, KeyError, AttributeError, TypeError):
+            self.__stall()
+
+    def __stall(self):
+        # Recovery from a syntax error can run the actions of a construct only in part, and a later action then
+        # finds the semantic stacks out of step with the input. Nothing is generated or checked from there on, and
+        # the code is discarded. Without a syntax error such a failure is a bug and is raised again.
+        if not self.builder.diagnostics.count(Phases.SYNTAX):
+            raise
+        self.is_stalled = True
+        self.builder.error_state = True
 
     @property
     def semantic_stack(self):
         return self.builder.operand_stack
 
+    def optimize(self, *optimizations):
+        # Passes over the finished code, run before its labels are resolved; each one takes the instructions and
+        # returns the new ones.
+        for optimization in optimizations:
+            self.builder.instruction_list = optimization(self.builder.instruction_list)
+
+    def discard_code(self):
+        # Code with semantic errors is not written; output.txt then says that no code was generated.
+        self.builder.instruction_list = []
+        self.builder.label_operands.clear()
+
     @property
     def program_block(self):
+        self.builder.resolve_labels()
         return self.builder.instruction_list
 
     @property
@@ -0,0 +1,164 @@
+# Sepehr Vahedi
+# 99170615
+
+from enum import Enum
+
+
+class Opcode(Enum):
+    ADD = 'ADD'
+    SUB = 'SUB'
+    MULT = 'MULT'
+    DIV = 'DIV'
+    EQ = 'EQ'
+    LT = 'LT'
+    ASSIGN = 'ASSIGN'
+    JPF = 'JPF'
+    JP = 'JP'
+    PRINT = 'PRINT'
+
+
+class Addressing(Enum):
+    DIRECT = ''
+    IMMEDIATE = '#'
+    INDIRECT = '@'
+
+
+class Operand:
+    # Operands are shared between instructions and the semantic stack, so they are never changed once made; only an
+    # operand that refers to a label, which belongs to a single instruction, gets its address when the code is done.
+    __slots__ = ('addressing', 'value', 'text')
+
+    def __init__(self, addressing: Addressing, value, text: str = None):
+        self.addressing = addressing
+        self.value = value
+        self.text = f'{addressing.value}{value}' if text is None else text
+
+    def __eq__(self, other):
+        return type(other) is Operand and self.addressing is other.addressing and self.value == other.value
+
+    def __hash__(self):
+        return hash((self.addressing, self.value))
+
+    def __str__(self):
+        return self.text
+
+
+class Label:
+    # A code address, known once the code it marks is generated; backpatched jumps and return addresses refer to
+    # labels, so code never has to be inserted or renumbered.
+    __slots__ = ('position',)
+
+    def __init__(self, position=None):
+        self.position = position
+
+    def __str__(self):
+        return str(self.position)
+
+
+class Instruction:
+    __slots__ = ('opcode', 'first', 'second', 'third', 'is_compact')
+
+    def __init__(self, opcode: Opcode, first: Operand, second: Operand = None, third: Operand = None,
+                 is_compact=False):
+        # The statement actions have always written their instructions without a space before the closing
+        # parenthesis, e.g. `(JP, 13, ,)`; `is_compact` keeps that in the output.
+        self.opcode = opcode
+        self.first = first
+        self.second = second
+        self.third = third
+        self.is_compact = is_compact
+
+    def __str__(self):
+        second = '' if self.second is None else self.second.text
+        third = '' if self.third is None else self.third.text
+        if self.is_compact:
+            return f'({self.opcode.value}, {self.first.text}, {second},{third})'
+        return f'({self.opcode.value}, {self.first.text}, {second}, {third})'
+
+
+# Operands are interned, as a program uses the same few addresses and constants over and over.
+direct_operands = {}
+immediate_operands = {}
+indirect_operands = {}
+
+
+def direct(value):
+    # Addresses on the semantic stack are plain ints; anything else there is an operand already.
+    if type(value) is Operand:
+        return value
+    interned = direct_operands.get(value)
+    if interned is None:
+        interned = direct_operands[value] = Operand(Addressing.DIRECT, value)
+    return interned
+
+
+def immediate(value):
+    interned = immediate_operands.get(value)
+    if interned is None:
+        interned = immediate_operands[value] = Operand(Addressing.IMMEDIATE, value)
+    return interned
+
+
+def number(lexeme: str):
+    # A literal keeps the text it is written with, so one with leading zeros, such as 007, is written as #007; such a
+    # literal gets an operand of its own, as the interned one prints the value as #7.
+    value = int(lexeme)
+    if str(value) == lexeme:
+        return immediate(value)
+    return Operand(Addressing.IMMEDIATE, value, f'{Addressing.IMMEDIATE.value}{lexeme}')
+
+
+def indirect(address):
+    interned = indirect_operands.get(address)
+    if interned is None:
+        interned = indirect_operands[address] = Operand(Addressing.INDIRECT, address)
+    return interned
+
+
+def code_address(operand: Operand):
+    # The address that a jump target or return address stands for, whether its label is resolved yet or not.
+    value = operand.value
+    return value.position if type(value) is Label else value
+
+
+constant_operations = {
+    Opcode.ADD: lambda first, second: first + second,
+    Opcode.SUB: lambda first, second: first - second,
+    Opcode.MULT: lambda first, second: first * second,
+    # The VM divides like C, rounding toward zero.
+    Opcode.DIV: lambda first, second: abs(first) // abs(second) * (1 if (first < 0) == (second < 0) else -1),
+    Opcode.LT: lambda first, second: int(first < second),
+    Opcode.EQ: lambda first, second: int(first == second),
+}
+
+
+def evaluate(opcode: Opcode, first: int, second: int):
+    # The value of an operation on two constants, or None when it is left for the VM: a division by zero, or a result
+    # that does not fit in a word.
+    if opcode is Opcode.DIV and second == 0:
+        return None
+    value = constant_operations[opcode](first, second)
+    return value if -2 ** 31 <= value < 2 ** 31 else None
+
+
+def constant_value(operand: Operand):
+    # The number an immediate operand stands for, or None for anything else, code addresses included.
+    if operand.addressing is Addressing.IMMEDIATE and type(operand.value) is int:
+        return operand.value
+    return None
+
+
+def resolve_label(operand: Operand):
+    operand.value = operand.value.position
+    operand.text = f'{operand.addressing.value}{operand.value}'
+
+
+stack_pointer = direct(1000)
+stack_top = indirect(1000)
+word_size = immediate(4)
+return_address = direct(500)
+return_target = indirect(500)
+result_address = direct(504)
+zero = immediate(0)
+# Temporaries take the cells from here on, up to the stack pointer at 1000.
+first_temporary = 508
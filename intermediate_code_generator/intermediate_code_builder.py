@@ -4,99 +4,196 @@
 from symbols import CheckSymbols
 from lexer import Token
 from symbols import SymbolTable
+from diagnostics import Diagnostics, Phases
+from intermediate_code_generator.instructions import Opcode, Addressing, Operand, Instruction, Label, direct, \
+    immediate, stack_pointer, stack_top, word_size, resolve_label, first_temporary, constant_value
 
 
 class IntermediateCodeBuilder:
-    def __init__(self, symbol_registry: SymbolTable):
+    def __init__(self, symbol_registry: SymbolTable, diagnostics: Diagnostics = None):
         self.operand_stack = []
-        self.instruction_list = ['']
+        # Instructions are only ever appended. A slot whose jump is not known yet is None until it is filled in, and
+        # code addresses are labels until `resolve_labels` runs on the finished code.
+        self.instruction_list = [None]
+        self.label_operands = []
         self.symbol_registry = symbol_registry
-        self.temporary_counter = 508
+        self.temporary_counter = first_temporary
         self.loop_stack = []
         self.function_stack = []
+        # The functions each function calls, and the cells saved on the runtime stack by every call being generated.
+        self.call_graph = {}
+        self.saved_cells_stack = []
         self.parameter_declaration_mode = True
         self.error_state = False
         self.data_type_stack = []
+        self.diagnostics = diagnostics or Diagnostics()
+        validators = {
+            CheckSymbols.ID_IS_DEFINED: self.check_id_is_defined,
+            CheckSymbols.VAR_ARR_IS_INT: self.check_var_arr_is_int,
+            CheckSymbols.PARAMETER_NUMBER: self.check_parameter_number,
+            CheckSymbols.BREAK_IS_IN_LOOP: self.check_break_is_in_loop,
+            CheckSymbols.TYPE_MATCH: self.check_type_match,
+            CheckSymbols.ARG_TYPE: self.check_arg_type,
+        }
+        # Checks are bound once and looked up by the value of the check symbol.
+        self.validators = [None] * (max(check.value for check in CheckSymbols) + 1)
+        for check, validator in validators.items():
+            self.validators[check.value] = validator
 
     def display_instructions(self):
+        self.resolve_labels()
         for index, instruction in enumerate(self.instruction_list):
-            print(f'{index}	{instruction}')
+            print(f'{index}	{instruction or ""}')
 
     def allocate_temporary(self):
+        # The stack pointer is never handed out as a temporary. Temporaries past it still run into the stack, unless
+        # they are reused (optimizer/temporaries.py).
+        if self.temporary_counter == stack_pointer.value:
+            self.temporary_counter += 4
         current_address = self.temporary_counter
         self.temporary_counter += 4
         return current_address
 
+    def may_run(self, function, other):
+        # Whether a call to `function` can run the code of `other`, directly or through the functions it calls. Only
+        # functions declared before are known when a call is generated, so a function can reach itself but no other
+        # function can reach the one being generated.
+        reached = {function}
+        pending = [function]
+        while pending:
+            for callee in self.call_graph.get(pending.pop(), ()):
+                if callee not in reached:
+                    reached.add(callee)
+                    pending.append(callee)
+        return other in reached
+
+    def place_label(self, label: Label = None):
+        # Binds `label`, or a new label, to the address of the next instruction.
+        label = label or Label()
+        label.position = len(self.instruction_list)
+        return label
+
+    def reserve_slot(self):
+        # Leaves room for an instruction to be filled in later and returns the label of its slot.
+        label = self.place_label()
+        self.instruction_list.append(None)
+        return label
+
+    def reserved_slot(self, stack_position: int, operand_count: int, token: Token):
+        # The label of the slot an action fills in, `stack_position` from the top of the semantic stack. After a
+        # syntax error the stack can hold a plain address there, or too little; that is reported instead, the
+        # action's `operand_count` operands are dropped so the stack stays in step, and None is returned.
+        if len(self.operand_stack) >= operand_count and type(self.operand_stack[stack_position]) is Label:
+            return self.operand_stack[stack_position]
+        self.diagnostics.report(Phases.SEMANTIC, token.line_number, 'Jump target lost to a syntax error.')
+        self.error_state = True
+        del self.operand_stack[-operand_count:]
+        return None
+
+    def jump_target(self, label: Label):
+        operand = Operand(Addressing.DIRECT, label)
+        self.label_operands.append(operand)
+        return operand
+
+    def address_of(self, label: Label):
+        operand = Operand(Addressing.IMMEDIATE, label)
+        self.label_operands.append(operand)
+        return operand
+
+    def resolve_labels(self):
+        for operand in self.label_operands:
+            # After a syntax error the semantic stack can hold a plain address where a label belongs.
+            if type(operand.value) is Label:
+                resolve_label(operand)
+        self.label_operands.clear()
+
     def pop_operands(self, count: int = 1):
         for _ in range(count):
             self.operand_stack.pop()
 
-    def handle_function_result(self, stack_position, instruction_position=None):
-        if self.operand_stack[stack_position] != '@1000':
+    def handle_function_result(self, stack_position):
+        if self.operand_stack[stack_position] != stack_top:
             return False
         else:
             temp_location = self.allocate_temporary()
-            if not instruction_position:
-                self.instruction_list.append(f'(ASSIGN, @1000, {temp_location}, )')
-                self.instruction_list.append(f'(SUB, 1000, #4, 1000)')
-            else:
-                self.instruction_list.insert(instruction_position, f'(ASSIGN, @1000, {temp_location}, )')
-                self.instruction_list.insert(instruction_position + 1, f'(SUB, 1000, #4, 1000)')
+            self.instruction_list.append(Instruction(Opcode.ASSIGN, stack_top, direct(temp_location)))
+            self.instruction_list.append(Instruction(Opcode.SUB, stack_pointer, word_size, stack_pointer))
             self.operand_stack[stack_position] = temp_location
             return True
 
+    def negated(self, value):
+        # `-x` as a value of the operand stack. A constant is negated here; a temporary holds a value that nothing else
+        # reads, so it is negated in place, while a variable or an array element is negated into a new temporary and
+        # keeps its value.
+        operand = direct(value)
+        if constant_value(operand) is not None:
+            return immediate(-operand.value)
+        if type(value) is int and value >= first_temporary:
+            self.instruction_list.append(Instruction(Opcode.MULT, operand, immediate(-1), operand))
+            return value
+        temp_location = self.allocate_temporary()
+        self.instruction_list.append(Instruction(Opcode.MULT, operand, immediate(-1), direct(temp_location)))
+        return temp_location
+
+    def pop_function_result(self, operand):
+        # A call's result that is read straight off the runtime stack is popped once it is read.
+        if operand == stack_top:
+            self.instruction_list.append(Instruction(Opcode.SUB, stack_pointer, word_size, stack_pointer))
+
+    def check_id_is_defined(self, token: Token):
+        symbol = self.symbol_registry.find_symbol_by_lexeme(token.lexeme)
+        if symbol is None and token.lexeme != 'output':
+            self.diagnostics.report(Phases.SEMANTIC, token.line_number, f'{token.lexeme} is not defined.')
+            self.operand_stack.append(0)
+            self.data_type_stack.append('int')
+            self.error_state = True
+
+    def check_var_arr_is_int(self, token: Token):
+        symbol = self.symbol_registry.get_last_symbol()
+        if not symbol.is_function and symbol.type == 'void':
+            self.diagnostics.report(Phases.SEMANTIC, token.line_number,
+                                    f'Illegal type of void for {symbol.lexeme}.')
+            self.error_state = True
+
+    def check_parameter_number(self, token: Token):
+        function_called = self.function_stack[-1]
+        arguments_provided = self.operand_stack[-1]
+        if (function_called == 'output' and arguments_provided == 1) or \
+                (function_called != 'output' and arguments_provided == len(function_called.parameters)):
+            self.diagnostics.report(Phases.SEMANTIC, token.line_number,
+                                    f'Mismatch in numbers of arguments of {function_called.lexeme}.')
+            self.error_state = True
+
+    def check_break_is_in_loop(self, token: Token):
+        if not self.loop_stack:
+            self.diagnostics.report(Phases.SEMANTIC, token.line_number, f'No while found for break.')
+            self.error_state = True
+
+    def check_type_match(self, token: Token):
+        if self.data_type_stack[-1] != self.data_type_stack[-2]:
+            self.diagnostics.report(
+                Phases.SEMANTIC, token.line_number,
+                f'Type mismatch in operands, Got {self.data_type_stack[-2]} instead of {self.data_type_stack[-1]}.')
+            self.error_state = True
+
+    def check_arg_type(self, token: Token):
+        arg_index = self.operand_stack[-2]
+        function_called = self.function_stack[-1]
+        if function_called == 'output':
+            expected_type = 'int'
+        else:
+            if arg_index >= len(function_called.parameters):
+                self.data_type_stack.pop()
+                return
+            param_address = function_called.parameters[arg_index]
+            param_symbol = self.symbol_registry.find_symbol_by_address(param_address)
+            expected_type = 'array' if param_symbol.is_array else param_symbol.type
+        actual_type = self.data_type_stack.pop()
+        if expected_type != actual_type:
+            self.diagnostics.report(
+                Phases.SEMANTIC, token.line_number,
+                f'Mismatch in type of argument {arg_index + 1} of {function_called.lexeme}. Expected {expected_type} but got {actual_type} instead.')
+            self.error_state = True
+
     def validate_semantics(self, validation_type: CheckSymbols, token: Token):
-        if validation_type == CheckSymbols.ID_IS_DEFINED:
-            symbol = self.symbol_registry.find_symbol_by_lexeme(token.lexeme)
-            if symbol is None and token.lexeme != 'output':
-                report_semantic_error(token.line_number, f'{token.lexeme} is not defined.')
-                self.operand_stack.append(0)
-                self.data_type_stack.append('int')
-                self.error_state = True
-        elif validation_type == CheckSymbols.VAR_ARR_IS_INT:
-            symbol = self.symbol_registry.get_last_symbol()
-            if not symbol.is_function and symbol.type == 'void':
-                report_semantic_error(token.line_number, f'Illegal type of void for {symbol.lexeme}.')
-                self.error_state = True
-        elif validation_type == CheckSymbols.PARAMETER_NUMBER:
-            function_called = self.function_stack[-1]
-            arguments_provided = self.operand_stack[-1]
-            if (function_called == 'output' and arguments_provided == 1) or \
-                    (function_called != 'output' and arguments_provided == len(function_called.parameters)):
-                report_semantic_error(token.line_number,
-                                      f'Mismatch in numbers of arguments of {function_called.lexeme}.')
-                self.error_state = True
-        elif validation_type == CheckSymbols.BREAK_IS_IN_LOOP:
-            if not self.loop_stack:
-                report_semantic_error(token.line_number, f'No while found for break.')
-                self.error_state = True
-        elif validation_type == CheckSymbols.TYPE_MATCH:
-            if self.data_type_stack[-1] != self.data_type_stack[-2]:
-                report_semantic_error(
-                    token.line_number,
-                    f'Type mismatch in operands, Got {self.data_type_stack[-2]} instead of {self.data_type_stack[-1]}.')
-                self.error_state = True
-        elif validation_type == CheckSymbols.ARG_TYPE:
-            arg_index = self.operand_stack[-2]
-            function_called = self.function_stack[-1]
-            if function_called == 'output':
-                expected_type = 'int'
-            else:
-                if arg_index >= len(function_called.parameters):
-                    self.data_type_stack.pop()
-                    return
-                param_address = function_called.parameters[arg_index]
-                param_symbol = self.symbol_registry.find_symbol_by_address(param_address)
-                expected_type = 'array' if param_symbol.is_array else param_symbol.type
-            actual_type = self.data_type_stack.pop()
-            if expected_type != actual_type:
-                report_semantic_error(
-                    token.line_number,
-                    f'Mismatch in type of argument {arg_index + 1} of {function_called.lexeme}. Expected {expected_type} but got {actual_type} instead.')
-                self.error_state = True
-
-def report_semantic_error(error_line, error_message):
-    print("error_line")
-    print(error_line)
-    print("error_message")
-    print(error_message)
\ No newline at end of file
+        self.validators[validation_type.value](token)
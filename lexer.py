@@ -1,91 +1,183 @@
 # Sepehr Vahedi
 # 99170615
 
+import codecs
+from collections import deque
 from enum import Enum
-from symbols import SymbolTable
+from symbols import SymbolTable, terminal_codes, num_code, id_code, dollar_code
+from diagnostics import Diagnostics, Phases
+from token_store import Token, TokenStore
 
-
-class Token:
-    def __init__(self, value, token_type, line_number):
-        self.lexeme = value
-        self.type = token_type
-        self.line_number = line_number
+DEFAULT_CHUNK_SIZE = 1 << 16
 
 
 class Lexer:
-    def __init__(self, text, symbol_table: SymbolTable):
-        self.text = text
+    def __init__(self, source, symbol_table: SymbolTable, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 retain_tokens: bool = True, max_lookahead: int = 1, diagnostics: Diagnostics = None):
+        # `source` is either the whole program as a string or a readable object (text file, binary file, mmap)
+        # that is consumed `chunk_size` characters at a time. With `retain_tokens` off, consumed tokens are not
+        # kept in `self.tokens`, so streaming a file through the parser needs constant memory per token.
+        if isinstance(source, str):
+            self.text = source
+            self.__reader = None
+        else:
+            self.text = ''
+            self.__reader = source
+        self.chunk_size = chunk_size
+        self.__decoder = None
+        self.buffer_offset = 0
+        self.position = 0
         self.line_number = 1
-        self.tokens = []
+        self.tokens = TokenStore()
+        self.retain_tokens = retain_tokens
+        self.max_lookahead = max_lookahead
+        self.__pending = deque()
         self.symbol_table = symbol_table
-
-    def __get_next_state(self, current_state, char):
-        transition_type = TransitionTypes.get_transition_type(char)
-        return current_state.read(transition_type)
+        self.diagnostics = diagnostics or Diagnostics()
+        self.__line_start = 0
+        self.__newline_scan = 0
+
+    def seek(self, position: int, line_number: int):
+        # Moves the cursor of an in-memory lexer to `position`, which must be a point where the DFA is in its start
+        # state (the beginning of the text or the end of a token), e.g. to resume lexing after an edit.
+        self.position = position
+        self.line_number = line_number
+        self.__pending.clear()
+        self.__line_start = self.text.rfind('\n', 0, position) + 1
+        self.__newline_scan = position
+
+    def _column_of(self, index):
+        newline = self.text.rfind('\n', self.__newline_scan, index)
+        if newline >= 0:
+            self.__line_start = self.buffer_offset + newline + 1
+        self.__newline_scan = index
+        return self.buffer_offset + index - self.__line_start + 1
+
+    def __read_chunk(self, keep_from):
+        # Drops the already consumed text before `keep_from` and appends the next chunk of the source. A token or
+        # comment that is still being scanned starts at `keep_from`, so it survives the refill untouched.
+        while self.__reader is not None:
+            data = self.__reader.read(self.chunk_size)
+            if isinstance(data, bytes):
+                if self.__decoder is None:
+                    self.__decoder = codecs.getincrementaldecoder('utf-8')()
+                chunk = self.__decoder.decode(data, final=not data)
+            else:
+                chunk = data
+            if not data:
+                self.__reader = None
+            if not chunk:
+                continue
+            self._column_of(keep_from)
+            self.text = self.text[keep_from:] + chunk
+            self.buffer_offset += keep_from
+            self.__newline_scan -= keep_from
+            return True
+        return False
 
     def get_next_token(self):
-        token_value = ''
-        index = 0
-        state = States.Q0.value
+        token = self.__pending.popleft() if self.__pending else self._scan_token()
+        # add_to_symbol_table(token.type, token.lexeme)
+        self.symbol_table.add_to_symbol_table(token.type, token.lexeme)
+        if self.retain_tokens:
+            self.tokens.append(token)
+        return token
+
+    def peek_token(self, distance: int = 1):
+        # Returns the token `distance` positions ahead without consuming it. Peeked tokens are only registered in
+        # the symbol table once they are consumed, because declarations depend on the parser state at that point.
+        if not 1 <= distance <= self.max_lookahead:
+            raise ValueError(f'lookahead distance must be between 1 and {self.max_lookahead}, got {distance}')
+        while len(self.__pending) < distance:
+            self.__pending.append(self._scan_token())
+        return self.__pending[distance - 1]
 
+    def iter_tokens(self):
         while True:
-            if index >= len(self.text):
-                if state in [States.Q6.value, States.Q7.value]:
-                    report_lexical_error(self.line_number, token_value, ErrorMessages.UNCLOSED_COMMENT.value)
-                break
+            token = self.get_next_token()
+            yield token
+            if token.type == 'END':
+                return
+
+    def _report_error(self, line_number, dumped_text, error_message, offset):
+        # `offset` is the absolute position of `dumped_text`, for subclasses that collect errors instead of printing.
+        self.diagnostics.report(Phases.LEXICAL, line_number, error_message, dumped_text)
+
+    def _scan_token(self):
+        text = self.text
+        text_length = len(text)
+        line_number = self.line_number
+        index = start = self.position
+        state = start_state
 
-            char = self.text[index]
-            state = self.__get_next_state(state, char)
+        while True:
+            if index >= text_length:
+                if self.__reader is not None and self.__read_chunk(start):
+                    index -= start
+                    start = 0
+                    text = self.text
+                    text_length = len(text)
+                    continue
+                if state in comment_states:
+                    self._report_error(line_number, text[start:index], ErrorMessages.UNCLOSED_COMMENT.value,
+                                       self.buffer_offset + start)
+                break
 
-            if state.error_message:
-                token_value = token_value + char
-                report_lexical_error(self.line_number, token_value, state.error_message)
+            char = text[index]
+            code = ord(char)
+            char_class = character_classes[code] if code < 256 else invalid_class
+            state = transition_matrix[state * class_count + char_class]
 
-                token_value = ''
+            if state_error_messages[state]:
                 index += 1
-                state = States.Q0.value
-            elif state.is_finished:
-                if not state.does_need_reversion:
+                self._report_error(line_number, text[start:index], state_error_messages[state], self.buffer_offset + start)
+
+                start = index
+                state = start_state
+            elif state_is_finished[state]:
+                if not state_needs_reversion[state]:
                     index += 1
-                    token_value = token_value + char
                 break
-            elif state.does_reset:
-                token_value = ''
-                state = States.Q0.value
+            elif state_does_reset[state]:
                 index += 1
+                start = index
+                state = start_state
                 if char == '\n':
-                    self.line_number += 1
+                    line_number += 1
             else:
-                token_value = token_value + char
                 index += 1
 
-        token_type = state.token_type
-        if token_type and token_type == TokenTypes.ID_KEY.value:
-            if token_value in keywords:
-                token_type = TokenTypes.KEY.value
-            else:
-                token_type = TokenTypes.ID.value
-
+        token_value = text[start:index]
+        token_type = state_token_types[state]
         if not token_type or not token_value:
             # token_type = token_value = None
             token_type = 'END'
             token_value = '$'
+            start = index
+            terminal_code = dollar_code
+        elif token_type == id_keyword_type:
+            terminal_code = keyword_codes.get(token_value)
+            if terminal_code is None:
+                token_type = id_type
+                terminal_code = id_code
+            else:
+                token_type = keyword_type
+        elif token_type == symbol_type:
+            terminal_code = terminal_codes.get(token_value)
+        else:
+            terminal_code = num_code
 
-        token = Token(token_value, token_type, self.line_number)
-
-        self.text = self.text[index:]
-        # add_to_symbol_table(token.type, token.lexeme)
-        self.symbol_table.add_to_symbol_table(token.type, token.lexeme)
-        self.tokens.append(token)
-
-        # return Token(token_value, token_type, self.line_number)
-        return token
+        self.position = index
+        self.line_number = line_number
+        return Token(token_value, token_type, line_number, self.buffer_offset + start, self._column_of(start),
+                     terminal_code)
 
 digits = [chr(i) for i in range(48, 58)]
 letters = [chr(i) for i in range(65, 91)] + [chr(i) for i in range(97, 123)]
 symbols = [';', ':', ',', '[', ']', '(', ')', '{', '}', '+', '-', '*', '/', '=', '<']
 whitespace = [' ', '\n', '\r', '\t', '\v', '\f']
 keywords = ['if', 'else', 'void', 'int', 'while', 'break', 'return', 'endif']
+keyword_codes = {keyword: terminal_codes[keyword] for keyword in keywords}
 
 
 class TokenTypes(Enum):
@@ -270,10 +362,30 @@ class States(Enum):
         return None
 
 
-def report_lexical_error(error_line, dumped_text, error_message):
-    print("error_line")
-    print(error_line)
-    print("dumped_text")
-    print(dumped_text)
-    print("error_message")
-    print(error_message)
+# The tables below flatten `TransitionTypes`, `Transition` and `States` into plain integers once, at import
+# time, so that reading a character costs one table lookup instead of scanning the enums.
+transition_type_list = list(TransitionTypes)
+state_list = [state.value for state in States]
+class_count = len(transition_type_list)
+invalid_class = transition_type_list.index(TransitionTypes.INVALID)
+
+character_classes = [transition_type_list.index(TransitionTypes.get_transition_type(chr(code)))
+                     for code in range(256)]
+
+transition_matrix = []
+for compiled_state in state_list:
+    for tr_type in transition_type_list:
+        transition_matrix.append(state_list.index(compiled_state.read(tr_type)))
+
+state_error_messages = [compiled_state.error_message for compiled_state in state_list]
+state_is_finished = [compiled_state.is_finished for compiled_state in state_list]
+state_needs_reversion = [compiled_state.does_need_reversion for compiled_state in state_list]
+state_does_reset = [compiled_state.does_reset for compiled_state in state_list]
+state_token_types = [compiled_state.token_type for compiled_state in state_list]
+
+start_state = state_list.index(States.Q0.value)
+id_keyword_type = TokenTypes.ID_KEY.value
+keyword_type = TokenTypes.KEY.value
+id_type = TokenTypes.ID.value
+symbol_type = TokenTypes.SYMBOL.value
+comment_states = (state_list.index(States.Q6.value), state_list.index(States.Q7.value))
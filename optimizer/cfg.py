@@ -0,0 +1,181 @@
+# Sepehr Vahedi
+# 99170615
+
+from bisect import bisect_right
+
+from intermediate_code_generator.instructions import Opcode, Addressing, Label, return_address, return_target, \
+    code_address
+
+jump_opcodes = {Opcode.JP, Opcode.JPF}
+
+
+def called_function(code, position):
+    # A call is `(ASSIGN, #r, 500, )` followed by `(JP, f, , )`, where r is the address right after the jump; returns
+    # f when the jump at `position` is one.
+    jump = code[position]
+    if jump is None or jump.opcode is not Opcode.JP or jump.first.addressing is not Addressing.DIRECT or \
+            position == 0:
+        return None
+    link = code[position - 1]
+    if link is None or link.opcode is not Opcode.ASSIGN or link.second != return_address or \
+            link.first.addressing is not Addressing.IMMEDIATE or code_address(link.first) != position + 1:
+        return None
+    return code_address(jump.first)
+
+
+class BasicBlock:
+    __slots__ = ('index', 'start', 'end', 'successors', 'predecessors')
+
+    def __init__(self, index, start, end):
+        self.index = index
+        self.start = start
+        self.end = end
+        # Indices of the neighbouring blocks in `ControlFlowGraph.blocks`.
+        self.successors = []
+        self.predecessors = []
+
+    def __str__(self):
+        return f'block {self.index}: {self.start}-{self.end}, successors: {self.successors}'
+
+
+class ControlFlowGraph:
+    # The basic blocks of finished code, with one last empty block at the end that the program exits through. The code
+    # can be `CodeGenerator.program_block` or the instructions before their labels are resolved.
+    #
+    # Functions are found from the code: main is the target of the jump at 0, and every other function the target of
+    # a call. A function reaches up to the next one, so one that is never called is unreachable code at the end of
+    # the function before it. Calls and returns are edges like any other, which makes this the graph of the whole
+    # program: a call jumps to the entry of the function, and its `(JP, @500, , )` returns go to the return point of
+    # every call to it (main returns to the end of the code). Any other indirect jump, i.e. the exit of a loop or a
+    # `break` through the cell of its loop, goes to every address that is ever assigned to that cell as a constant.
+    def __init__(self, code):
+        self.code = code
+        size = len(code)
+        # (position of the jump, entry of the function called, return point) of every call.
+        self.calls = []
+        constant_targets = {}
+        for position, instruction in enumerate(code):
+            if instruction is None:
+                continue
+            if instruction.opcode is Opcode.ASSIGN and instruction.first.addressing is Addressing.IMMEDIATE and \
+                    instruction.second.addressing is Addressing.DIRECT:
+                constant_targets.setdefault(instruction.second.value, set()).add(code_address(instruction.first))
+            elif instruction.opcode is Opcode.JP:
+                entry = called_function(code, position)
+                if entry is not None:
+                    self.calls.append((position, entry, position + 1))
+
+        main_entry = None
+        if size and code[0] is not None and code[0].opcode is Opcode.JP and \
+                code[0].first.addressing is Addressing.DIRECT:
+            main_entry = code_address(code[0].first)
+        self.main_entry = main_entry
+        self.function_entries = sorted({entry for _, entry, _ in self.calls} | ({main_entry} - {None}))
+        self.returns_to = {entry: [] for entry in self.function_entries}
+        for _, entry, return_point in self.calls:
+            self.returns_to[entry].append(return_point)
+        if main_entry is not None:
+            self.returns_to[main_entry].append(size)
+
+        leaders = {0, size}
+        leaders.update(self.function_entries)
+        jump_targets = {}
+        for position, instruction in enumerate(code):
+            if instruction is None or instruction.opcode not in jump_opcodes:
+                continue
+            leaders.add(position + 1)
+            target = instruction.second if instruction.opcode is Opcode.JPF else instruction.first
+            if target.addressing is Addressing.DIRECT:
+                targets = [code_address(target)]
+            elif target == return_target:
+                entry = self.function_at(position)
+                targets = self.returns_to[entry] if entry is not None else []
+            else:
+                targets = sorted(constant_targets.get(target.value, ()))
+            targets = [target for target in targets if type(target) is int and 0 <= target <= size]
+            jump_targets[position] = targets
+            leaders.update(targets)
+
+        starts = sorted(leader for leader in leaders if leader <= size)
+        self.blocks = []
+        self.block_of = [0] * (size + 1)
+        for index, start in enumerate(starts):
+            end = starts[index + 1] if index + 1 < len(starts) else size
+            self.blocks.append(BasicBlock(index, start, end))
+            self.block_of[start:end] = [index] * (end - start)
+        self.exit = self.blocks[-1]
+        self.block_of[size] = self.exit.index
+
+        for block in self.blocks:
+            if block is self.exit:
+                continue
+            last = block.end - 1
+            instruction = code[last]
+            if instruction is not None and instruction.opcode in jump_opcodes:
+                targets = jump_targets[last]
+                if instruction.opcode is Opcode.JPF:
+                    targets = targets + [block.end]
+            else:
+                targets = [block.end]
+            for target in targets:
+                successor = self.block_of[target]
+                if successor not in block.successors:
+                    block.successors.append(successor)
+                    self.blocks[successor].predecessors.append(block.index)
+
+    def function_at(self, position):
+        # Entry of the function that the code at `position` belongs to, or None for the code before main and the
+        # functions.
+        index = bisect_right(self.function_entries, position) - 1
+        return self.function_entries[index] if index >= 0 else None
+
+    def reverse_postorder(self):
+        # Blocks reachable from the start in reverse postorder, followed by the unreachable ones.
+        order = []
+        is_visited = [False] * len(self.blocks)
+        is_visited[0] = True
+        pending = [(0, iter(self.blocks[0].successors))]
+        while pending:
+            index, successors = pending[-1]
+            for successor in successors:
+                if not is_visited[successor]:
+                    is_visited[successor] = True
+                    pending.append((successor, iter(self.blocks[successor].successors)))
+                    break
+            else:
+                pending.pop()
+                order.append(index)
+        order.reverse()
+        order.extend(block.index for block in self.blocks if not is_visited[block.index])
+        return order
+
+    def reachable_blocks(self):
+        is_reachable = [False] * len(self.blocks)
+        is_reachable[0] = True
+        pending = [0]
+        while pending:
+            for successor in self.blocks[pending.pop()].successors:
+                if not is_reachable[successor]:
+                    is_reachable[successor] = True
+                    pending.append(successor)
+        return is_reachable
+
+
+def compact(code, is_kept):
+    # Drops the instructions that are not kept, from code whose labels are not resolved yet. A label moves with its
+    # instruction, or to the next one kept if its instruction is dropped, so no jump has to be renumbered.
+    positions = []
+    count = 0
+    for kept in is_kept:
+        positions.append(count)
+        count += kept
+    positions.append(count)
+    labels = set()
+    for instruction in code:
+        if instruction is not None:
+            for operand in (instruction.first, instruction.second, instruction.third):
+                if operand is not None and type(operand.value) is Label and operand.value.position is not None:
+                    labels.add(operand.value)
+    for label in labels:
+        label.position = positions[label.position]
+    return [instruction for instruction, kept in zip(code, is_kept) if kept]
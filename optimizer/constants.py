@@ -0,0 +1,136 @@
+# Sepehr Vahedi
+# 99170615
+
+from intermediate_code_generator.instructions import Opcode, Addressing, Instruction, direct, immediate, \
+    return_address, stack_pointer, stack_top, evaluate, constant_value
+from optimizer.cfg import ControlFlowGraph, compact
+from optimizer.dataflow import Liveness, ReachingDefinitions, is_addressable, mask_of, members, operation_opcodes
+from optimizer.peephole import is_temporary, destination
+
+
+class ConstantPropagation:
+    # Replaces the cells that hold a known constant wherever they are read, with reaching definitions: a cell is known
+    # at a point when every definition of it that reaches there assigns it the same constant. Operations on constants
+    # then become assignments of their value, which can make more cells known, and so on until nothing changes. A
+    # `(JPF, c, L, )` on a known condition becomes a jump or goes, and the copies of constants to temporaries that
+    # nothing reads any more go with it. The stack pointer and the return address are left alone, as the stack and
+    # the calls are found from them.
+    def __init__(self, code):
+        self.code = list(code)
+        self.cfg = ControlFlowGraph(self.code)
+        self.definitions = ReachingDefinitions(self.cfg)
+        definitions = self.definitions
+        # Definitions that are not writes of a known cell: initial values, and stores through a pointer. Pushes
+        # through the stack pointer only reach the stack, so they cannot change a variable.
+        self.unknown = mask_of([number for number, position in enumerate(definitions.positions) if position is None])
+        self.stores = mask_of([number for number, (position, cell) in enumerate(zip(definitions.positions,
+                                                                                     definitions.cells))
+                               if cell is None and position is not None and
+                               destination(self.code[position]) != stack_top])
+
+    def run(self):
+        is_changed = True
+        while is_changed:
+            is_changed = False
+            for index in self.cfg.reverse_postorder():
+                block = self.cfg.blocks[index]
+                for position, reaching in zip(range(block.start, block.end), self.definitions.reaching(block)):
+                    instruction = self.code[position]
+                    if instruction is None:
+                        continue
+                    folded = self.folded(self.substituted(instruction, reaching))
+                    if folded is not instruction:
+                        self.code[position] = folded
+                        is_changed = True
+        return self.without_dead_code()
+
+    def value_at(self, cell, reaching):
+        # The constant that `cell` holds wherever `reaching` are the definitions that reach, or None.
+        if type(cell) is not int or cell == stack_pointer.value or cell == return_address.value:
+            return None
+        definitions = self.definitions
+        reaching_cell = reaching & definitions.definitions_of.get(cell, 0)
+        if not reaching_cell or reaching_cell & self.unknown or (is_addressable(cell) and reaching & self.stores):
+            return None
+        value = None
+        for position in members(reaching_cell, definitions.positions):
+            instruction = self.code[position]
+            if instruction is None or instruction.opcode is not Opcode.ASSIGN or instruction.second != direct(cell):
+                return None
+            constant = constant_value(instruction.first)
+            if constant is None or (value is not None and constant != value):
+                return None
+            value = constant
+        return value
+
+    def substituted(self, instruction, reaching):
+        opcode = instruction.opcode
+        if opcode is Opcode.JP:
+            return instruction
+        first, second, third = instruction.first, instruction.second, instruction.third
+        first = self.operand_value(first, reaching)
+        if opcode in operation_opcodes:
+            second = self.operand_value(second, reaching)
+            third = self.pointer_value(third, reaching)
+        elif opcode is Opcode.ASSIGN:
+            second = self.pointer_value(second, reaching)
+        if first is instruction.first and second is instruction.second and third is instruction.third:
+            return instruction
+        return Instruction(opcode, first, second, third, is_compact=instruction.is_compact)
+
+    def operand_value(self, operand, reaching):
+        # A read of a known cell becomes the constant, and a read through a known pointer a read of the cell it
+        # points to.
+        if operand.addressing is Addressing.DIRECT:
+            value = self.value_at(operand.value, reaching)
+            return operand if value is None else immediate(value)
+        if operand.addressing is Addressing.INDIRECT:
+            return self.pointer_value(operand, reaching)
+        return operand
+
+    def pointer_value(self, operand, reaching):
+        # Only pointers to variables and arrays are replaced by the cell they point to.
+        if operand.addressing is not Addressing.INDIRECT:
+            return operand
+        value = self.value_at(operand.value, reaching)
+        if value is None or not 0 <= value < return_address.value:
+            return operand
+        return direct(value)
+
+    @staticmethod
+    def folded(instruction):
+        opcode = instruction.opcode
+        if opcode in operation_opcodes:
+            first, second = constant_value(instruction.first), constant_value(instruction.second)
+            if first is not None and second is not None:
+                value = evaluate(opcode, first, second)
+                if value is not None:
+                    return Instruction(Opcode.ASSIGN, immediate(value), instruction.third,
+                                       is_compact=instruction.is_compact)
+        elif opcode is Opcode.JPF:
+            condition = constant_value(instruction.first)
+            if condition == 0:
+                return Instruction(Opcode.JP, instruction.second, is_compact=instruction.is_compact)
+            if condition is not None:
+                return None
+        return instruction
+
+    def without_dead_code(self):
+        # Drops decided branches that are never taken, and writes of temporaries that nothing reads any more.
+        code = self.code
+        liveness = Liveness(ControlFlowGraph(code))
+        is_kept = [instruction is not None for instruction in code]
+        for block in liveness.cfg.blocks:
+            for position, live in zip(range(block.start, block.end), liveness.live_after(block)):
+                instruction = code[position]
+                if instruction is None:
+                    continue
+                target = destination(instruction)
+                if target is not None and target.addressing is Addressing.DIRECT and is_temporary(target.value) and \
+                        not live & liveness.bits[target.value]:
+                    is_kept[position] = False
+        return compact(code, is_kept)
+
+
+def propagate_constants(code):
+    return ConstantPropagation(code).run()
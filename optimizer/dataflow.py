@@ -0,0 +1,359 @@
+# Sepehr Vahedi
+# 99170615
+
+from heapq import heappush, heappop
+
+from intermediate_code_generator.instructions import Opcode, Addressing, return_address, return_target
+from optimizer.cfg import ControlFlowGraph
+
+operation_opcodes = {Opcode.ADD, Opcode.SUB, Opcode.MULT, Opcode.DIV, Opcode.EQ, Opcode.LT}
+
+
+def is_addressable(cell):
+    # Cells that code can reach through a pointer other than the stack pointer: variables and arrays below 500.
+    # Temporaries and the cells at 500, 504 and 1000 are only ever used directly, and the runtime stack above 1000 only
+    # through `@1000`; a cell past 1000 that the code names is a temporary.
+    return type(cell) is not int or cell < return_address.value
+
+
+class Effects:
+    # The cells an instruction reads and writes directly. `loads` and `stores` tell whether it also reads or writes
+    # memory through a pointer, which can be any addressable cell.
+    __slots__ = ('uses', 'definition', 'loads', 'stores')
+
+    def __init__(self):
+        self.uses = []
+        self.definition = None
+        self.loads = False
+        self.stores = False
+
+    def read(self, operand):
+        if operand.addressing is not Addressing.IMMEDIATE:
+            self.uses.append(operand.value)
+            if operand.addressing is Addressing.INDIRECT:
+                self.loads = True
+
+    def read_target(self, operand):
+        # A direct operand is the address jumped to; an indirect one is the cell that holds it.
+        if operand.addressing is Addressing.INDIRECT:
+            self.uses.append(operand.value)
+
+    def write(self, operand):
+        if operand.addressing is Addressing.DIRECT:
+            self.definition = operand.value
+        else:
+            self.uses.append(operand.value)
+            self.stores = True
+
+
+def effects_of(instruction):
+    effects = Effects()
+    if instruction is None:
+        return effects
+    # Opcodes are told apart by identity, as hashing an enum member to look it up in a set is slow.
+    opcode = instruction.opcode
+    if opcode is Opcode.ASSIGN:
+        effects.read(instruction.first)
+        effects.write(instruction.second)
+    elif opcode is Opcode.JP:
+        effects.read_target(instruction.first)
+    elif opcode is Opcode.JPF:
+        effects.read(instruction.first)
+        effects.read_target(instruction.second)
+    elif opcode is Opcode.PRINT:
+        effects.read(instruction.first)
+    else:
+        effects.read(instruction.first)
+        effects.read(instruction.second)
+        effects.write(instruction.third)
+    return effects
+
+
+def members(mask, items):
+    # The items whose bits are set in `mask`.
+    while mask:
+        lowest = mask & -mask
+        yield items[lowest.bit_length() - 1]
+        mask ^= lowest
+
+
+def mask_of(numbers):
+    # An int with the bits of `numbers` set. Setting them one by one would copy the whole int each time.
+    if not numbers:
+        return 0
+    lowest = min(numbers)
+    bits = bytearray((max(numbers) - lowest) // 8 + 1)
+    for number in numbers:
+        number -= lowest
+        bits[number >> 3] |= 1 << (number & 7)
+    return int.from_bytes(bits, 'little') << lowest
+
+
+def solve(cfg: ControlFlowGraph, gen, kill, is_forward=True, is_union=True, boundary=0, everything=0,
+          successors=None):
+    # Worklist solver of a bit-vector problem: each block's facts on leaving it are `gen | (entering & ~kill)`, and
+    # facts on entering a block are the union (or, for a must problem, the intersection) of the facts leaving the
+    # blocks that flow into it. The start of the program, or its end for a backward problem, takes `boundary`.
+    # `successors` replaces the edges of the graph. Returns the facts entering and leaving every block, in the
+    # direction of the flow.
+    blocks = cfg.blocks
+    order = cfg.reverse_postorder()
+    if successors is None:
+        successors = [block.successors for block in blocks]
+        predecessors = [block.predecessors for block in blocks]
+    else:
+        predecessors = [[] for _ in blocks]
+        for index, targets in enumerate(successors):
+            for target in targets:
+                predecessors[target].append(index)
+    if is_forward:
+        sources = predecessors
+        targets = successors
+        start = 0
+    else:
+        sources = successors
+        targets = predecessors
+        start = cfg.exit.index
+        order.reverse()
+    # Blocks are visited in passes in the order of `order`, which is the direction of the flow but for the edges that
+    # close a loop; a block that has to be visited again but comes earlier in the order waits for the next pass.
+    rank = [0] * len(blocks)
+    for position, index in enumerate(order):
+        rank[index] = position
+    initial = 0 if is_union else everything
+    entering = [initial] * len(blocks)
+    leaving = [initial] * len(blocks)
+    is_queued = [True] * len(blocks)
+    worklist = list(range(len(blocks)))
+    next_pass = []
+    while worklist or next_pass:
+        if not worklist:
+            worklist, next_pass = next_pass, worklist
+        current = heappop(worklist)
+        index = order[current]
+        is_queued[index] = False
+        if is_union:
+            facts = boundary if index == start else 0
+            for source in sources[index]:
+                facts |= leaving[source]
+        else:
+            facts = boundary if index == start else everything
+            for source in sources[index]:
+                facts &= leaving[source]
+        entering[index] = facts
+        facts = gen[index] | (facts & ~kill[index])
+        if facts != leaving[index]:
+            leaving[index] = facts
+            for target in targets[index]:
+                if not is_queued[target]:
+                    is_queued[target] = True
+                    heappush(worklist if rank[target] > current else next_pass, rank[target])
+    return entering, leaving
+
+
+class Liveness:
+    # Cells whose value may still be read. At the end of the program nothing is live. A return goes back to every call
+    # of its function, so what is live after one call would be live before all of them if calls were edges like any
+    # other; a call is summed up instead by what its function may read before writing it, which is solved first with
+    # no return edges, and what is live after the call. The function's own code still sees what is live after each of
+    # its calls.
+    def __init__(self, cfg: ControlFlowGraph, effects=None):
+        self.cfg = cfg
+        self.effects = effects or [effects_of(instruction) for instruction in cfg.code]
+        cells = set()
+        for effect in self.effects:
+            cells.update(effect.uses)
+            if effect.definition is not None:
+                cells.add(effect.definition)
+        self.cells = sorted(cells, key=str)
+        self.bits = {cell: 1 << index for index, cell in enumerate(self.cells)}
+        self.addressable = 0
+        for cell, bit in self.bits.items():
+            if is_addressable(cell):
+                self.addressable |= bit
+        self.uses = [self.use_mask(effect) for effect in self.effects]
+        self.definitions = [self.bits.get(effect.definition, 0) for effect in self.effects]
+
+        gen = []
+        kill = []
+        for block in cfg.blocks:
+            used = defined = 0
+            for position in range(block.end - 1, block.start - 1, -1):
+                defined |= self.definitions[position]
+                used = self.uses[position] | (used & ~self.definitions[position])
+            gen.append(used)
+            kill.append(defined)
+        if not cfg.calls:
+            self.live_out, self.live_in = solve(cfg, gen, kill, is_forward=False)
+            return
+
+        successors = [block.successors for block in cfg.blocks]
+        called = {cfg.block_of[position]: (cfg.block_of[entry], cfg.block_of[return_point])
+                  for position, entry, return_point in cfg.calls}
+        returns = [block.index for block in cfg.blocks if block.end > block.start and
+                   cfg.code[block.end - 1] is not None and cfg.code[block.end - 1].opcode is Opcode.JP and
+                   cfg.code[block.end - 1].first == return_target]
+        summary_successors = list(successors)
+        for index in returns:
+            summary_successors[index] = []
+        for index, (entry, return_point) in called.items():
+            summary_successors[index] = [return_point, entry]
+        _, summary_in = solve(cfg, gen, kill, is_forward=False, successors=summary_successors)
+
+        call_gen = list(gen)
+        for index, (entry, return_point) in called.items():
+            successors[index] = [return_point]
+            call_gen[index] |= summary_in[entry] & ~kill[index]
+        self.live_out, self.live_in = solve(cfg, call_gen, kill, is_forward=False, successors=successors)
+        for index, (entry, _) in called.items():
+            self.live_out[index] |= summary_in[entry]
+
+    def use_mask(self, effect: Effects):
+        mask = self.addressable if effect.loads else 0
+        for cell in effect.uses:
+            mask |= self.bits[cell]
+        return mask
+
+    def live_after(self, block):
+        # Cells live after each instruction of `block`.
+        live = self.live_out[block.index]
+        result = [0] * (block.end - block.start)
+        for position in range(block.end - 1, block.start - 1, -1):
+            result[position - block.start] = live
+            live = self.uses[position] | (live & ~self.definitions[position])
+        return result
+
+
+class ReachingDefinitions:
+    # Definitions that may reach a point with no other definition of their cell between. A definition is an
+    # instruction that writes a cell directly, or one that stores through a pointer (its cell is None), which reaches
+    # on until the end; the initial value of each cell is a definition at the start of the program (its position is
+    # None).
+    def __init__(self, cfg: ControlFlowGraph, effects=None):
+        self.cfg = cfg
+        self.effects = effects or [effects_of(instruction) for instruction in cfg.code]
+        cells = set()
+        for effect in self.effects:
+            cells.update(effect.uses)
+            if effect.definition is not None:
+                cells.add(effect.definition)
+        self.positions = []
+        self.cells = []
+        numbers_of = {}
+        for cell in sorted(cells, key=str):
+            numbers_of[cell] = [len(self.positions)]
+            self.positions.append(None)
+            self.cells.append(cell)
+        initial_values = (1 << len(self.positions)) - 1
+        # The number of the definition made at each position, or None.
+        self.numbers = [None] * len(self.effects)
+        for position, effect in enumerate(self.effects):
+            if effect.definition is not None or effect.stores:
+                self.numbers[position] = len(self.positions)
+                self.positions.append(position)
+                self.cells.append(effect.definition)
+                if effect.definition is not None:
+                    numbers_of[effect.definition].append(self.numbers[position])
+        self.definitions_of = {cell: mask_of(numbers) for cell, numbers in numbers_of.items()}
+
+        # A block generates the last definition of each cell it writes, and any store through a pointer.
+        gen = []
+        kill = []
+        for block in cfg.blocks:
+            last_definitions = {}
+            stores = []
+            for position in range(block.start, block.end):
+                number = self.numbers[position]
+                if number is not None:
+                    definition = self.effects[position].definition
+                    if definition is None:
+                        stores.append(number)
+                    else:
+                        last_definitions[definition] = number
+            killed = 0
+            for definition in last_definitions:
+                killed |= self.definitions_of[definition]
+            gen.append(mask_of(stores + list(last_definitions.values())))
+            kill.append(killed)
+        self.reach_in, self.reach_out = solve(cfg, gen, kill, boundary=initial_values)
+
+    def reaching(self, block):
+        # Definitions that reach each instruction of `block`, before it runs.
+        reach = self.reach_in[block.index]
+        result = []
+        for position in range(block.start, block.end):
+            result.append(reach)
+            number = self.numbers[position]
+            if number is not None:
+                definition = self.effects[position].definition
+                if definition is not None:
+                    reach &= ~self.definitions_of[definition]
+                reach |= 1 << number
+        return result
+
+
+class AvailableExpressions:
+    # Operations `(opcode, first, second)` that have been computed on every path, with none of the cells they read
+    # written since. An operand through a pointer reads an addressable cell, so any store through a pointer or write
+    # to an addressable cell makes it unavailable.
+    def __init__(self, cfg: ControlFlowGraph, effects=None):
+        self.cfg = cfg
+        self.effects = effects or [effects_of(instruction) for instruction in cfg.code]
+        self.expressions = []
+        self.bits = {}
+        self.readers = {}
+        self.loading = 0
+        self.computed = [0] * len(cfg.code)
+        for position, instruction in enumerate(cfg.code):
+            if instruction is None or instruction.opcode not in operation_opcodes:
+                continue
+            expression = (instruction.opcode, instruction.first, instruction.second)
+            bit = self.bits.get(expression)
+            if bit is None:
+                bit = self.bits[expression] = 1 << len(self.expressions)
+                self.expressions.append(expression)
+                for operand in (instruction.first, instruction.second):
+                    if operand.addressing is not Addressing.IMMEDIATE:
+                        self.readers[operand.value] = self.readers.get(operand.value, 0) | bit
+                    if operand.addressing is Addressing.INDIRECT:
+                        self.loading |= bit
+            self.computed[position] = bit
+        # Expressions that a store through a pointer can change.
+        self.stored = self.loading
+        for cell, readers in self.readers.items():
+            if is_addressable(cell):
+                self.stored |= readers
+        self.killed = [self.kill_mask(effect) for effect in self.effects]
+        everything = (1 << len(self.expressions)) - 1
+
+        gen = []
+        kill = []
+        for block in cfg.blocks:
+            generated = killed = 0
+            for position in range(block.start, block.end):
+                generated = (generated & ~self.killed[position]) | self.generated(position)
+                killed |= self.killed[position]
+            gen.append(generated)
+            kill.append(killed)
+        self.available_in, self.available_out = solve(cfg, gen, kill, is_union=False, everything=everything)
+
+    def kill_mask(self, effect: Effects):
+        mask = self.stored if effect.stores else 0
+        if effect.definition is not None:
+            mask |= self.readers.get(effect.definition, 0)
+            if is_addressable(effect.definition):
+                mask |= self.loading
+        return mask
+
+    def generated(self, position):
+        # An operation that writes one of its own operands is not available after it.
+        return self.computed[position] & ~self.killed[position]
+
+    def available(self, block):
+        # Expressions available before each instruction of `block`.
+        available = self.available_in[block.index]
+        result = []
+        for position in range(block.start, block.end):
+            result.append(available)
+            available = (available & ~self.killed[position]) | self.generated(position)
+        return result
@@ -0,0 +1,45 @@
+# Sepehr Vahedi
+# 99170615
+
+from intermediate_code_generator.instructions import Opcode, return_target
+from optimizer.cfg import ControlFlowGraph, called_function, compact
+
+
+def live_blocks(cfg: ControlFlowGraph):
+    # Blocks that some run of the program gets to, starting from the jump to main. A call goes on to the function
+    # called and, once that returns, to its own return point; returns are not followed, as they go back to every call
+    # of their function, including calls from functions that are never called themselves. So this walks the call graph
+    # from main along with the code of each function.
+    code = cfg.code
+    is_live = [False] * len(cfg.blocks)
+    is_live[0] = True
+    pending = [0]
+    while pending:
+        block = cfg.blocks[pending.pop()]
+        if block is cfg.exit:
+            continue
+        last = block.end - 1
+        instruction = code[last]
+        if instruction is not None and instruction.opcode is Opcode.JP and instruction.first == return_target:
+            successors = []
+        elif called_function(code, last) is not None:
+            successors = block.successors + [cfg.block_of[last + 1]]
+        else:
+            successors = block.successors
+        for successor in successors:
+            if not is_live[successor]:
+                is_live[successor] = True
+                pending.append(successor)
+    return is_live
+
+
+def remove_dead_code(code):
+    # Drops the functions that main never calls, directly or through other functions, and the code that no jump or
+    # fall-through in the rest gets to, like what follows a return or an unconditional jump.
+    cfg = ControlFlowGraph(code)
+    is_live = live_blocks(cfg)
+    is_kept = [True] * len(code)
+    for block in cfg.blocks:
+        if not is_live[block.index]:
+            is_kept[block.start:block.end] = [False] * (block.end - block.start)
+    return compact(code, is_kept)
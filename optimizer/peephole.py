@@ -0,0 +1,271 @@
+# Sepehr Vahedi
+# 99170615
+
+from intermediate_code_generator.instructions import Opcode, Addressing, Instruction, immediate, \
+    stack_pointer, stack_top, return_address, code_address
+from optimizer.cfg import ControlFlowGraph, called_function, compact
+from optimizer.dataflow import Liveness, effects_of, is_addressable, operation_opcodes
+
+stack_adjustments = {Opcode.ADD: 1, Opcode.SUB: -1}
+# How many instructions apart a copy to a temporary and the instruction that reads it can be.
+forwarding_distance = 4
+
+
+def stack_adjustment(instruction):
+    # How far `(ADD, 1000, #k, 1000)` or `(SUB, 1000, #k, 1000)` moves the stack pointer; None for anything else.
+    if instruction is None or (instruction.opcode is not Opcode.ADD and instruction.opcode is not Opcode.SUB) or \
+            instruction.first != stack_pointer or instruction.third != stack_pointer or \
+            instruction.second.addressing is not Addressing.IMMEDIATE:
+        return None
+    return stack_adjustments[instruction.opcode] * instruction.second.value
+
+
+def adjust_stack(amount):
+    if amount < 0:
+        return Instruction(Opcode.SUB, stack_pointer, immediate(-amount), stack_pointer)
+    return Instruction(Opcode.ADD, stack_pointer, immediate(amount), stack_pointer)
+
+
+def mentions(instruction, cell):
+    # Whether the instruction uses `cell` at all, directly or as a pointer.
+    for operand in (instruction.first, instruction.second, instruction.third):
+        if operand is not None and operand.addressing is not Addressing.IMMEDIATE and operand.value == cell:
+            return True
+    return False
+
+
+def destination(instruction):
+    if instruction.opcode in operation_opcodes:
+        return instruction.third
+    if instruction.opcode is Opcode.ASSIGN:
+        return instruction.second
+    return None
+
+
+def with_destination(instruction, operand):
+    if instruction.opcode is Opcode.ASSIGN:
+        return Instruction(Opcode.ASSIGN, instruction.first, operand, is_compact=instruction.is_compact)
+    return Instruction(instruction.opcode, instruction.first, instruction.second, operand,
+                       is_compact=instruction.is_compact)
+
+
+def with_sources(instruction, old, new):
+    # The instruction with every operand it reads as a value that is `old` replaced by `new`.
+    first, second = instruction.first, instruction.second
+    if first == old:
+        first = new
+    if instruction.opcode in operation_opcodes and second == old:
+        second = new
+    return Instruction(instruction.opcode, first, second, instruction.third, is_compact=instruction.is_compact)
+
+
+def is_temporary(cell):
+    # Cells that nothing reads but the code that names them: temporaries and the function result. The return address
+    # and the stack pointer are left alone.
+    return not is_addressable(cell) and cell != return_address.value and cell != stack_pointer.value
+
+
+def is_jump(instruction):
+    return instruction.opcode is Opcode.JP or instruction.opcode is Opcode.JPF
+
+
+class PeepholeRound:
+    # One pass of the rewrites over every basic block, with liveness from the code as it was before the pass. Rewrites
+    # only make cells live for shorter, so the liveness stays safe to use for the rest of the pass.
+    def __init__(self, code):
+        self.code = code
+        self.cfg = ControlFlowGraph(code)
+        self.liveness = Liveness(self.cfg)
+        self.is_kept = [True] * len(code)
+        self.live_after = [0] * len(code)
+        self.is_changed = False
+
+    def run(self):
+        self.thread_jumps()
+        for block in self.cfg.blocks:
+            self.live_after[block.start:block.end] = self.liveness.live_after(block)
+            window = [position for position in range(block.start, block.end) if self.code[position] is not None]
+            index = 0
+            while index < len(window):
+                if self.rewrite(window, index):
+                    self.is_changed = True
+                    index = max(index - 2, 0)
+                else:
+                    index += 1
+        self.drop_jumps_to_next()
+        if not self.is_changed:
+            return self.code
+        return compact(self.code, self.is_kept)
+
+    def drop(self, window, index):
+        self.is_kept[window[index]] = False
+        del window[index]
+
+    def is_live(self, cell, position):
+        return self.live_after[position] & self.liveness.bits[cell] != 0
+
+    def rewrite(self, window, index):
+        code = self.code
+        position = window[index]
+        instruction = code[position]
+        following = code[window[index + 1]] if index + 1 < len(window) else None
+
+        # (ASSIGN, x, x, )
+        if instruction.opcode is Opcode.ASSIGN and instruction.first == instruction.second:
+            self.drop(window, index)
+            return True
+
+        # Stack pointer adjustments in a row, or with an instruction between that does not use the stack pointer,
+        # become one.
+        amount = stack_adjustment(instruction)
+        if amount is not None and following is not None:
+            if stack_adjustment(following) is not None:
+                total = amount + stack_adjustment(following)
+                if total:
+                    code[position] = adjust_stack(total)
+                    self.drop(window, index + 1)
+                else:
+                    self.drop(window, index + 1)
+                    self.drop(window, index)
+                return True
+            if index + 2 < len(window) and stack_adjustment(code[window[index + 2]]) is not None and \
+                    not is_jump(following) and not mentions(following, stack_pointer.value):
+                total = amount + stack_adjustment(code[window[index + 2]])
+                code[position] = following
+                self.live_after[position] = self.live_after[window[index + 1]]
+                if total:
+                    code[window[index + 1]] = adjust_stack(total)
+                    self.drop(window, index + 2)
+                else:
+                    self.drop(window, index + 2)
+                    self.drop(window, index + 1)
+                return True
+
+        if instruction.opcode is Opcode.ASSIGN and instruction.second == stack_top and following is not None:
+            # A value pushed and read back right away, e.g. `(ASSIGN, x, @1000, )` followed by `(ASSIGN, @1000, y, )`.
+            value = instruction.first
+            if value.addressing is not Addressing.INDIRECT and (following.first == stack_top or (
+                    following.opcode in operation_opcodes and following.second == stack_top)) and \
+                    not is_jump(following):
+                code[window[index + 1]] = with_sources(following, stack_top, value)
+                if value.addressing is Addressing.DIRECT:
+                    self.live_after[position] |= self.liveness.bits[value.value]
+                return True
+            # A push that is popped with nothing reading it, as the cells above the top of the stack are never read.
+            for later in range(index + 1, min(index + 1 + forwarding_distance, len(window))):
+                other = code[window[later]]
+                adjustment = stack_adjustment(other)
+                if adjustment is not None and adjustment < 0:
+                    self.drop(window, index)
+                    return True
+                if is_jump(other) or mentions(other, stack_pointer.value) or effects_of(other).loads:
+                    break
+
+        if following is None:
+            return False
+        target = destination(instruction)
+
+        # A value computed into a temporary and then copied: `(OP, a, b, t)` followed by `(ASSIGN, t, v, )`.
+        if target is not None and target.addressing is Addressing.DIRECT and is_temporary(target.value) and \
+                following.opcode is Opcode.ASSIGN and following.first == target and \
+                not (following.second.value == target.value) and not self.is_live(target.value, window[index + 1]):
+            code[position] = with_destination(instruction, following.second)
+            self.live_after[position] = self.live_after[window[index + 1]]
+            self.drop(window, index + 1)
+            return True
+
+        # A copy to a temporary that the next use of the temporary can read from the copied operand instead:
+        # `(ASSIGN, a, t, )` followed, a few instructions later, by one that reads t.
+        if instruction.opcode is Opcode.ASSIGN and target.addressing is Addressing.DIRECT and \
+                is_temporary(target.value):
+            return self.forward_copy(window, index)
+        return False
+
+    def forward_copy(self, window, index):
+        code = self.code
+        position = window[index]
+        value, temporary = code[position].first, code[position].second
+        cell = temporary.value
+        last = index + 1 if value.addressing is Addressing.INDIRECT else index + forwarding_distance
+        for later in range(index + 1, min(last + 1, len(window))):
+            other = code[window[later]]
+            effects = effects_of(other)
+            if cell in effects.uses:
+                # The temporary has to be read as a value, and nowhere as a pointer.
+                if other.first == temporary or (other.opcode in operation_opcodes and other.second == temporary):
+                    is_read_as_pointer = any(operand is not None and operand.value == cell and
+                                             operand.addressing is Addressing.INDIRECT
+                                             for operand in (other.first, other.second, other.third))
+                    if not is_read_as_pointer and (effects.definition == cell or
+                                                   not self.is_live(cell, window[later])):
+                        code[window[later]] = with_sources(other, temporary, value)
+                        if value.addressing is Addressing.DIRECT:
+                            for between in window[index:later]:
+                                self.live_after[between] |= self.liveness.bits[value.value]
+                        self.drop(window, index)
+                        return True
+                return False
+            if effects.definition == cell or is_jump(other):
+                return False
+            if value.addressing is Addressing.DIRECT and (effects.definition == value.value or
+                                                          (is_addressable(value.value) and effects.stores)):
+                return False
+        return False
+
+    def thread_jumps(self):
+        # A jump to a jump goes straight to where the second one goes, through its target operand.
+        code = self.code
+        for position, instruction in enumerate(code):
+            if instruction is None or not is_jump(instruction) or called_function(code, position) is not None:
+                continue
+            target = instruction.second if instruction.opcode is Opcode.JPF else instruction.first
+            final = target
+            for _ in range(len(code)):
+                if final.addressing is not Addressing.DIRECT:
+                    break
+                address = code_address(final)
+                if type(address) is not int or not 0 <= address < len(code):
+                    break
+                next_jump = code[address]
+                if next_jump is None or next_jump.opcode is not Opcode.JP or \
+                        next_jump.first.addressing is not Addressing.DIRECT or \
+                        called_function(code, address) is not None or next_jump.first is final:
+                    break
+                final = next_jump.first
+            if final is not target:
+                if instruction.opcode is Opcode.JPF:
+                    code[position] = Instruction(Opcode.JPF, instruction.first, final,
+                                                 is_compact=instruction.is_compact)
+                else:
+                    code[position] = Instruction(Opcode.JP, final, is_compact=instruction.is_compact)
+                self.is_changed = True
+
+    def drop_jumps_to_next(self):
+        # A jump to the instruction that comes next anyway, once the dropped ones are gone. The jump to main at 0
+        # stays where it is, as that is where the code starts.
+        code = self.code
+        next_kept = [len(code)] * (len(code) + 1)
+        for position in range(len(code) - 1, -1, -1):
+            next_kept[position] = position if self.is_kept[position] else next_kept[position + 1]
+        for position in range(len(code) - 1, 0, -1):
+            instruction = code[position]
+            if not self.is_kept[position] or instruction is None or not is_jump(instruction):
+                continue
+            target = instruction.second if instruction.opcode is Opcode.JPF else instruction.first
+            address = code_address(target)
+            if target.addressing is Addressing.DIRECT and type(address) is int and 0 <= address <= len(code) and \
+                    next_kept[address] == next_kept[position + 1] and called_function(code, position) is None:
+                self.is_kept[position] = False
+                next_kept[position] = next_kept[position + 1]
+                self.is_changed = True
+
+
+def peephole(code):
+    # Rewrites the finished code, before its labels are resolved, with small local rewrites until none applies:
+    # self copies go, pushes and pops that cancel out become copies, a temporary that only carries a value from one
+    # instruction to the next is skipped, and jumps to jumps or to the next instruction are threaded or dropped.
+    while True:
+        peephole_round = PeepholeRound(code)
+        code = peephole_round.run()
+        if not peephole_round.is_changed:
+            return code
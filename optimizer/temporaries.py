@@ -0,0 +1,107 @@
+# Sepehr Vahedi
+# 99170615
+
+from intermediate_code_generator.instructions import Addressing, Instruction, direct, indirect, stack_pointer, \
+    word_size, first_temporary
+from optimizer.cfg import ControlFlowGraph
+from optimizer.dataflow import Liveness, members, mask_of
+
+
+def is_temporary_cell(cell):
+    return type(cell) is int and cell >= first_temporary and cell != stack_pointer.value
+
+
+def temporary_cell(index):
+    # The cell of the index-th temporary, which steps over the stack pointer like `allocate_temporary` does.
+    address = first_temporary + index * word_size.value
+    return address + word_size.value if address >= stack_pointer.value else address
+
+
+def temporary_cell_count(code):
+    # How many cells the temporaries of the code spread over, from the first one up to the highest one used.
+    highest = -1
+    for instruction in code:
+        if instruction is None:
+            continue
+        for operand in (instruction.first, instruction.second, instruction.third):
+            if operand is not None and operand.addressing is not Addressing.IMMEDIATE and \
+                    is_temporary_cell(operand.value):
+                highest = max(highest, operand.value)
+    if highest < 0:
+        return 0
+    count = (highest - first_temporary) // word_size.value + 1
+    return count - 1 if highest > stack_pointer.value else count
+
+
+class TemporaryAllocator:
+    # Gives the temporaries of the finished code new cells from a pool, so that temporaries that are never live at the
+    # same time share a cell. Two temporaries interfere when one is written where the other is live after, as the
+    # write would clobber it; temporaries are handed the lowest cell that none of those interfering with them holds, in
+    # order of their first use. Liveness is over the whole program, so a temporary that is live across a call is kept
+    # apart from the temporaries of every function that the call may reach, but not from the rest of the code between.
+    def __init__(self):
+        self.cells_before = None
+        self.cells_after = None
+
+    def allocate(self, code):
+        cfg = ControlFlowGraph(code)
+        liveness = Liveness(cfg)
+        self.cells_before = temporary_cell_count(code)
+        temporary_mask = mask_of([index for index, cell in enumerate(liveness.cells) if is_temporary_cell(cell)])
+
+        # A temporary that is live at the start of the program is read before it is written, so it counts as written
+        # there, along with the others live at the start.
+        entry = liveness.live_in[0] & temporary_mask
+        starts = {cell: 0 for cell in members(entry, liveness.cells)}
+        conflicts = {cell: entry & ~liveness.bits[cell] for cell in starts}
+        seen = entry
+        for block in cfg.blocks:
+            live_after = liveness.live_after(block)
+            for position in range(block.start, block.end):
+                new = (liveness.uses[position] | liveness.definitions[position]) & temporary_mask & ~seen
+                if new:
+                    for cell in members(new, liveness.cells):
+                        starts[cell] = position
+                    seen |= new
+                definition = liveness.definitions[position] & temporary_mask
+                if definition:
+                    cell = liveness.effects[position].definition
+                    conflicts[cell] = conflicts.get(cell, 0) | live_after[position - block.start] & temporary_mask & \
+                        ~definition
+
+        # Conflicts are only kept on the side of the temporary that is written, so a cell is free for a temporary when
+        # it conflicts with none of the cell's temporaries and none of them conflicts with it.
+        slots = {}
+        slot_cells = []
+        slot_conflicts = []
+        for cell in sorted(starts, key=starts.get):
+            bit = liveness.bits[cell]
+            conflict = conflicts.get(cell, 0)
+            for slot, cells in enumerate(slot_cells):
+                if not cells & conflict and not slot_conflicts[slot] & bit:
+                    break
+            else:
+                slot = len(slot_cells)
+                slot_cells.append(0)
+                slot_conflicts.append(0)
+            slots[cell] = slot
+            slot_cells[slot] |= bit
+            slot_conflicts[slot] |= conflict
+        cells = {cell: temporary_cell(slot) for cell, slot in slots.items()}
+        self.cells_after = len(slot_cells)
+        return [self.renamed(instruction, cells) for instruction in code]
+
+    @staticmethod
+    def renamed(instruction, cells):
+        if instruction is None:
+            return None
+        operands = [instruction.first, instruction.second, instruction.third]
+        is_renamed = False
+        for index, operand in enumerate(operands):
+            if operand is not None and operand.addressing is not Addressing.IMMEDIATE and operand.value in cells:
+                renamed = cells[operand.value]
+                operands[index] = direct(renamed) if operand.addressing is Addressing.DIRECT else indirect(renamed)
+                is_renamed = True
+        if not is_renamed:
+            return instruction
+        return Instruction(instruction.opcode, *operands, is_compact=instruction.is_compact)
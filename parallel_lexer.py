@@ -0,0 +1,150 @@
+# Sepehr Vahedi
+# 99170615
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics, Phases
+from lexer import Lexer
+from token_store import TokenStore
+
+DEFAULT_OVERLAP = 1 << 12
+MIN_CHUNK_SIZE = 1 << 16
+# Below these, starting the worker processes and stitching their chunks costs more than lexing in parallel saves
+# (benchmarks/parallel_lexing.py): a worker lexes at about the serial speed, and stitching takes a fifth of that.
+MIN_PARALLEL_SIZE = 1 << 20
+MIN_PARALLEL_WORKERS = 3
+
+
+class CollectingLexer(Lexer):
+    # Keeps lexical errors as (line, text, message, offset) rows instead of printing them, so that errors found
+    # by a worker can be ordered and filtered by the process that stitches the chunks together.
+    def __init__(self, source, symbol_table: SymbolTable, **options):
+        super().__init__(source, symbol_table, **options)
+        self.errors = []
+
+    def _report_error(self, line_number, dumped_text, error_message, offset):
+        self.errors.append((line_number, dumped_text, error_message, offset))
+
+
+def lex_until(lexer: CollectingLexer, stop: int, is_complete: bool):
+    # Lexes into `lexer.tokens` until the first token that ends at or after `stop`, or through END when `stop` is
+    # the end of the lexer's text. When that text is only a prefix of the program (`is_complete` off), a token that
+    # runs into its end may be cut short, so False is returned and the range has to be lexed again.
+    text_length = len(lexer.text)
+    while True:
+        token = lexer.get_next_token()
+        if token.type == 'END':
+            return is_complete
+        end = token.offset + len(token.lexeme)
+        if end >= text_length and not is_complete:
+            return False
+        if end >= stop and stop < text_length:
+            return True
+
+
+def lex_chunk(text: str, chunk_start: int, chunk_end: int, is_complete: bool):
+    # Runs in a worker. `text` starts at `chunk_start` of the program and reaches a little past `chunk_end`; it is
+    # lexed as if it were a program of its own, so lines count from 1, offsets are relative to `chunk_start` and
+    # columns of the tokens on the first line are relative to `chunk_start` as well.
+    lexer = CollectingLexer(text, SymbolTable())
+    if not lex_until(lexer, chunk_end - chunk_start, is_complete):
+        return None, []
+    return lexer.tokens, lexer.errors
+
+
+def split_points(text_length: int, chunk_count: int):
+    chunk_size = max(MIN_CHUNK_SIZE, -(-text_length // max(chunk_count, 1)))
+    return list(range(0, max(text_length, 1), chunk_size)) + [text_length]
+
+
+def pays_off(text_length: int, workers: int):
+    # Whether lexing in parallel can beat one serial run: only with enough cores to run the workers at once, and a
+    # text long enough to make up for the processes started.
+    return min(workers, os.cpu_count() or 1) >= MIN_PARALLEL_WORKERS and text_length >= MIN_PARALLEL_SIZE
+
+
+def lex_serial(text: str, diagnostics: Diagnostics = None):
+    lexer = Lexer(text, SymbolTable(), diagnostics=diagnostics)
+    while lexer.get_next_token().type != 'END':
+        pass
+    return lexer.tokens
+
+
+def lex_parallel(text: str, workers: int = None, chunk_count: int = None, overlap: int = DEFAULT_OVERLAP,
+                 diagnostics: Diagnostics = None, always_parallel: bool = False):
+    # Lexes `text` in chunks on a process pool and returns the same tokens (ending with END) as a serial `Lexer`
+    # run, in a `TokenStore`, after reporting the same errors in the same order. When that cannot pay off (see
+    # `pays_off`), the text is lexed serially instead, unless `always_parallel` is set.
+    #
+    # Every worker starts its chunk in the DFA start state. The serial run is in that state at the end of each
+    # token, so a chunk's result is valid from the first of its tokens that ends exactly where the previous chunk
+    # stopped: from there on both runs lex identical text from identical states. The line number of that token
+    # in the serial run is known from the previous chunk, which fixes the shift for the rest of the chunk (line
+    # numbers cannot be prefix sums of newline counts, because newlines inside /* */ comments are not counted).
+    # When a chunk starts inside a comment or a token, no such token exists and the range is lexed again serially.
+    diagnostics = diagnostics or Diagnostics()
+    workers = workers or os.cpu_count() or 1
+    if not always_parallel and not pays_off(len(text), workers):
+        return lex_serial(text, diagnostics)
+    chunk_count = chunk_count or workers * 4
+    points = split_points(len(text), chunk_count)
+    chunks = list(zip(points, points[1:]))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(lex_chunk, text[start:end + overlap], start, end, end + overlap >= len(text))
+                   for start, end in chunks]
+        results = [future.result() for future in futures]
+
+    tokens = TokenStore()
+    errors = []
+    serial_lexer = CollectingLexer(text, SymbolTable())
+    position, line_number = 0, 1
+
+    def lex_serially(stop):
+        serial_lexer.seek(position, line_number)
+        serial_lexer.tokens = TokenStore()
+        serial_lexer.errors = []
+        lex_until(serial_lexer, stop, True)
+        tokens.extend(serial_lexer.tokens)
+        errors.extend(serial_lexer.errors)
+
+    for (chunk_start, chunk_end), (chunk_tokens, chunk_errors) in zip(chunks, results):
+        if tokens and tokens[-1].type == 'END':
+            break
+        if position >= chunk_end:
+            continue
+
+        resume = None
+        if chunk_tokens is not None:
+            if position == chunk_start:
+                resume = (0, line_number - 1)
+            else:
+                for index, token in enumerate(chunk_tokens):
+                    end = chunk_start + token.offset + len(token.lexeme)
+                    if end == position:
+                        resume = (index + 1, line_number - token.line_number)
+                        break
+                    if end > position:
+                        break
+
+        if resume is None or resume[0] == len(chunk_tokens):
+            lex_serially(chunk_end)
+        else:
+            first_index, line_shift = resume
+            for line, dumped_text, error_message, offset in chunk_errors:
+                if chunk_start + offset >= position:
+                    errors.append((line + line_shift, dumped_text, error_message, chunk_start + offset))
+            # The chunk lexer took the chunk start for the start of the line the chunk starts in.
+            tokens.extend(chunk_tokens, first_index, chunk_start, line_shift, text.rfind('\n', 0, chunk_start) + 1)
+
+        last = tokens[-1]
+        position = last.offset + len(last.lexeme) if last.type != 'END' else len(text)
+        line_number = last.line_number
+
+    if not tokens or tokens[-1].type != 'END':
+        lex_serially(len(text))
+    for line, dumped_text, error_message, offset in errors:
+        diagnostics.report(Phases.LEXICAL, line, error_message, dumped_text)
+    return tokens
@@ -0,0 +1,129 @@
+# Sepehr Vahedi
+# 99170615
+
+from array import array
+
+from anytree import Node
+
+from token_store import Token, TokenStore, token_type_names
+
+# Token index of a node that is not matched yet, and of an epsilon or end-of-input node that is matched without
+# consuming a token.
+unmatched = -1
+matched_without_token = -2
+
+
+class ParseTreeArena:
+    # Records the parse tree in parallel arrays indexed by node: the grammar symbol, the parent, the first child,
+    # the next sibling and the index of the matched token in `tokens`. Nodes are plain integers, children of a
+    # node are always allocated together and in order, and a node dropped by error recovery only loses its parent.
+    def __init__(self, symbol_names, terminal_contents):
+        self.symbol_names = symbol_names
+        self.terminal_contents = terminal_contents
+        self.symbols = array('i')
+        self.parents = array('i')
+        self.first_children = array('i')
+        self.next_siblings = array('i')
+        self.token_indexes = array('i')
+        self.tokens = TokenStore()
+        self.root = None
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __new_node(self, symbol, parent):
+        self.symbols.append(symbol)
+        self.parents.append(parent)
+        self.first_children.append(-1)
+        self.next_siblings.append(-1)
+        self.token_indexes.append(unmatched)
+        return len(self.symbols) - 1
+
+    def add_root(self, symbol):
+        self.root = self.__new_node(symbol, -1)
+        return self.root
+
+    def add_children(self, parent, symbols):
+        first = len(self.symbols)
+        nodes = [self.__new_node(symbol, parent) for symbol in symbols]
+        if nodes:
+            self.first_children[parent] = first
+            for node in nodes[:-1]:
+                self.next_siblings[node] = node + 1
+        return nodes
+
+    def add_matched_child(self, parent, terminal):
+        node = self.__new_node(terminal, parent)
+        self.token_indexes[node] = matched_without_token
+        child = self.first_children[parent]
+        if child < 0:
+            self.first_children[parent] = node
+            return
+        while self.next_siblings[child] >= 0:
+            child = self.next_siblings[child]
+        self.next_siblings[child] = node
+
+    def match(self, node, token: Token):
+        self.token_indexes[node] = len(self.tokens)
+        self.tokens.append(token)
+
+    def match_without_token(self, node, terminal):
+        self.token_indexes[node] = matched_without_token
+
+    def detach(self, node):
+        self.parents[node] = -1
+
+    def name(self, node):
+        token_index = self.token_indexes[node]
+        if token_index >= 0:
+            return '(' + token_type_names[self.tokens.type_codes[token_index]] + ', ' + \
+                   self.tokens.lexemes[self.tokens.lexeme_ids[token_index]] + ')'
+        if token_index == matched_without_token:
+            return self.terminal_contents[self.symbols[node]]
+        return self.symbol_names[self.symbols[node]]
+
+    def children(self, node):
+        child = self.first_children[node]
+        while child >= 0:
+            if self.parents[child] == node:
+                yield child
+            child = self.next_siblings[child]
+
+    def iter_lines(self):
+        # Pre-order walk with an explicit stack, yielding the lines of anytree's `RenderTree` in its default
+        # `ContStyle`, so the output matches `f'{pre}{node.name}'` over the tree from `to_anytree`.
+        if self.root is None:
+            return
+        yield self.name(self.root)
+        stack = [(list(self.children(self.root))[::-1], '')]
+        while stack:
+            pending, fill = stack[-1]
+            if not pending:
+                stack.pop()
+                continue
+            node = pending.pop()
+            is_last = not pending
+            yield fill + ('└── ' if is_last else '├── ') + self.name(node)
+            children = list(self.children(node))
+            if children:
+                stack.append((children[::-1], fill + ('    ' if is_last else '│   ')))
+
+    def write(self, file):
+        file.writelines(line + '\n' for line in self.iter_lines())
+
+    def to_anytree(self):
+        # Built bottom-up with an explicit stack: a node gets its children before it has a parent itself, so
+        # anytree's check that a new child is not an ancestor of its parent stops at once instead of walking up to
+        # the root, which would be quadratic over the deeply nested declaration and statement lists.
+        if self.root is None:
+            return None
+        built = {}
+        stack = [(self.root, False)]
+        while stack:
+            node, is_expanded = stack.pop()
+            if is_expanded:
+                built[node] = Node(self.name(node), children=[built.pop(child) for child in self.children(node)])
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in self.children(node))
+        return built[self.root]
@@ -1,132 +1,153 @@
 # Sepehr Vahedi
 # 99170615
 
+import hashlib
+import marshal
+import os
 from enum import Enum
 from types import DynamicClassAttribute
 
-from anytree import Node
-
-from symbols import ActionSymbols, CheckSymbols
+from symbols import ActionSymbols, CheckSymbols, Terminals, terminal_codes
+from diagnostics import Diagnostics, Phases
+from parse_tree import ParseTreeArena
 from lexer import Lexer
 from intermediate_code_generator.expression_processor import CodeGenerator
 
 
 
+class RecoveryModes(Enum):
+    # TOKEN drops one illegal token per error; PANIC skips to a synchronizing terminal and reports one error for
+    # the whole region it recovers from.
+    TOKEN = 'token'
+    PANIC = 'panic'
+
+
 class Parser:
-    def __init__(self, lexer: Lexer, code_generator: CodeGenerator):
+    def __init__(self, lexer: Lexer, code_generator: CodeGenerator, diagnostics: Diagnostics = None,
+                 build_tree: bool = True, recovery: RecoveryModes = RecoveryModes.TOKEN, error_budget: int = None):
+        # With `build_tree` off no parse tree is recorded; the generated code and the reported errors are the same
+        # either way. The tree is kept in the `ParseTreeArena` at `self.tree`, and `self.node` converts it to anytree
+        # nodes. Parsing ends early, as on an unexpected EOF, at the `error_budget`th syntax error, which is reported;
+        # `Diagnostics.max_errors` counts the same way.
         self.lexer = lexer
         self.code_generator = code_generator
+        self.diagnostics = diagnostics or Diagnostics()
+        self.recovery = recovery
+        self.error_budget = error_budget
+        self.error_count = 0
+        self.is_budget_spent = False
         self.__current_token = None
         self.__lookahead = None
-        self.node = Node(start_symbol.name)
-        self.stack = [start_symbol]
-        create_parsing_table()
+        self.__tokens_to_resume = 0
+        self.tree = ParseTreeArena(symbol_names, terminal_contents) if build_tree else None
+        self.stack = [symbol_codes[start_symbol]]
+        self.__root = self.tree.add_root(self.stack[0]) if self.tree is not None else None
+        self.__node = None
+
+    @property
+    def node(self):
+        # The anytree root of the parse tree, built from the arena the first time it is asked for.
+        if self.__node is None and self.tree is not None:
+            self.__node = self.tree.to_anytree()
+        return self.__node
 
     def __get_token(self):
         self.__current_token = self.lexer.get_next_token()
-        if self.__current_token.type in ['KEYWORD', 'SYMBOL', 'END']:
-            la = self.__current_token.lexeme
-        else:
-            la = self.__current_token.type
-        self.__lookahead = Terminals.get_enum_by_content(la)
+        self.__lookahead = self.__current_token.terminal_code
+
+    def __report_error(self, message):
+        # In panic mode the errors that follow an error are taken as its cascade and dropped until
+        # `recovery_window` tokens have been matched again.
+        if self.__tokens_to_resume:
+            return
+        self.diagnostics.report(Phases.SYNTAX, self.__current_token.line_number, message)
+        self.error_count += 1
+        if self.recovery == RecoveryModes.PANIC:
+            self.__tokens_to_resume = recovery_window
+        if self.error_budget is not None and self.error_count >= self.error_budget:
+            self.is_budget_spent = True
+
+    def __synchronize(self, nonterminal):
+        # Skips tokens up to one that `nonterminal` can start with or be followed by, or a `;` or `}` that ends the
+        # statement or block around it. Returns whether `nonterminal` has to be dropped because parsing resumes at
+        # such a statement end instead.
+        synchronizing = synchronizing_terminals[nonterminal - terminal_count]
+        while self.__lookahead not in synchronizing:
+            self.__get_token()
+        return self.__lookahead != dollar_code and \
+            parsing_table[(nonterminal - terminal_count) * terminal_count + self.__lookahead] == no_entry
 
     def parse(self):
         is_running = True
-        nodes = [self.node]
+        tree = self.tree
+        # Pending tree nodes, one per grammar symbol on the parse stack and in the same order, so the next node to
+        # fill in is always the last one.
+        nodes = [self.__root]
         self.__get_token()
-        while self.stack and is_running:
+        while self.stack and is_running and not self.is_budget_spent:
             top = self.stack[-1]
-            if type(top) is ActionSymbols:
-                self.code_generator.code_gen(top, self.__current_token)
-                self.stack.pop()
-            elif type(top) is CheckSymbols:
-                self.code_generator.semantic_check(top, self.__current_token)
+            if top >= nonterminal_end:
+                if top < action_end:
+                    self.code_generator.code_gen(grammar_symbols[top], self.__current_token)
+                else:
+                    self.code_generator.semantic_check(grammar_symbols[top], self.__current_token)
                 self.stack.pop()
-            elif type(top) is Terminals:
-                if top == Terminals.EPSILON:
+            elif top < terminal_count:
+                if top == epsilon_code:
                     self.stack.pop()
-                    node = nodes.pop(0)
-                    node.name = Terminals.EPSILON.content
+                    if tree is not None:
+                        tree.match_without_token(nodes.pop(), top)
                 elif top == self.__lookahead:
                     self.stack.pop()
-                    node = nodes.pop(0)
-                    node.name = '(' + self.__current_token.type + ', ' + self.__current_token.lexeme + ')'
+                    if tree is not None:
+                        tree.match(nodes.pop(), self.__current_token)
+                    if self.__tokens_to_resume:
+                        self.__tokens_to_resume -= 1
                     self.__get_token()
                 else:
-                    report_syntax_error(self.__current_token.line_number, f'missing {top.content}')
+                    self.__report_error(f'missing {terminal_contents[top]}')
                     self.stack.pop()
-                    node = nodes.pop(0)
-                    node.parent = None
+                    if tree is not None:
+                        tree.detach(nodes.pop())
             else:
-                action = ll1_table[top.name][self.__lookahead.name]
-                if action is None:
-                    if self.__lookahead == Terminals.DOLLAR:
-                        report_syntax_error(self.__current_token.line_number, f'Unexpected EOF')
+                entry = parsing_table[(top - terminal_count) * terminal_count + self.__lookahead]
+                if entry == no_entry:
+                    if self.__lookahead == dollar_code:
+                        # Reported even within a cascade, since it ends the parse.
+                        self.__tokens_to_resume = 0
+                        self.__report_error(f'Unexpected EOF')
                         is_running = False
-                        for node in nodes:
-                            node.parent = None
+                        if tree is not None:
+                            for node in nodes:
+                                tree.detach(node)
+                    elif self.recovery == RecoveryModes.PANIC:
+                        self.__report_error(f'illegal {terminal_contents[self.__lookahead]}')
+                        if self.__synchronize(top):
+                            self.stack.pop()
+                            if tree is not None:
+                                tree.detach(nodes.pop())
                     else:
-                        report_syntax_error(self.__current_token.line_number, f'illegal {self.__lookahead.content}')
+                        self.__report_error(f'illegal {terminal_contents[self.__lookahead]}')
                         self.__get_token()
-                elif type(action) is str:
-                    report_syntax_error(self.__current_token.line_number, f'missing {top.name}')
+                elif entry == synch_entry:
+                    self.__report_error(f'missing {symbol_names[top]}')
                     self.stack.pop()
-                    node = nodes.pop(0)
-                    node.parent = None
+                    if tree is not None:
+                        tree.detach(nodes.pop())
                 else:
-                    new_node = nodes.pop(0)
-                    new_nodes = []
-                    for variable in action:
-                        if type(variable) is not Terminals and type(variable) is not NonTerminals:
-                            continue
-                        new_nodes.append(Node(variable.name, parent=new_node))
-                    nodes = new_nodes + nodes
+                    if tree is not None:
+                        nodes.extend(reversed(tree.add_children(nodes.pop(), production_tree_symbols[entry])))
                     self.stack.pop()
-                    self.stack += action[::-1]
-        if is_running:
-            Node(Terminals.DOLLAR.content, self.node)
+                    self.stack += reversed_production_bodies[entry]
+        if is_running and self.is_budget_spent:
+            is_running = False
+            if tree is not None:
+                for node in nodes:
+                    tree.detach(node)
+        if is_running and tree is not None:
+            tree.add_matched_child(self.__root, dollar_code)
         if self.code_generator.is_erroneous:
-            self.code_generator.program_block = []
-
-
-class Terminals(Enum):
-    NUM = 'NUM'
-    ID = 'ID'
-    IF = 'if'
-    ELSE = 'else'
-    ENDIF = 'endif'
-    VOID = 'void'
-    INT = 'int'
-    WHILE = 'while'
-    BREAK = 'break'
-    RETURN = 'return'
-    SEMICOLON = ';'
-    COLON = ':'
-    COMMA = ','
-    BRACKET_OPEN = '['
-    BRACKET_CLOSE = ']'
-    PARENTHESIS_OPEN = '('
-    PARENTHESIS_CLOSE = ')'
-    BRACE_OPEN = '{'
-    BRACE_CLOSE = '}'
-    PLUS = '+'
-    MINUS = '-'
-    STAR = '*'
-    ASSIGN = '='
-    LESS_THAN = '<'
-    EQUAL = '=='
-    SLASH = '/'
-    EPSILON = 'epsilon'
-    DOLLAR = '$'
-
-    def __init__(self, value):
-        self.content = value
-
-    @classmethod
-    def get_enum_by_content(cls, content):
-        for t in Terminals:
-            if t.content == content:
-                return t
+            self.code_generator.discard_code()
 
 
 class NonTerminals(Enum):
@@ -494,34 +515,99 @@ def first(statement):
 
 
 
+# Every grammar symbol is encoded as its index in `grammar_symbols`: terminals first, then nonterminals, action
+# symbols and check symbols, so the parser can tell their kinds apart by comparing the code with the range bounds.
+# Terminals keep their position in `Terminals`, so their codes are the `terminal_codes` the lexer puts on tokens.
+grammar_symbols = tuple(Terminals) + tuple(NonTerminals) + tuple(ActionSymbols) + tuple(CheckSymbols)
+symbol_codes = {symbol: code for code, symbol in enumerate(grammar_symbols)}
+terminal_count = len(Terminals)
+nonterminal_end = terminal_count + len(NonTerminals)
+action_end = nonterminal_end + len(ActionSymbols)
+epsilon_code = symbol_codes[Terminals.EPSILON]
+dollar_code = symbol_codes[Terminals.DOLLAR]
+symbol_names = tuple(symbol.name for symbol in grammar_symbols)
+terminal_contents = tuple(terminal.content for terminal in Terminals)
 
-ll1_table = {}
-for nonterminal in NonTerminals:
-    ll1_table[nonterminal.name] = {}
-    row = {}
-    for terminal in Terminals:
-        row[terminal.name] = None
-    ll1_table[nonterminal.name] = row
+no_entry = -1
+synch_entry = -2
+# The table is cached in the user's cache directory, never in the source tree, which may be read-only or shared.
+cache_directory = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                               'cminus-compiler')
+parsing_table_path = os.path.join(cache_directory, 'parsing_table.marshal')
 
 
-def create_parsing_table():
+def grammar_fingerprint():
+    grammar = [[type(symbol).__name__, symbol.name] for symbol in grammar_symbols]
     for nonterminal in NonTerminals:
+        grammar.append([[symbol_codes[symbol] for symbol in production] for production in productions[nonterminal]])
+        grammar.append([[symbol_codes[symbol] for symbol in nonterminal.first],
+                        [symbol_codes[symbol] for symbol in nonterminal.follow]])
+    return hashlib.sha256(repr(grammar).encode()).hexdigest()
+
+
+def create_parsing_table():
+    # Returns the productions as tuples of symbol codes and the LL(1) table as a flat list with one row of
+    # `terminal_count` entries per nonterminal. An entry is a production index, `no_entry` or `synch_entry`.
+    production_bodies = []
+    parsing_table = [no_entry] * (len(NonTerminals) * terminal_count)
+    for row, nonterminal in enumerate(NonTerminals):
         action_leading_to_epsilon = None
         for production in productions[nonterminal]:
+            production_index = len(production_bodies)
+            production_bodies.append(tuple(symbol_codes[symbol] for symbol in production))
             for terminal in first(production):
                 if terminal != Terminals.EPSILON:
-                    ll1_table[nonterminal.name][terminal.name] = production
+                    parsing_table[row * terminal_count + symbol_codes[terminal]] = production_index
                 else:
-                    action_leading_to_epsilon = production
-        default_value = action_leading_to_epsilon if action_leading_to_epsilon else 'synch'
+                    action_leading_to_epsilon = production_index
+        default_value = action_leading_to_epsilon if action_leading_to_epsilon is not None else synch_entry
         for terminal in nonterminal.follow:
-            if ll1_table[nonterminal.name][terminal.name] is None:
-                ll1_table[nonterminal.name][terminal.name] = default_value
-
-
-
-def report_syntax_error(error_line, error_message):
-    print("error_line")
-    print(error_line)
-    print("error_message")
-    print(error_message)
+            if parsing_table[row * terminal_count + symbol_codes[terminal]] == no_entry:
+                parsing_table[row * terminal_count + symbol_codes[terminal]] = default_value
+    return tuple(production_bodies), parsing_table
+
+
+def load_parsing_table():
+    # The compiled table is only rebuilt when the grammar's fingerprint changes. If the cache cannot be written, the
+    # table built in memory is used as it is.
+    fingerprint = grammar_fingerprint()
+    try:
+        with open(parsing_table_path, 'rb') as file:
+            cached_fingerprint, production_bodies, parsing_table = marshal.load(file)
+        if cached_fingerprint == fingerprint:
+            return production_bodies, list(parsing_table)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    production_bodies, parsing_table = create_parsing_table()
+    temporary_path = f'{parsing_table_path}.{os.getpid()}'
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+        with open(temporary_path, 'wb') as file:
+            marshal.dump((fingerprint, production_bodies, tuple(parsing_table)), file)
+        os.replace(temporary_path, parsing_table_path)
+    except OSError:
+        pass
+    finally:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+    return production_bodies, parsing_table
+
+
+production_bodies, parsing_table = load_parsing_table()
+# Bodies in the order they are pushed on the parse stack, and the symbols of each body that get a tree node.
+reversed_production_bodies = tuple(body[::-1] for body in production_bodies)
+production_tree_symbols = tuple(tuple(symbol for symbol in body if symbol < nonterminal_end)
+                                for body in production_bodies)
+
+# Panic-mode recovery for a nonterminal resumes at a terminal with an entry in its table row (FIRST and FOLLOW), at
+# a statement or block end, or at the end of the input.
+recovery_window = 3
+statement_ends = (terminal_codes[Terminals.SEMICOLON.content], terminal_codes[Terminals.BRACE_CLOSE.content],
+                  dollar_code)
+synchronizing_terminals = tuple(
+    frozenset(terminal for terminal in range(terminal_count)
+              if parsing_table[row * terminal_count + terminal] != no_entry or terminal in statement_ends)
+    for row in range(len(NonTerminals)))
@@ -0,0 +1,107 @@
+# Sepehr Vahedi
+# 99170615
+
+import re
+
+from symbols import SymbolTable, terminal_codes, num_code, id_code, dollar_code
+from diagnostics import Diagnostics
+from lexer import Lexer, Token, TokenTypes, ErrorMessages
+from lexer import id_keyword_type, keyword_type, id_type, symbol_type, keyword_codes
+from lexer import digits, letters, symbols, whitespace
+
+
+def character_class(characters):
+    return ''.join(re.escape(char) for char in characters)
+
+
+digit_class = character_class(digits)
+letter_class = character_class(letters)
+invalid_class = '^' + character_class(digits + letters + symbols + whitespace)
+single_symbol_class = character_class(char for char in symbols if char not in '=*/')
+
+# One alternative per outcome of the DFA in `lexer.py`, ordered by how often they occur. IDs, numbers and the
+# symbols that the DFA finishes by reversion are followed by an optional invalid character: when it is present
+# the whole match is the text the DFA dumps as an error before resetting to the start state.
+master_pattern = re.compile('|'.join([
+    rf'(?P<WHITESPACE>[{character_class(whitespace)}]+)',
+    rf'(?P<ID_KEYWORD>[{letter_class}][{letter_class}{digit_class}]*)(?P<ID_INVALID_INPUT>[{invalid_class}])?',
+    rf'(?P<NUM>[{digit_class}]+)(?:(?P<INVALID_NUMBER>[{letter_class}])|(?P<NUM_INVALID_INPUT>[{invalid_class}]))?',
+    rf'(?P<SYMBOL>[{single_symbol_class}]|==)',
+    r'(?P<COMMENT>/\*.*?\*/)',
+    r'(?P<UNCLOSED_COMMENT>/\*.*)',
+    r'(?P<LINE_COMMENT>//[^\n]*)',
+    r'(?P<UNMATCHED_COMMENT>\*/)',
+    rf'(?P<REVERSIBLE_SYMBOL>[=*/])(?P<SYMBOL_INVALID_INPUT>[{invalid_class}])?',
+    r'(?P<INVALID_INPUT>.)',
+]), re.DOTALL)
+
+token_groups = {
+    'ID_KEYWORD': TokenTypes.ID_KEY.value,
+    'NUM': TokenTypes.NUM.value,
+    'SYMBOL': TokenTypes.SYMBOL.value,
+    'REVERSIBLE_SYMBOL': TokenTypes.SYMBOL.value,
+}
+error_groups = {
+    'ID_INVALID_INPUT': ErrorMessages.INVALID_INPUT.value,
+    'INVALID_NUMBER': ErrorMessages.INVALID_NUMBER.value,
+    'NUM_INVALID_INPUT': ErrorMessages.INVALID_INPUT.value,
+    'UNCLOSED_COMMENT': ErrorMessages.UNCLOSED_COMMENT.value,
+    'UNMATCHED_COMMENT': ErrorMessages.UNMATCHED_COMMENT.value,
+    'SYMBOL_INVALID_INPUT': ErrorMessages.INVALID_INPUT.value,
+    'INVALID_INPUT': ErrorMessages.INVALID_INPUT.value,
+}
+
+
+class RegexLexer(Lexer):
+    # Produces the same tokens and errors as the DFA (tests/test_regex_lexer.py checks this). It is about as fast on
+    # plain code and faster when comments make up much of the text, as a whole comment is one match
+    # (benchmarks/lexer_backends.py).
+    def __init__(self, source, symbol_table: SymbolTable, retain_tokens: bool = True, max_lookahead: int = 1,
+                 diagnostics: Diagnostics = None):
+        # The master pattern matches against one buffer, so readable sources are loaded in full.
+        if not isinstance(source, str):
+            source = source.read()
+            if isinstance(source, bytes):
+                source = source.decode('utf-8')
+        super().__init__(source, symbol_table, retain_tokens=retain_tokens, max_lookahead=max_lookahead,
+                         diagnostics=diagnostics)
+        self.__matches = None
+
+    def _scan_token(self):
+        # Every character is covered by some alternative, so consecutive matches tile the whole buffer and one
+        # `finditer` walk can be shared by all calls.
+        if self.__matches is None:
+            self.__matches = master_pattern.finditer(self.text, self.position)
+        text = self.text
+        line_number = self.line_number
+        position = len(text)
+        token = None
+
+        for match in self.__matches:
+            group = match.lastgroup
+            token_type = token_groups.get(group)
+            if token_type:
+                start, position = match.span()
+                lexeme = match.group()
+                if token_type == id_keyword_type:
+                    terminal_code = keyword_codes.get(lexeme)
+                    if terminal_code is None:
+                        token_type, terminal_code = id_type, id_code
+                    else:
+                        token_type = keyword_type
+                elif token_type == symbol_type:
+                    terminal_code = terminal_codes.get(lexeme)
+                else:
+                    terminal_code = num_code
+                token = Token(lexeme, token_type, line_number, start, self._column_of(start), terminal_code)
+                break
+            elif group == 'WHITESPACE':
+                line_number += text.count('\n', *match.span())
+            elif group in error_groups:
+                self._report_error(line_number, match.group(), error_groups[group], match.start())
+
+        if token is None:
+            token = Token('$', 'END', line_number, position, self._column_of(position), dollar_code)
+        self.position = position
+        self.line_number = line_number
+        return token
@@ -47,6 +47,55 @@ class CheckSymbols(Enum):
     TYPE_MATCH = 4
     ARG_TYPE = 5
 
+
+class Terminals(Enum):
+    NUM = 'NUM'
+    ID = 'ID'
+    IF = 'if'
+    ELSE = 'else'
+    ENDIF = 'endif'
+    VOID = 'void'
+    INT = 'int'
+    WHILE = 'while'
+    BREAK = 'break'
+    RETURN = 'return'
+    SEMICOLON = ';'
+    COLON = ':'
+    COMMA = ','
+    BRACKET_OPEN = '['
+    BRACKET_CLOSE = ']'
+    PARENTHESIS_OPEN = '('
+    PARENTHESIS_CLOSE = ')'
+    BRACE_OPEN = '{'
+    BRACE_CLOSE = '}'
+    PLUS = '+'
+    MINUS = '-'
+    STAR = '*'
+    ASSIGN = '='
+    LESS_THAN = '<'
+    EQUAL = '=='
+    SLASH = '/'
+    EPSILON = 'epsilon'
+    DOLLAR = '$'
+
+    def __init__(self, value):
+        self.content = value
+
+    @classmethod
+    def get_enum_by_content(cls, content):
+        for t in Terminals:
+            if t.content == content:
+                return t
+
+
+# Terminal of each keyword and symbol lexeme and of the NUM, ID and END ($) token types, numbered in the order of
+# `Terminals`; the lexer puts it on every token so the parser needs no lookup per token.
+terminal_codes = {terminal.content: code for code, terminal in enumerate(Terminals)}
+num_code = terminal_codes[Terminals.NUM.content]
+id_code = terminal_codes[Terminals.ID.content]
+dollar_code = terminal_codes[Terminals.DOLLAR.content]
+
+
 class Symbol:
     def __init__(self, lexeme=None, first_address=0):
         self.lexeme = lexeme
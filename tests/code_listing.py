@@ -0,0 +1,46 @@
+# Sepehr Vahedi
+# 99170615
+
+from intermediate_code_generator.instructions import Opcode, Addressing, Operand, Instruction, Label, direct, \
+    immediate, indirect, code_address
+
+addressings = {'#': Addressing.IMMEDIATE, '@': Addressing.INDIRECT}
+interned = {Addressing.DIRECT: direct, Addressing.IMMEDIATE: immediate, Addressing.INDIRECT: indirect}
+
+
+def listing(*lines):
+    # Instructions written as the compiler writes them, e.g. `(JPF, 512, L7, )`, for the optimizer's tests. A code
+    # address is written L<position>, as in code whose labels are not resolved yet; each position has one label.
+    labels = {}
+
+    def operand(text):
+        if not text:
+            return None
+        addressing = addressings.get(text[0], Addressing.DIRECT)
+        text = text.lstrip('#@')
+        if text.startswith('L'):
+            position = int(text[1:])
+            return Operand(addressing, labels.setdefault(position, Label(position)))
+        return interned[addressing](int(text))
+
+    code = []
+    for line in lines:
+        opcode, *operands = [field.strip() for field in line.strip('()').split(',')]
+        code.append(Instruction(Opcode[opcode], *[operand(text) for text in operands]))
+    return code
+
+
+def text_of(code):
+    # The instructions as `listing` takes them, with the current position of each label.
+    lines = []
+    for instruction in code:
+        fields = []
+        for operand in (instruction.first, instruction.second, instruction.third):
+            if operand is None:
+                fields.append('')
+            elif type(operand.value) is Label:
+                fields.append(f'{operand.addressing.value}L{code_address(operand)}')
+            else:
+                fields.append(operand.text)
+        lines.append(f'({instruction.opcode.value}, {", ".join(fields)})')
+    return lines
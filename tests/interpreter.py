@@ -0,0 +1,53 @@
+# Sepehr Vahedi
+# 99170615
+
+from intermediate_code_generator.instructions import Opcode, Addressing, code_address
+
+operations = {
+    Opcode.ADD: lambda a, b: a + b,
+    Opcode.SUB: lambda a, b: a - b,
+    Opcode.MULT: lambda a, b: a * b,
+    Opcode.DIV: lambda a, b: int(a / b),
+    Opcode.EQ: lambda a, b: int(a == b),
+    Opcode.LT: lambda a, b: int(a < b),
+}
+
+
+def run(code, step_limit=1000000):
+    # Runs the generated code as the course's tester does, from 0 until it jumps past its end, and returns what it
+    # printed. Cells that were never written hold 0.
+    memory = {}
+
+    def value(operand):
+        if operand.addressing is Addressing.IMMEDIATE:
+            return code_address(operand)
+        if operand.addressing is Addressing.DIRECT:
+            return memory.get(code_address(operand), 0)
+        return memory.get(memory.get(operand.value, 0), 0)
+
+    def address(operand):
+        if operand.addressing is Addressing.INDIRECT:
+            return memory.get(operand.value, 0)
+        return code_address(operand)
+
+    printed = []
+    position = 0
+    for _ in range(step_limit):
+        if not 0 <= position < len(code):
+            return printed
+        instruction = code[position]
+        position += 1
+        opcode = instruction.opcode
+        if opcode is Opcode.ASSIGN:
+            memory[address(instruction.second)] = value(instruction.first)
+        elif opcode in operations:
+            memory[address(instruction.third)] = operations[opcode](value(instruction.first),
+                                                                    value(instruction.second))
+        elif opcode is Opcode.JP:
+            position = address(instruction.first)
+        elif opcode is Opcode.JPF:
+            if not value(instruction.first):
+                position = address(instruction.second)
+        else:
+            printed.append(value(instruction.first))
+    raise AssertionError(f'the code did not stop within {step_limit} steps')
@@ -0,0 +1,109 @@
+# Sepehr Vahedi
+# 99170615
+
+import pytest
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from token_store import Token
+from parser import Parser
+from intermediate_code_generator.expression_processor import CodeGenerator
+from intermediate_code_generator.ast_builder import AstBuilder
+from intermediate_code_generator.ast_lowering import AstLowering
+from intermediate_code_generator.ast_nodes import Number, Name
+
+with open('input.txt') as sample_file:
+    sample = sample_file.read()
+
+samples = [
+    sample,
+    'int fact(int n) {\n  if (n < 2) return 1; else return n * fact(n - 1); endif\n}\n'
+    'int fib(int n) {\n  int r;\n  if (n < 2) { r = n; } else { r = fib(n - 1) + fib(n - 2); } endif\n  return r;\n}\n'
+    'void main(void) {\n  int i;\n  i = 0;\n  while (i < 7) { output(fact(i)); output(fib(i)); i = i + 1; }\n}\n',
+    'int g[5];\nint total;\nint sum(int a[], int n) {\n  int i; int s;\n  i = 0; s = 0;\n'
+    '  while (i < n) { s = s + a[i]; i = i + 1; }\n  return s;\n}\n'
+    'void fill(int a[], int n) {\n  int i;\n  i = 0;\n'
+    '  while (1) { if (i == n) break; else a[i] = i * i; endif i = i + 1; }\n}\n'
+    'void main(void) {\n  int x[4]; int k;\n  fill(g, 5); fill(x, 4);\n'
+    '  total = sum(g, 5) + sum(x, 4);\n  output(total);\n'
+    '  k = 10 / 3 - -2;\n  output(k);\n  x[2] = x[1] + g[3] * 2;\n  output(x[2]);\n}\n',
+    'int max(int a, int b) { if (b < a) return a; else return b; endif }\nint square(int v) { return v * v; }\n'
+    'int depth(int n) { if (n == 0) return 0; else return 1 + depth(n - 1); endif }\n'
+    'void main(void) {\n  int a; int b; int c; int arr[10];\n  a = 3; b = 4;\n'
+    '  c = max(square(a), square(b)) + max(a, b) * depth(5);\n  output(c);\n  arr[max(1, 2)] = square(3) + depth(2);\n'
+    '  while (a < 10) { a = a + 1; if (a == 7) break; else output(max(a, depth(a))); endif }\n  output(-a);\n}\n',
+    'void v;\nint f(int a, int b[]) { return a + b[0]; }\nvoid main(void) {\n  int x; int arr[3];\n  x = f(1);\n'
+    '  x = f(1, 2);\n  x = f(arr, arr);\n  x = f(1, arr, 3);\n  y = 3;\n  break;\n  x = arr + 1;\n  output(x);\n}\n',
+]
+
+
+def shape(node):
+    # The tree as nested tuples of class names and fields, tokens as their lexemes; the tokens kept only for the
+    # line numbers of errors are left out.
+    if type(node) is list:
+        return [shape(item) for item in node]
+    if type(node) is Token:
+        return node.lexeme
+    if node is None or type(node) is bool:
+        return node
+    return (type(node).__name__,) + tuple(shape(getattr(node, name)) for name in node.__slots__
+                                          if name not in ('token', 'start_token', 'end_token') or
+                                          type(node) in (Number, Name))
+
+
+def built(text):
+    diagnostics = Diagnostics(buffered=True)
+    symbol_table = SymbolTable()
+    ast_builder = AstBuilder()
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), ast_builder, diagnostics).parse()
+    return ast_builder, symbol_table, diagnostics
+
+
+def lowered(text):
+    ast_builder, symbol_table, diagnostics = built(text)
+    assert ast_builder.is_complete
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    AstLowering(code_generator).lower(ast_builder.program)
+    if code_generator.is_erroneous:
+        code_generator.discard_code()
+    return [record.to_json() for record in diagnostics.records], [str(code) for code in code_generator.program_block]
+
+
+def generated(text):
+    diagnostics = Diagnostics(buffered=True)
+    symbol_table = SymbolTable()
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    return [record.to_json() for record in diagnostics.records], [str(code) for code in code_generator.program_block]
+
+
+def test_tree_of_a_sample_program():
+    ast_builder, _, _ = built('int g[2];\nint f(int n) { if (n < 2) return 1; else return n * f(n - 1); endif }\n'
+                              'void main(void) {\n  int a;\n  a = -f(3) + g[1];\n'
+                              '  while (a < 10) { a = a + 1; if (a == 7) break; endif }\n  output(a);\n  ;\n}\n')
+    f_call = ('Call', ('Name', 'f'), [('Argument', ('BinOp', '-', ('Name', 'n'), ('Number', '1')))])
+    assert shape(ast_builder.program) == ('Program', [
+        ('VarDecl', 'int', 'g', True, '2'),
+        ('FunctionDecl', 'int', 'f', [('VarDecl', 'int', 'n', False, ')')], ('Compound', [], [
+            ('If', ('BinOp', '<', ('Name', 'n'), ('Number', '2')), ('Return', ('Number', '1')), True,
+             ('Return', ('BinOp', '*', ('Name', 'n'), f_call)))])),
+        ('FunctionDecl', 'void', 'main', [], ('Compound', [('VarDecl', 'int', 'a', False, ';')], [
+            ('ExpressionStatement', ('Assign', ('Name', 'a'), (
+                'BinOp', '+', ('Negate', ('Call', ('Name', 'f'), [('Argument', ('Number', '3'))])),
+                ('ArrayIndex', ('Name', 'g'), ('Number', '1'))))),
+            ('While', ('BinOp', '<', ('Name', 'a'), ('Number', '10')), ('Compound', [], [
+                ('ExpressionStatement', ('Assign', ('Name', 'a'), ('BinOp', '+', ('Name', 'a'), ('Number', '1')))),
+                ('If', ('BinOp', '==', ('Name', 'a'), ('Number', '7')), ('Break',), False, None)])),
+            ('ExpressionStatement', ('Call', ('Name', 'output'), [('Argument', ('Name', 'a'))]))]))])
+
+
+@pytest.mark.parametrize('text', samples)
+def test_lowering_matches_syntax_directed_generation(text):
+    assert lowered(text) == generated(text)
+
+
+def test_lowering_does_not_recurse_into_deep_trees():
+    text = 'void main(void) {\n  int a;\n  a = 0;\n  ' + 'if (a == 1) output(1); else ' * 2000 + 'output(2);' + \
+           ' endif' * 2000 + '\n  output(' + ' + '.join(['a'] * 5000) + ');\n}\n'
+    assert lowered(text) == generated(text)
@@ -0,0 +1,67 @@
+# Sepehr Vahedi
+# 99170615
+
+import pytest
+
+from symbols import SymbolTable, ActionSymbols
+from diagnostics import Diagnostics, Phases
+from lexer import Lexer
+from token_store import Token
+from parser import Parser, RecoveryModes
+from generated_parser import GeneratedParser
+from intermediate_code_generator.expression_processor import CodeGenerator
+
+
+# Inputs after whose syntax errors the parser's recovery leaves something other than a reserved slot where an if, a
+# while or the program fills one in.
+@pytest.mark.parametrize('text', [
+    'void main(void) { int a; int r; if (a < 1) { r = 1; } else { = 2; } while (a < 2) { if a = a + 1; } }',
+    'void main(void) { int i; while (i < 2) if { i = 1; } }',
+    'void main(void) { int a; int r; if (a < 1) { r = 1; } else if { r = 2; } endif while (a < 2) {',
+    'void x',
+])
+@pytest.mark.parametrize('parser_class', [Parser, GeneratedParser])
+def test_lost_jump_target_is_a_semantic_error(text, parser_class):
+    symbol_table, diagnostics = SymbolTable(), Diagnostics(buffered=True)
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    parser_class(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    assert (Phases.SEMANTIC, 'Jump target lost to a syntax error.') in \
+        [(record.phase, record.kind) for record in diagnostics.records]
+    assert code_generator.is_erroneous and code_generator.program_block == []
+
+
+# An if cut short inside a while: recovery drops the if's else part, so the while's end finds the if's jump slot
+# where its own belongs.
+@pytest.mark.parametrize('text, records', [
+    ('void main(void) {\n  int a;\n  while (a < 2) if (a) a = 1;\n}\n',
+     [(Phases.SYNTAX, 4, 'missing ElseStmt'), (Phases.SEMANTIC, 4, 'Jump target lost to a syntax error.')]),
+    ('void main(void) {\n  int a;\n  while (a < 2) { if (a) { a = 1; }\n}\n',
+     [(Phases.SYNTAX, 4, 'missing ElseStmt'), (Phases.SEMANTIC, 5, 'Jump target lost to a syntax error.'),
+      (Phases.SYNTAX, 5, 'Unexpected EOF')]),
+])
+@pytest.mark.parametrize('recovery', list(RecoveryModes))
+def test_truncated_if_in_a_while_loses_the_jump_target(text, records, recovery):
+    symbol_table, diagnostics = SymbolTable(), Diagnostics(buffered=True)
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics, recovery=recovery).parse()
+    assert [(record.phase, record.line_number, record.kind) for record in diagnostics.records] == records
+    assert code_generator.is_erroneous and code_generator.program_block == []
+
+
+@pytest.mark.parametrize('action_symbol, operands', [
+    (ActionSymbols.JP, [508]),
+    (ActionSymbols.JPF, [508, 512]),
+    (ActionSymbols.JPF_SAVE, [508, 512]),
+    (ActionSymbols.WHILE, [508, 512]),
+    (ActionSymbols.END_OF_PROGRAM, [508]),
+    (ActionSymbols.END_OF_PROGRAM, []),
+])
+def test_plain_address_in_place_of_a_slot(action_symbol, operands):
+    diagnostics = Diagnostics(buffered=True)
+    code_generator = CodeGenerator(SymbolTable(), diagnostics)
+    code_generator.builder.operand_stack.extend(operands)
+    code_generator.builder.loop_stack.append(516)
+    code_generator.code_gen(action_symbol, Token('}', 'SYMBOL', 7))
+    assert [(record.phase, record.line_number, record.kind) for record in diagnostics.records] == \
+        [(Phases.SEMANTIC, 7, 'Jump target lost to a syntax error.')]
+    assert code_generator.is_erroneous
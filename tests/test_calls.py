@@ -0,0 +1,104 @@
+# Sepehr Vahedi
+# 99170615
+
+import pytest
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from parser import Parser
+from intermediate_code_generator.expression_processor import CodeGenerator
+from intermediate_code_generator.instructions import Opcode, Addressing, code_address
+from interpreter import run
+
+
+def compiled(text):
+    diagnostics = Diagnostics(buffered=True)
+    symbol_table = SymbolTable()
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    assert not diagnostics.records
+    return code_generator.program_block
+
+
+# A call's result read straight off the runtime stack, as an argument, by output or by return, is popped there; the
+# cells saved around the calls that come after it are then popped from where they were pushed.
+@pytest.mark.parametrize('statements, printed', [
+    ('output(f(a, sq(b)));', [13]),
+    ('while (a < 6) { output(f(a, sq(b))); a = a + 1; }', [13, 20, 29]),
+    ('output(sq(sq(b)));', [16]),
+    ('output(g(b));', [4, 6]),
+    ('output(sq(a)); output(sq(b)); output(g(a) + g(b));', [9, 4, 9, 4, 18]),
+])
+def test_call_results_are_popped_where_they_are_read(statements, printed):
+    text = 'int sq(int v) { return v * v; }\nint f(int a, int b) { return sq(a) + b; }\n' \
+           'int g(int v) { output(sq(v)); return f(v, v); }\n' \
+           f'void main(void) {{\n  int a; int b;\n  a = 3; b = 2;\n  {statements}\n}}\n'
+    assert run(compiled(text)) == printed
+
+
+def saved_around_calls(code):
+    # For each call, in the order of the code: the entry of the function called, the cells pushed to be saved before
+    # it and the cells popped back after it returns. The pushes of a call are the run of pushes that its pops match;
+    # two calls whose pushes follow each other with nothing between, like those of f(g(2)), would look like one.
+    calls = []
+    pending = []
+    is_in_run = False
+    for position, instruction in enumerate(code):
+        text = str(instruction)
+        if text.startswith('(ASSIGN, ') and text.endswith(', @1000, )') and text != '(ASSIGN, 504, @1000, )' and \
+                str(code[position - 1]) == '(ADD, 1000, #4, 1000)':
+            cell = int(instruction.first.text)
+            if is_in_run:
+                pending[-1].append(cell)
+            else:
+                pending.append([cell])
+            is_in_run = True
+            continue
+        if text != '(ADD, 1000, #4, 1000)':
+            is_in_run = False
+        if instruction.opcode is Opcode.JP and position > 0 and str(code[position - 1]).endswith(', 500, )') and \
+                code[position - 1].first.addressing is Addressing.IMMEDIATE:
+            popped = []
+            after = position + 1
+            while str(code[after]).startswith('(ASSIGN, @1000, ') and str(code[after + 1]) == '(SUB, 1000, #4, 1000)':
+                popped.append(int(code[after].second.text))
+                after += 2
+            calls.append((code_address(instruction.first), pending.pop(), popped))
+    return calls
+
+
+def test_self_recursion_saves_the_cells_of_the_function():
+    text = 'int fact(int n) {\n  if (n < 2) { return 1; } else { return n * fact(n - 1); } endif\n}\n' \
+           'int fib(int n) {\n  int r;\n  if (n < 2) { r = n; } else { r = fib(n - 1) + fib(n - 2); } endif\n' \
+           '  return r;\n}\n' \
+           'void main(void) {\n  int i;\n  i = 0;\n  while (i < 7) { output(fact(i)); output(fib(i)); i = i + 1; }\n}\n'
+    code = compiled(text)
+    assert run(code) == [1, 0, 1, 1, 2, 1, 6, 2, 24, 3, 120, 5, 720, 8]
+    fact, fib = 1, 27
+    assert saved_around_calls(code) == [
+        # fact and fib call themselves, so n and r are saved with the return address, and popped in reverse.
+        (fact, [100, 500], [500, 100]),
+        (fib, [104, 108, 500], [500, 108, 104]),
+        # The result of fib(n - 1) waits on the runtime stack during fib(n - 2), which keeps the stack pointer.
+        (fib, [104, 108, 500, 1000], [1000, 500, 108, 104]),
+        # Neither can run main, so i is not saved.
+        (fact, [500], [500]),
+        (fib, [500], [500]),
+    ]
+
+
+def test_argument_call_that_can_run_the_outer_callee_saves_its_parameters():
+    # g calls f, so while f(1, g(2)) waits on g, the 1 already in f's first parameter has to be saved.
+    text = 'int f(int a, int b) {\n  if (a < 1) return b; else return a + b * 10; endif\n}\n' \
+           'int g(int x) {\n  return f(0, x) + 1;\n}\n' \
+           'void main(void) {\n  output(f(1, g(2)));\n}\n'
+    code = compiled(text)
+    assert run(code) == [31]
+    f, g = 1, 12
+    assert saved_around_calls(code) == [
+        # f cannot run g, so g's x is not saved around f(0, x).
+        (f, [500], [500]),
+        (g, [100, 104, 500], [500, 104, 100]),
+        (f, [500], [500]),
+    ]
@@ -0,0 +1,96 @@
+# Sepehr Vahedi
+# 99170615
+
+import pytest
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from parser import Parser
+from intermediate_code_generator.expression_processor import CodeGenerator
+from optimizer.constants import propagate_constants
+from code_listing import listing, text_of
+from interpreter import run
+
+
+def compiled(text):
+    diagnostics = Diagnostics(buffered=True)
+    symbol_table = SymbolTable()
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    assert not diagnostics.records
+    return [str(instruction) for instruction in code_generator.program_block]
+
+
+@pytest.mark.parametrize('statement, instructions', [
+    ('a = 2 * 3 + 4 - 10 / 2;', ['(ASSIGN, #5, 100, )']),
+    ('a = (1 < 2) + (3 == 4) * 5 + (2 == 2);', ['(ASSIGN, #2, 100, )']),
+    ('a = -7;', ['(ASSIGN, #-7, 100, )']),
+    ('a = 10 / 3 - -2;', ['(ASSIGN, #5, 100, )']),
+    ('a = -(2 - 5);', ['(ASSIGN, #3, 100, )']),
+    # Only constants are folded, and a division by zero is left for the VM.
+    ('a = b + 2 * 3;', ['(ADD, 104, #6, 508)', '(ASSIGN, 508, 100, )']),
+    ('a = 1 / 0;', ['(DIV, #1, #0, 508)', '(ASSIGN, 508, 100, )']),
+    # A variable is negated into a temporary, and keeps its value.
+    ('a = -b;', ['(MULT, 104, #-1, 508)', '(ASSIGN, 508, 100, )']),
+])
+def test_constant_expressions_are_folded_as_they_are_generated(statement, instructions):
+    code = compiled(f'void main(void) {{\n  int a; int b;\n  {statement}\n}}\n')
+    start = code.index('(ASSIGN, #0, 104, )') + 1
+    assert code[start:-2] == instructions
+
+
+def test_negated_variable_and_array_element_keep_their_values():
+    text = 'void main(void) {\n  int a; int b[2];\n  a = 3; b[1] = 4;\n' \
+           '  output(-a); output(-b[1]); output(a - -b[1]);\n  output(a); output(b[1]);\n}\n'
+    diagnostics = Diagnostics(buffered=True)
+    symbol_table = SymbolTable()
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    assert run(code_generator.program_block) == [-3, -4, 7, 3, 4]
+
+
+def propagated(*body):
+    # main's body, from position 1, between the jump to main and main's return.
+    return text_of(propagate_constants(listing('(JP, L1, , )', *body, '(JP, @500, , )')))[1:-1]
+
+
+def test_known_cells_are_substituted_and_operations_folded():
+    assert propagated('(ASSIGN, #3, 100, )', '(ADD, 100, #4, 512)', '(MULT, 512, 100, 516)', '(PRINT, 516, , )') == \
+        ['(ASSIGN, #3, 100, )', '(PRINT, #21, , )']
+    assert propagated('(ASSIGN, #-3, 100, )', '(SUB, #0, 100, 512)', '(DIV, 512, #-2, 104)', '(PRINT, 104, , )') == \
+        ['(ASSIGN, #-3, 100, )', '(ASSIGN, #-1, 104, )', '(PRINT, #-1, , )']
+
+
+def test_comparisons_fold_and_decide_branches():
+    # 3 < 2 is false, so the JPF always jumps; 3 == 3 is true, so the second never does.
+    assert propagated('(ASSIGN, #3, 100, )', '(LT, 100, #2, 512)', '(JPF, 512, L5, )', '(PRINT, #1, , )',
+                      '(EQ, 100, #3, 516)', '(JPF, 516, L8, )', '(PRINT, #2, , )', '(PRINT, 100, , )') == \
+        ['(ASSIGN, #3, 100, )', '(JP, L4, , )', '(PRINT, #1, , )', '(PRINT, #2, , )', '(PRINT, #3, , )']
+
+
+def test_propagation_stops_at_a_join_of_different_values():
+    branches = ['(JPF, 104, L4, )', '(ASSIGN, #1, 100, )', '(JP, L5, , )', '(ASSIGN, #2, 100, )', '(PRINT, 100, , )']
+    assert propagated(*branches)[-1] == '(PRINT, 100, , )'
+    # The same value on both sides is still known.
+    branches[3] = '(ASSIGN, #1, 100, )'
+    assert propagated(*branches)[-1] == '(PRINT, #1, , )'
+
+
+def test_propagation_stops_at_a_loop_label():
+    # The loop's header at 2 is reached with 100 as 0 and as what the body leaves in it.
+    loop = ['(ASSIGN, #0, 100, )', '(LT, 100, #3, 512)', '(JPF, 512, L6, )', '(ADD, 100, #1, 100)', '(JP, L2, , )',
+            '(PRINT, 100, , )']
+    assert propagated(*loop) == loop
+
+
+def test_propagation_stops_at_a_write_through_an_array_index():
+    # 512 points somewhere in an array whose index is not known, which may be 100.
+    assert propagated('(ASSIGN, #5, 100, )', '(ADD, #96, 104, 512)', '(ASSIGN, #9, @512, )', '(PRINT, 100, , )') == \
+        ['(ASSIGN, #5, 100, )', '(ADD, #96, 104, 512)', '(ASSIGN, #9, @512, )', '(PRINT, 100, , )']
+    # A write through a known index becomes a write of the element itself.
+    assert propagated('(ASSIGN, #104, 512, )', '(ASSIGN, #9, @512, )', '(PRINT, 104, , )') == \
+        ['(ASSIGN, #9, 104, )', '(PRINT, 104, , )']
+    # A push only writes the stack.
+    assert propagated('(ASSIGN, #5, 100, )', '(ADD, 1000, #4, 1000)', '(ASSIGN, #7, @1000, )', '(PRINT, 100, , )') == \
+        ['(ASSIGN, #5, 100, )', '(ADD, 1000, #4, 1000)', '(ASSIGN, #7, @1000, )', '(PRINT, #5, , )']
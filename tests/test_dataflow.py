@@ -0,0 +1,144 @@
+# Sepehr Vahedi
+# 99170615
+
+from code_listing import listing
+from optimizer.cfg import ControlFlowGraph
+from optimizer.dataflow import Liveness, ReachingDefinitions, members
+
+# main: an if-else whose branches join at 6.
+branches = listing(
+    '(JP, L1, , )',
+    '(ASSIGN, #0, 100, )',
+    '(JPF, 100, L5, )',
+    '(ASSIGN, #1, 104, )',
+    '(JP, L6, , )',
+    '(ASSIGN, #2, 104, )',
+    '(PRINT, 104, , )',
+    '(JP, @500, , )',
+)
+
+# main: a while loop on 100 whose exit is the address set in 508; 104 is set before the loop and printed after it.
+loop = listing(
+    '(JP, L1, , )',
+    '(ASSIGN, #0, 100, )',
+    '(ASSIGN, #5, 104, )',
+    '(ASSIGN, #L8, 508, )',
+    '(LT, 100, #3, 512)',
+    '(JPF, 512, @508, )',
+    '(ADD, 100, #1, 100)',
+    '(JP, L4, , )',
+    '(PRINT, 100, , )',
+    '(PRINT, 104, , )',
+    '(JP, @500, , )',
+)
+
+
+def spans(cfg):
+    return [(block.start, block.end) for block in cfg.blocks]
+
+
+def test_blocks_split_at_jumps_and_their_targets():
+    cfg = ControlFlowGraph(branches)
+    assert spans(cfg) == [(0, 1), (1, 3), (3, 5), (5, 6), (6, 8), (8, 8)]
+    assert cfg.exit is cfg.blocks[-1]
+    assert cfg.main_entry == 1 and cfg.function_entries == [1]
+    assert cfg.block_of[7] == 4 and cfg.block_of[8] == cfg.exit.index
+
+
+def test_jpf_and_jp_edges():
+    cfg = ControlFlowGraph(branches)
+    assert [block.successors for block in cfg.blocks] == [[1], [3, 2], [4], [4], [5], []]
+    assert cfg.blocks[4].predecessors == [2, 3]
+    # main's return leaves through the exit block.
+    assert cfg.blocks[4].successors == [cfg.exit.index]
+
+
+def test_loop_exit_through_a_cell_and_back_edge():
+    cfg = ControlFlowGraph(loop)
+    assert spans(cfg) == [(0, 1), (1, 4), (4, 6), (6, 8), (8, 11), (11, 11)]
+    # The JPF leaves through @508, which only ever holds 8.
+    assert cfg.blocks[2].successors == [4, 3]
+    assert cfg.blocks[3].successors == [2]
+    assert cfg.blocks[2].predecessors == [1, 3]
+    order = cfg.reverse_postorder()
+    assert order.index(2) < order.index(3) and order[0] == 0
+    assert all(cfg.reachable_blocks())
+
+
+def test_call_and_return_edges():
+    code = listing(
+        '(JP, L4, , )',
+        '(ADD, 104, #1, 504)',
+        '(JP, @500, , )',
+        '(JP, L1, , )',
+        '(ASSIGN, #L6, 500, )',
+        '(JP, L1, , )',
+        '(PRINT, 504, , )',
+        '(JP, @500, , )',
+    )
+    cfg = ControlFlowGraph(code)
+    assert cfg.calls == [(5, 1, 6)]
+    assert cfg.function_entries == [1, 4]
+    # The function returns to the call's return point; the unconditional jump at 3 is dead code after its return.
+    assert cfg.blocks[cfg.block_of[2]].successors == [cfg.block_of[6]]
+    assert not cfg.reachable_blocks()[cfg.block_of[3]]
+
+
+def live_cells(liveness, mask):
+    return sorted(members(mask, liveness.cells), key=str)
+
+
+def test_liveness_reaches_a_fixed_point_across_the_loop():
+    cfg = ControlFlowGraph(loop)
+    liveness = Liveness(cfg)
+    header, body, after = cfg.blocks[2], cfg.blocks[3], cfg.blocks[4]
+    # 104 is only read after the loop, so it is live all through it; 512 is written before it is read.
+    assert live_cells(liveness, liveness.live_in[header.index]) == [100, 104, 500, 508]
+    assert live_cells(liveness, liveness.live_out[body.index]) == [100, 104, 500, 508]
+    assert live_cells(liveness, liveness.live_in[after.index]) == [100, 104, 500]
+    assert live_cells(liveness, liveness.live_in[1]) == [500]
+    assert liveness.live_out[cfg.exit.index] == 0
+    assert [live_cells(liveness, mask) for mask in liveness.live_after(header)] == \
+        [[100, 104, 500, 508, 512], [100, 104, 500, 508]]
+
+
+def test_definitions_reach_the_loop_header_from_both_sides():
+    cfg = ControlFlowGraph(loop)
+    definitions = ReachingDefinitions(cfg)
+
+    def reaching_positions(mask, cell):
+        return sorted(members(mask & definitions.definitions_of[cell], definitions.positions), key=str)
+
+    header = cfg.blocks[2]
+    assert reaching_positions(definitions.reach_in[header.index], 100) == [1, 6]
+    assert reaching_positions(definitions.reach_in[header.index], 104) == [2]
+    # Before anything is written, each cell holds its initial value.
+    assert reaching_positions(definitions.reach_in[1], 100) == [None]
+    before = definitions.reaching(cfg.blocks[1])
+    assert reaching_positions(before[1], 100) == [1] and reaching_positions(before[1], 104) == [None]
+
+
+def test_call_is_summed_up_by_what_its_function_reads():
+    code = listing(
+        '(JP, L4, , )',
+        '(ADD, 100, #1, 508)',
+        '(ASSIGN, 508, 504, )',
+        '(JP, @500, , )',
+        '(ASSIGN, #L6, 500, )',
+        '(JP, L1, , )',
+        '(ASSIGN, 504, 512, )',
+        '(ASSIGN, #L9, 500, )',
+        '(JP, L1, , )',
+        '(ADD, 504, 512, 516)',
+        '(PRINT, 516, , )',
+        '(JP, @500, , )',
+    )
+    cfg = ControlFlowGraph(code)
+    liveness = Liveness(cfg)
+    first_call, second_call, function = cfg.blocks[cfg.block_of[5]], cfg.blocks[cfg.block_of[8]], cfg.blocks[1]
+    # 512 is live across the second call only, so it is live in the function but not before the first call. What is
+    # live after a call stays live before it, even if the function writes it, like the result in 504.
+    assert live_cells(liveness, liveness.live_out[first_call.index]) == [100, 500, 504]
+    assert live_cells(liveness, liveness.live_out[second_call.index]) == [100, 500, 504, 512]
+    assert live_cells(liveness, liveness.live_in[function.index]) == [100, 500, 512]
+    assert live_cells(liveness, liveness.live_after(function)[0]) == [100, 500, 508, 512]
@@ -0,0 +1,95 @@
+# Sepehr Vahedi
+# 99170615
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from parser import Parser
+from intermediate_code_generator.expression_processor import CodeGenerator
+from intermediate_code_generator.instructions import Opcode
+from optimizer.deadcode import remove_dead_code
+from code_listing import listing, text_of
+from interpreter import run
+
+functions = 'int twice(int x) { return x * 2; }\nint unused(int x) { return twice(x) - 7; }\n' \
+            'int deep(int x) { return x + 100; }\nint used(int x) { return deep(x) + 1; }\n'
+
+
+def compiled(text, *optimizations):
+    diagnostics = Diagnostics(buffered=True)
+    symbol_table = SymbolTable()
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    assert not diagnostics.records
+    code_generator.optimize(*optimizations)
+    return code_generator.program_block
+
+
+def opcodes(code):
+    return [instruction.opcode for instruction in code]
+
+
+def returns(code):
+    return [str(instruction) for instruction in code].count('(JP, @500, , )')
+
+
+def test_uncalled_functions_are_dropped():
+    text = functions + 'void main(void) {\n  output(used(2));\n}\n'
+    code = compiled(text)
+    optimized = compiled(text, remove_dead_code)
+    assert run(optimized) == run(code) == [103]
+    # unused goes, and twice with it, as only unused calls it; used and deep stay, as main calls used.
+    assert Opcode.MULT in opcodes(code) and Opcode.MULT not in opcodes(optimized)
+    assert any(instruction.opcode is Opcode.ADD and instruction.second.text == '#100' for instruction in optimized)
+    # Each function's return at its end goes as well, after the return of its value.
+    assert returns(code) == 9 and returns(optimized) == 3
+
+
+def test_main_and_what_it_reaches_are_kept():
+    text = functions + 'void main(void) {\n  output(unused(used(2)));\n}\n'
+    code = compiled(text)
+    optimized = compiled(text, remove_dead_code)
+    assert run(optimized) == run(code) == [199]
+    # Only the return at the end of each function goes.
+    assert returns(code) == 9 and returns(optimized) == 5
+    assert opcodes(code).count(Opcode.MULT) == opcodes(optimized).count(Opcode.MULT) == 1
+
+
+def test_code_after_a_return_goes():
+    text = 'int f(int x) {\n  return x + 1;\n  output(x);\n}\nvoid main(void) {\n  output(f(1));\n  return;\n' \
+           '  output(5);\n}\n'
+    code = compiled(text)
+    optimized = compiled(text, remove_dead_code)
+    assert run(optimized) == run(code) == [2]
+    assert opcodes(code).count(Opcode.PRINT) == 3 and opcodes(optimized).count(Opcode.PRINT) == 1
+
+
+def test_code_after_a_break_goes_but_a_jump_target_stays():
+    loop = listing(
+        '(JP, L1, , )',
+        '(ASSIGN, #0, 100, )',
+        '(ASSIGN, #L10, 512, )',
+        '(LT, 100, #3, 516)',
+        '(JPF, 516, @512, )',
+        '(JPF, 100, L8, )',
+        '(JP, @512, , )',
+        '(PRINT, #7, , )',
+        '(ADD, 100, #1, 100)',
+        '(JP, L3, , )',
+        '(PRINT, 100, , )',
+        '(JP, @500, , )',
+    )
+    # The break at 6 leaves the loop; the PRINT after it goes, and the ADD that the JPF at 5 jumps to stays.
+    assert text_of(remove_dead_code(loop)) == [
+        '(JP, L1, , )',
+        '(ASSIGN, #0, 100, )',
+        '(ASSIGN, #L9, 512, )',
+        '(LT, 100, #3, 516)',
+        '(JPF, 516, @512, )',
+        '(JPF, 100, L7, )',
+        '(JP, @512, , )',
+        '(ADD, 100, #1, 100)',
+        '(JP, L3, , )',
+        '(PRINT, 100, , )',
+        '(JP, @500, , )',
+    ]
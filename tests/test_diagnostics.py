@@ -0,0 +1,70 @@
+# Sepehr Vahedi
+# 99170615
+
+import io
+import json
+
+import pytest
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics, Phases, OutputFormats, TooManyErrors
+from lexer import Lexer
+from parser import Parser
+from intermediate_code_generator.expression_processor import CodeGenerator
+
+
+def compile_text(text, diagnostics):
+    symbol_table = SymbolTable()
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+
+
+def test_records_keep_the_order_of_all_phases():
+    diagnostics = Diagnostics(buffered=True)
+    compile_text('void main(void) {\n  int a;\n  b = 1;\n  a = 3; @\n  c = a;\n  a = (2;\n}\n', diagnostics)
+    assert [(record.phase, record.line_number) for record in diagnostics.records] == [
+        (Phases.SEMANTIC, 3), (Phases.LEXICAL, 4), (Phases.SEMANTIC, 5), (Phases.SYNTAX, 6)]
+    assert diagnostics.count() == 4 and diagnostics.count(Phases.SEMANTIC) == 2
+
+
+def test_buffered_records_are_written_once_on_flush():
+    stream = io.StringIO()
+    diagnostics = Diagnostics(buffered=True, stream=stream)
+    diagnostics.report(Phases.SYNTAX, 2, 'missing ;')
+    assert stream.getvalue() == ''
+    diagnostics.flush()
+    diagnostics.flush()
+    assert stream.getvalue() == 'error_line\n2\nerror_message\nmissing ;\n'
+
+
+def test_unbuffered_records_are_written_as_reported():
+    stream = io.StringIO()
+    diagnostics = Diagnostics(stream=stream)
+    diagnostics.report(Phases.LEXICAL, 1, 'Invalid input', '@')
+    assert stream.getvalue() == 'error_line\n1\ndumped_text\n@\nerror_message\nInvalid input\n'
+    diagnostics.report(Phases.SEMANTIC, 4, 'x is not defined.')
+    assert stream.getvalue().endswith('error_line\n4\nerror_message\nx is not defined.\n')
+
+
+def test_json_lines_format():
+    stream = io.StringIO()
+    diagnostics = Diagnostics(OutputFormats.JSON_LINES, buffered=True, stream=stream)
+    diagnostics.report(Phases.LEXICAL, 1, 'Invalid number', '3d')
+    diagnostics.report(Phases.SEMANTIC, 5, 'No while found for break.')
+    diagnostics.flush()
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [
+        {'phase': 'lexical', 'line': 1, 'kind': 'Invalid number', 'text': '3d'},
+        {'phase': 'semantic', 'line': 5, 'kind': 'No while found for break.', 'text': None}]
+
+
+def test_compilation_stops_at_max_errors():
+    diagnostics = Diagnostics(max_errors=2, buffered=True)
+    with pytest.raises(TooManyErrors):
+        compile_text('void main(void) {\n  a = 1;\n  b = 2;\n  c = 3;\n}\n', diagnostics)
+    assert [record.line_number for record in diagnostics.records] == [2, 3]
+
+
+def test_no_cutoff_below_max_errors():
+    diagnostics = Diagnostics(max_errors=3, buffered=True)
+    compile_text('void main(void) {\n  a = 1;\n  b = 2;\n}\n', diagnostics)
+    assert diagnostics.count() == 2
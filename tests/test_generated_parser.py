@@ -0,0 +1,36 @@
+# Sepehr Vahedi
+# 99170615
+
+import pytest
+
+import grammar_compiler
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from parser import Parser
+from generated_parser import GeneratedParser
+from intermediate_code_generator.expression_processor import CodeGenerator
+
+
+def test_committed_parser_matches_the_generator():
+    with open(grammar_compiler.generated_parser_path) as file:
+        assert file.read() == grammar_compiler.generate_parser()
+
+
+def compile_with(parser_class, text):
+    symbol_table, diagnostics = SymbolTable(), Diagnostics(buffered=True)
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    parser_class(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    return ([(record.phase, record.line_number, record.text) for record in diagnostics.records],
+            [str(instruction) for instruction in code_generator.program_block])
+
+
+@pytest.mark.parametrize('text', [
+    'void main(void) {\n  int a;\n  b = 3;\n  output(a);\n}\n',
+    'int f(int x) { return x; }\nvoid main(void) {\n  int a[2];\n  f(a);\n  break;\n}\n',
+])
+def test_code_with_semantic_errors_is_discarded(text):
+    for parser_class in (Parser, GeneratedParser):
+        records, code = compile_with(parser_class, text)
+        assert records and code == []
+    assert compile_with(Parser, text) == compile_with(GeneratedParser, text)
@@ -0,0 +1,48 @@
+# Sepehr Vahedi
+# 99170615
+
+import random
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from incremental_lexer import relex
+
+pieces = ['', 'a', ' ', '\n', '/*', '*/', '//', '=', '==', '1', 'x1', '@', ';\n', 'int q;', '/* c \n */', '3d', 'if',
+          'void', '{', '}']
+texts = [
+    'int x;\nvoid main(void) {\n  /* set x */ x = 12;\n  if (x == 3) { output(x); } else { x = x * 2; } endif\n}\n',
+    'int a[3]; // cells\nint f(int b) { return b + 1; }\n/* a\n longer\n comment */ void main(void) { a[1] = f(2); }',
+    'int 3d = @; /* never closed',
+    '',
+]
+
+
+def lex(text):
+    return list(Lexer(text, SymbolTable(), diagnostics=Diagnostics(buffered=True)).iter_tokens())
+
+
+def fields(tokens):
+    return [(token.lexeme, token.type, token.line_number, token.offset, token.column, token.terminal_code)
+            for token in tokens]
+
+
+def test_relexed_stream_matches_a_full_lex():
+    generator = random.Random(14)
+    for _ in range(1500):
+        text = generator.choice(texts)
+        edit_start = generator.randint(0, len(text))
+        edit_end = generator.randint(edit_start, min(len(text), edit_start + generator.randint(0, 8)))
+        new_text = ''.join(generator.choice(pieces) for _ in range(generator.randint(0, 3)))
+        source, tokens = relex(text, lex(text), edit_start, edit_end, new_text, SymbolTable())
+        assert source == text[:edit_start] + new_text + text[edit_end:]
+        assert fields(tokens) == fields(lex(source)), (text, edit_start, edit_end, new_text)
+
+
+def test_reused_tokens_keep_their_terminal_code():
+    text = texts[0]
+    old_tokens = lex(text)
+    source, tokens = relex(text, old_tokens, 0, 3, 'void', SymbolTable())
+    assert len(tokens) == len(old_tokens)
+    assert [token.terminal_code for token in tokens[1:]] == [token.terminal_code for token in old_tokens[1:]]
+    assert None not in [token.terminal_code for token in tokens]
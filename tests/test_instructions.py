@@ -0,0 +1,30 @@
+# Sepehr Vahedi
+# 99170615
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from parser import Parser
+from intermediate_code_generator.expression_processor import CodeGenerator
+from intermediate_code_generator.instructions import number, immediate
+
+
+def generated(text):
+    symbol_table, diagnostics = SymbolTable(), Diagnostics(buffered=True)
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics, build_tree=False).parse()
+    return [str(instruction) for instruction in code_generator.program_block]
+
+
+def test_literals_are_written_as_in_the_source():
+    code = generated('void main(void) {\n  int x;\n  x = 007;\n  output(x + 010);\n  output(0);\n}\n')
+    assert '(ASSIGN, #007, 100, )' in code
+    assert '(ADD, 100, #010, 508)' in code
+    assert '(PRINT, #0, , )' in code
+
+
+def test_only_literals_without_leading_zeros_are_interned():
+    assert number('7') is immediate(7)
+    assert number('007') is not immediate(7)
+    assert number('007') == immediate(7)
+    assert str(number('007')) == '#007'
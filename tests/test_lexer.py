@@ -0,0 +1,138 @@
+# Sepehr Vahedi
+# 99170615
+
+import io
+import mmap
+
+import pytest
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+
+
+def lexed(text, seek=None):
+    # (lexeme, type, line, offset, column) of every token up to END, and the errors reported on the way.
+    diagnostics = Diagnostics(buffered=True)
+    lexer = Lexer(text, SymbolTable(), diagnostics=diagnostics)
+    if seek is not None:
+        lexer.seek(*seek)
+    tokens = [(token.lexeme, token.type, token.line_number, token.offset, token.column)
+              for token in lexer.iter_tokens()]
+    return tokens, [(record.line_number, record.kind, record.text) for record in diagnostics.records]
+
+
+def test_offsets_and_columns():
+    tokens, errors = lexed('int x;\n  x == 12; /* c */ y\n\tz')
+    assert tokens == [('int', 'KEYWORD', 1, 0, 1), ('x', 'ID', 1, 4, 5), (';', 'SYMBOL', 1, 5, 6),
+                      ('x', 'ID', 2, 9, 3), ('==', 'SYMBOL', 2, 11, 5), ('12', 'NUM', 2, 14, 8),
+                      (';', 'SYMBOL', 2, 16, 10), ('y', 'ID', 2, 26, 20), ('z', 'ID', 3, 29, 2),
+                      ('$', 'END', 3, 30, 3)]
+    assert errors == []
+
+
+def test_seek_into_a_comment():
+    # The text after the cursor is lexed as it stands, so the comment's closing */ is unmatched.
+    text = 'x = 1; /* a b */ y;\n'
+    tokens, errors = lexed(text, (text.index('a b'), 1))
+    assert tokens == [('a', 'ID', 1, 10, 11), ('b', 'ID', 1, 12, 13), ('y', 'ID', 1, 17, 18),
+                      (';', 'SYMBOL', 1, 18, 19), ('$', 'END', 2, 20, 1)]
+    assert errors == [(1, 'Unmatched comment', '*/')]
+
+
+def test_seek_into_a_comment_over_lines():
+    # Columns count from the newline before the cursor, even one inside the comment.
+    text = 'a\n/* one\ntwo */ b'
+    tokens, errors = lexed(text, (text.index('two'), 2))
+    assert tokens == [('two', 'ID', 2, 9, 1), ('b', 'ID', 2, 16, 8), ('$', 'END', 2, 17, 9)]
+    assert errors == [(2, 'Unmatched comment', '*/')]
+
+
+def test_seek_into_a_two_character_symbol():
+    text = 'a\nb == c <= d'
+    tokens, errors = lexed(text, (text.index('==') + 1, 2))
+    assert tokens == [('=', 'SYMBOL', 2, 5, 4), ('c', 'ID', 2, 7, 6), ('<', 'SYMBOL', 2, 9, 8),
+                      ('=', 'SYMBOL', 2, 10, 9), ('d', 'ID', 2, 12, 11), ('$', 'END', 2, 13, 12)]
+    assert errors == []
+
+
+def test_seek_to_a_token_end_resumes_the_stream():
+    text = 'int x;\n  x == 12; /* c */ y\n\tz'
+    tokens, _ = lexed(text)
+    resumed, _ = lexed(text, (tokens[4][3] + 2, 2))
+    assert resumed == tokens[5:]
+
+
+def all_fields(lexer):
+    tokens = [(token.lexeme, token.type, token.line_number, token.offset, token.column, token.terminal_code)
+              for token in lexer.iter_tokens()]
+    return tokens, [(record.line_number, record.kind, record.text) for record in lexer.diagnostics.records]
+
+
+chunked_text = 'int abc;\n/* a comment\n over lines */ x == 123; // rest\nwhile (x < 9) { x = x + 1; } 3d @ /* open'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7])
+def test_file_object_in_small_chunks(chunk_size):
+    # Every token, comment and error of the text crosses a chunk boundary at one of these sizes.
+    expected = all_fields(Lexer(chunked_text, SymbolTable(), diagnostics=Diagnostics(buffered=True)))
+    lexer = Lexer(io.StringIO(chunked_text), SymbolTable(), chunk_size=chunk_size,
+                  diagnostics=Diagnostics(buffered=True))
+    assert all_fields(lexer) == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7])
+def test_mmap_in_small_chunks(tmp_path, chunk_size):
+    text = chunked_text + ' é'
+    expected = all_fields(Lexer(text, SymbolTable(), diagnostics=Diagnostics(buffered=True)))
+    path = tmp_path / 'input.txt'
+    path.write_bytes(text.encode())
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        lexer = Lexer(mapped, SymbolTable(), chunk_size=chunk_size, diagnostics=Diagnostics(buffered=True))
+        assert all_fields(lexer) == expected
+
+
+def fields(tokens):
+    return [(token.lexeme, token.type, token.line_number, token.offset, token.column, token.terminal_code)
+            for token in tokens]
+
+
+def test_iteration_gives_the_same_stream_as_get_next_token():
+    lexer = Lexer(chunked_text, SymbolTable(), diagnostics=Diagnostics(buffered=True))
+    listed = [lexer.get_next_token()]
+    while listed[-1].type != 'END':
+        listed.append(lexer.get_next_token())
+    iterated = list(Lexer(chunked_text, SymbolTable(), diagnostics=Diagnostics(buffered=True)).iter_tokens())
+    assert fields(iterated) == fields(listed)
+    assert fields(lexer.tokens) == fields(listed)
+
+
+def test_peeked_tokens_are_consumed_in_order():
+    lexer = Lexer(chunked_text, SymbolTable(), max_lookahead=3, diagnostics=Diagnostics(buffered=True))
+    expected = fields(Lexer(chunked_text, SymbolTable(), diagnostics=Diagnostics(buffered=True)).iter_tokens())
+    assert fields([lexer.peek_token(3), lexer.peek_token(1)]) == [expected[2], expected[0]]
+    assert len(lexer.tokens) == 0
+    assert fields(lexer.iter_tokens()) == expected
+    with pytest.raises(ValueError):
+        lexer.peek_token(4)
+
+
+def test_peeked_declarations_reach_the_symbol_table_once_consumed():
+    symbol_table = SymbolTable()
+    lexer = Lexer('int a;', symbol_table, max_lookahead=2, diagnostics=Diagnostics(buffered=True))
+    lexer.get_next_token()
+    symbol_table.is_declaring = True
+    lexer.peek_token(2)
+    assert symbol_table.table == [[]]
+    lexer.get_next_token()
+    assert [symbol.lexeme for symbol in symbol_table.table[-1]] == ['a']
+
+
+def test_nothing_is_retained_without_retention():
+    lexer = Lexer(io.StringIO(chunked_text), SymbolTable(), chunk_size=4, retain_tokens=False,
+                  diagnostics=Diagnostics(buffered=True))
+    streamed = fields(lexer.iter_tokens())
+    assert len(lexer.tokens) == 0 and lexer.tokens.lexemes == []
+    assert streamed == fields(Lexer(chunked_text, SymbolTable(), diagnostics=Diagnostics(buffered=True)).iter_tokens())
+    # Only the chunk being scanned is kept of a streamed source.
+    assert len(lexer.text) < 8
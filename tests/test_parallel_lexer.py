@@ -0,0 +1,38 @@
+# Sepehr Vahedi
+# 99170615
+
+import random
+
+import parallel_lexer
+from diagnostics import Diagnostics
+from parallel_lexer import lex_parallel, lex_serial
+
+pieces = ['int', 'x', 'a1', '12', ' ', '\n', '=', '==', '*', '/', ';', '(', ')', '{', '}', '/*', '*/', '//', '@', '3d']
+
+
+def rows(tokens, diagnostics):
+    return ([(token.lexeme, token.type, token.line_number, token.offset, token.column, token.terminal_code)
+             for token in tokens],
+            [(record.line_number, record.kind, record.text) for record in diagnostics.records])
+
+
+def test_small_input_is_lexed_serially(monkeypatch):
+    def fail(*arguments):
+        raise AssertionError('no process pool for a small input')
+
+    monkeypatch.setattr(parallel_lexer, 'ProcessPoolExecutor', fail)
+    text = 'int x; /* c */ x = 3d @;\n'
+    diagnostics, expected = Diagnostics(buffered=True), Diagnostics(buffered=True)
+    assert rows(lex_parallel(text, workers=8, diagnostics=diagnostics), diagnostics) == \
+        rows(lex_serial(text, expected), expected)
+
+
+def test_forced_parallel_run_matches_serial(monkeypatch):
+    # Chunks of a few characters put chunk boundaries inside tokens, comments and errors.
+    monkeypatch.setattr(parallel_lexer, 'MIN_CHUNK_SIZE', 7)
+    generator = random.Random(8)
+    for _ in range(20):
+        text = ''.join(generator.choice(pieces) for _ in range(generator.randint(0, 60)))
+        diagnostics, expected = Diagnostics(buffered=True), Diagnostics(buffered=True)
+        tokens = lex_parallel(text, workers=2, chunk_count=8, overlap=5, diagnostics=diagnostics, always_parallel=True)
+        assert rows(tokens, diagnostics) == rows(lex_serial(text, expected), expected), repr(text)
@@ -0,0 +1,88 @@
+# Sepehr Vahedi
+# 99170615
+
+import io
+
+import pytest
+from anytree import RenderTree
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from parser import Parser, RecoveryModes
+from intermediate_code_generator.expression_processor import CodeGenerator
+
+
+class NullCodeGenerator:
+    is_erroneous = False
+
+    def code_gen(self, action_symbol, current_token):
+        pass
+
+    def semantic_check(self, check_symbol, current_token):
+        pass
+
+
+def parsed(text, **options):
+    diagnostics = Diagnostics(buffered=True)
+    parser = Parser(Lexer(text, SymbolTable(), diagnostics=diagnostics), NullCodeGenerator(), diagnostics, **options)
+    parser.parse()
+    return parser
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    'int x;\nvoid main(void) { x = 1; output(x); }\n',
+    'int f(int a[]) { return a[0] }\nvoid main(void) { int b[2]; if (b[1] < 2) f(b); else ; endif }\n',
+    'void main(void) { x = = 3; while ( { break; }\n',
+    'int 3 = ; void',
+])
+@pytest.mark.parametrize('recovery', list(RecoveryModes))
+def test_anytree_export_renders_like_the_arena(text, recovery):
+    parser = parsed(text, recovery=recovery)
+    file = io.StringIO()
+    parser.tree.write(file)
+    assert file.getvalue() == ''.join(f'{prefix}{node.name}\n' for prefix, _, node in RenderTree(parser.node))
+    assert parser.node is parser.node
+
+
+def test_deep_tree_is_exported():
+    text = 'int x;\n' * 3000 + 'void main(void) { }\n'
+    # Walked with a stack, as anytree's own iterators recurse once per level.
+    depth = 0
+    stack = [(parsed(text).node, 0)]
+    while stack:
+        node, node_depth = stack.pop()
+        depth = max(depth, node_depth)
+        stack.extend((child, node_depth + 1) for child in node.children)
+    assert depth > 3000
+    assert parsed(text, build_tree=False).node is None
+
+
+def compiled(text, **options):
+    diagnostics = Diagnostics(buffered=True)
+    symbol_table = SymbolTable()
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    parser = Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics, **options)
+    parser.parse()
+    records = [record.to_json() for record in diagnostics.records]
+    return parser, records, [str(code) for code in code_generator.program_block]
+
+
+@pytest.mark.parametrize('text', [
+    'int x;\nvoid main(void) { x = 1; output(x); }\n',
+    'int f(int n) { if (n < 2) return 1; else return n * f(n - 1); endif }\n'
+    'void main(void) { int a[3]; int i; i = 0; while (i < 3) { a[i] = f(i); output(a[i]); i = i + 1; } }\n',
+    'void main(void) { int a; a = 3; @ a = 4; $ output(a); }\n',
+    'void main(void) { int a; b = 2; a = 1; output(a); }\n',
+    'void main(void) { int a; a = 1; output(a) }\n',
+    'void main(void) { int a; a = 1; else; output(a); }\n',
+])
+@pytest.mark.parametrize('recovery', list(RecoveryModes))
+def test_tree_free_parse_gives_the_same_diagnostics_and_code(text, recovery):
+    parser, records, code = compiled(text, recovery=recovery)
+    tree_free_parser, tree_free_records, tree_free_code = compiled(text, recovery=recovery, build_tree=False)
+    assert parser.tree is not None
+    assert tree_free_parser.tree is None and tree_free_parser.node is None
+    assert tree_free_records == records
+    assert tree_free_code == code
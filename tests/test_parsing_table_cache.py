@@ -0,0 +1,29 @@
+# Sepehr Vahedi
+# 99170615
+
+import os
+
+import parser
+
+
+def use_cache(monkeypatch, directory):
+    monkeypatch.setattr(parser, 'cache_directory', str(directory))
+    monkeypatch.setattr(parser, 'parsing_table_path', os.path.join(directory, 'parsing_table.marshal'))
+
+
+def test_table_is_cached_outside_the_source_tree(monkeypatch, tmp_path):
+    use_cache(monkeypatch, tmp_path / 'cache')
+    assert parser.load_parsing_table() == (parser.production_bodies, parser.parsing_table)
+    assert os.listdir(tmp_path / 'cache') == ['parsing_table.marshal']
+    assert parser.load_parsing_table() == (parser.production_bodies, parser.parsing_table)
+    assert not os.path.exists(os.path.join(os.path.dirname(parser.__file__), 'parsing_table.marshal'))
+
+
+def test_failed_cache_write_builds_the_table_in_memory(monkeypatch, tmp_path):
+    def fail(source, destination):
+        raise OSError('read-only cache')
+
+    use_cache(monkeypatch, tmp_path)
+    monkeypatch.setattr(parser.os, 'replace', fail)
+    assert parser.load_parsing_table() == (parser.production_bodies, parser.parsing_table)
+    assert os.listdir(tmp_path) == []
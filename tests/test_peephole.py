@@ -0,0 +1,76 @@
+# Sepehr Vahedi
+# 99170615
+
+from code_listing import listing, text_of
+from optimizer.peephole import peephole
+
+
+def optimized(*body):
+    # main's body, from position 1, between the jump to main and main's return.
+    return text_of(peephole(listing('(JP, L1, , )', *body, '(JP, @500, , )')))[1:-1]
+
+
+def test_self_copy_goes():
+    assert optimized('(ASSIGN, 100, 100, )', '(PRINT, 100, , )') == ['(PRINT, 100, , )']
+
+
+def test_stack_adjustments_in_a_row_become_one():
+    assert optimized('(ADD, 1000, #4, 1000)', '(ADD, 1000, #8, 1000)', '(PRINT, 1000, , )') == \
+        ['(ADD, 1000, #12, 1000)', '(PRINT, 1000, , )']
+    assert optimized('(ADD, 1000, #4, 1000)', '(SUB, 1000, #4, 1000)', '(PRINT, 100, , )') == ['(PRINT, 100, , )']
+
+
+def test_stack_adjustments_around_an_instruction_become_one():
+    assert optimized('(SUB, 1000, #4, 1000)', '(PRINT, 100, , )', '(ADD, 1000, #8, 1000)', '(PRINT, 1000, , )') == \
+        ['(PRINT, 100, , )', '(ADD, 1000, #4, 1000)', '(PRINT, 1000, , )']
+    # Not around an instruction that uses the stack pointer.
+    assert optimized('(SUB, 1000, #4, 1000)', '(PRINT, 1000, , )', '(ADD, 1000, #8, 1000)', '(PRINT, 1000, , )') == \
+        ['(SUB, 1000, #4, 1000)', '(PRINT, 1000, , )', '(ADD, 1000, #8, 1000)', '(PRINT, 1000, , )']
+
+
+def test_push_read_back_becomes_a_copy():
+    assert optimized('(ADD, 1000, #4, 1000)', '(ASSIGN, 100, @1000, )', '(ASSIGN, @1000, 104, )',
+                     '(SUB, 1000, #4, 1000)', '(PRINT, 104, , )') == ['(ASSIGN, 100, 104, )', '(PRINT, 104, , )']
+
+
+def test_push_popped_unread_goes():
+    assert optimized('(ADD, 1000, #4, 1000)', '(ASSIGN, 100, @1000, )', '(SUB, 1000, #4, 1000)',
+                     '(PRINT, 100, , )') == ['(PRINT, 100, , )']
+
+
+def test_temporary_copied_right_away_is_skipped():
+    assert optimized('(ADD, 100, #1, 512)', '(ASSIGN, 512, 104, )', '(PRINT, 104, , )') == \
+        ['(ADD, 100, #1, 104)', '(PRINT, 104, , )']
+    # Not when the temporary is read again later.
+    assert optimized('(ADD, 100, #1, 512)', '(ASSIGN, 512, 104, )', '(PRINT, 512, , )') == \
+        ['(ADD, 100, #1, 512)', '(ASSIGN, 512, 104, )', '(PRINT, 512, , )']
+
+
+def test_copy_to_a_temporary_is_forwarded_to_its_use():
+    assert optimized('(ASSIGN, 100, 512, )', '(PRINT, 104, , )', '(MULT, 512, #2, 104)', '(PRINT, 104, , )') == \
+        ['(PRINT, 104, , )', '(MULT, 100, #2, 104)', '(PRINT, 104, , )']
+    # Not past a write to the copied cell.
+    assert optimized('(ASSIGN, 100, 512, )', '(ASSIGN, #3, 100, )', '(MULT, 512, #2, 104)', '(PRINT, 104, , )') == \
+        ['(ASSIGN, 100, 512, )', '(ASSIGN, #3, 100, )', '(MULT, 512, #2, 104)', '(PRINT, 104, , )']
+
+
+def test_jump_to_a_jump_is_threaded():
+    assert optimized('(JPF, 100, L3, )', '(PRINT, 100, , )', '(JP, L5, , )', '(PRINT, 104, , )',
+                     '(PRINT, 108, , )') == \
+        ['(JPF, 100, L5, )', '(PRINT, 100, , )', '(JP, L5, , )', '(PRINT, 104, , )', '(PRINT, 108, , )']
+
+
+def test_jump_to_the_next_instruction_goes():
+    assert optimized('(JPF, 100, L2, )', '(PRINT, 100, , )') == ['(PRINT, 100, , )']
+    assert optimized('(PRINT, 100, , )', '(JP, L3, , )', '(PRINT, 104, , )') == \
+        ['(PRINT, 100, , )', '(PRINT, 104, , )']
+
+
+def test_no_rewrite_across_a_targeted_label():
+    # The copy at 5 is a jump target, so the ADD before it cannot write 104 in its place.
+    body = ['(JPF, 100, L4, )', '(ADD, 100, #1, 512)', '(JP, L5, , )', '(ADD, 100, #2, 512)',
+            '(ASSIGN, 512, 104, )', '(PRINT, 104, , )']
+    assert optimized(*body) == body
+    # The pop at 2 is a jump target, so the push before it does not cancel out.
+    body = ['(ADD, 1000, #4, 1000)', '(SUB, 1000, #4, 1000)', '(JPF, 100, L2, )', '(PRINT, 1000, , )']
+    assert optimized(*body) == body
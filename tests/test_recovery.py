@@ -0,0 +1,86 @@
+# Sepehr Vahedi
+# 99170615
+
+from functools import partial
+
+import pytest
+
+from symbols import SymbolTable, ActionSymbols
+from diagnostics import Diagnostics, Phases, TooManyErrors
+from lexer import Lexer
+from parser import Parser, RecoveryModes
+from generated_parser import GeneratedParser
+from intermediate_code_generator.expression_processor import CodeGenerator
+
+class NullCodeGenerator:
+    is_erroneous = False
+
+    def code_gen(self, action_symbol, current_token):
+        pass
+
+    def semantic_check(self, check_symbol, current_token):
+        pass
+
+
+fact = 'int fact(int n) {\n  if (n < 2) return 1; else return n * fact(n - 1); endif\n}\n' \
+       'void main(void) {\n  output(fact(5));\n}\n'
+
+
+# Mistyped programs after whose syntax errors recovery leaves the semantic stacks out of step with the input.
+@pytest.mark.parametrize('text', [
+    fact.replace('n < 2', 'n f 1'),
+    fact.replace('(int n)', '(int return n'),
+    fact.replace('fact(5)', 'fact(5'),
+    fact.replace('n * fact', 'n * * fact'),
+    'void main(void) {\n  int a;\n  x = y = @ ;\n  while (a < ) output(a);\n}\n',
+    'int foo(int x {\n  int y;\n  y = x +* 2;\n  return y\n}\nvoid main(void) {\n  int a;\n  a = foo(3;\n}\n',
+])
+@pytest.mark.parametrize('parser_class', [partial(Parser, recovery=RecoveryModes.TOKEN),
+                                          partial(Parser, recovery=RecoveryModes.PANIC), GeneratedParser])
+def test_syntax_errors_end_in_diagnostics(text, parser_class):
+    symbol_table, diagnostics = SymbolTable(), Diagnostics(buffered=True)
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    parser_class(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    assert diagnostics.count(Phases.SYNTAX)
+    if code_generator.is_stalled:
+        assert code_generator.is_erroneous and code_generator.program_block == []
+
+
+def compiled(text):
+    symbol_table, diagnostics = SymbolTable(), Diagnostics(buffered=True)
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    return code_generator, [(record.phase, record.line_number) for record in diagnostics.records]
+
+
+def test_checks_go_on_after_a_repaired_syntax_error():
+    code_generator, records = compiled('void main(void) {\n  int a;\n  b = 1;\n  if (a f 1) a = 2; endif\n'
+                                       '  c = 3;\n}\n')
+    assert not code_generator.is_stalled
+    assert records == [(Phases.SEMANTIC, 3), (Phases.SYNTAX, 4), (Phases.SYNTAX, 4), (Phases.SEMANTIC, 5)]
+
+
+def test_nothing_is_checked_after_a_stall():
+    code_generator, records = compiled('void main(void) {\n  int a;\n  x = @ ;\n  y = 1;\n  a = ;\n}\n')
+    assert code_generator.is_stalled and code_generator.program_block == []
+    assert (Phases.SEMANTIC, 3) in records and (Phases.SEMANTIC, 4) not in records
+
+
+def test_failing_action_without_a_syntax_error_is_raised():
+    code_generator = CodeGenerator(SymbolTable(), Diagnostics(buffered=True))
+    token = Lexer('+', SymbolTable()).get_next_token()
+    with pytest.raises(IndexError):
+        code_generator.code_gen(ActionSymbols.OPERATION, token)
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3])
+def test_error_budget_and_max_errors_stop_at_the_same_error(limit):
+    text = 'void main(void) {\n  int a;\n  a = 1 1;\n  a = 2 2;\n  a = 3 3;\n  a = 4 4;\n}\n'
+    diagnostics = Diagnostics(buffered=True)
+    Parser(Lexer(text, SymbolTable(), diagnostics=diagnostics), NullCodeGenerator(), diagnostics,
+           error_budget=limit).parse()
+    capped = Diagnostics(max_errors=limit, buffered=True)
+    with pytest.raises(TooManyErrors):
+        Parser(Lexer(text, SymbolTable(), diagnostics=capped), NullCodeGenerator(), capped).parse()
+    assert [record.line_number for record in diagnostics.records] == \
+        [record.line_number for record in capped.records] == [3, 4, 5][:limit]
@@ -0,0 +1,54 @@
+# Sepehr Vahedi
+# 99170615
+
+import random
+
+import pytest
+
+from symbols import SymbolTable, dollar_code
+from diagnostics import Diagnostics
+from lexer import Lexer
+from regex_lexer import RegexLexer
+
+error_cases = ['3d', 'x = 12a;', 'a@', '=@', '*@', '/@', '@', 'x = 1 */ y', '*/', 'int a#b;', '12@3', '==@', 'a\x00b']
+comment_cases = ['/* c */ x', '/* multi\nline\n*/ x\ny', '// line\nx', 'x // line', '/**/x', '/***/x', '/* * / **/ x',
+                 'a/b', 'a//b\nc', 'a/ *b', '/* unclosed', 'x /* unclosed\nover lines', '/*/ x', '// a /* b\nc */']
+end_cases = ['', ' ', '\n\n\n', 'x', 'x\n', 'x   \n\n', 'x // end', 'x /* end */', 'x /* end */\n', 'if', 'x==',
+             '12', 'x\r\n\ty\f\v']
+# Pieces that random inputs are made of, chosen to hit every state of the DFA and the boundaries between them.
+pieces = ['int', 'x', 'a1', '12', '0', ' ', '\n', '\t', '=', '==', '*', '/', '+', '-', '<', ';', ',', '(', ')', '[',
+          ']', '{', '}', ':', '/*', '*/', '//', '@', '#', '3d', 'endif', 'return', '!', '\r']
+
+
+def lexed(backend, text):
+    # Every field of every token up to END, and the errors reported on the way.
+    diagnostics = Diagnostics(buffered=True)
+    lexer = backend(text, SymbolTable(), diagnostics=diagnostics)
+    tokens = []
+    while True:
+        token = lexer.get_next_token()
+        tokens.append((token.lexeme, token.type, token.line_number, token.offset, token.column, token.terminal_code))
+        if token.type == 'END':
+            break
+    errors = [(record.phase, record.line_number, record.kind, record.text) for record in diagnostics.records]
+    return tokens, errors
+
+
+@pytest.mark.parametrize('text', error_cases + comment_cases + end_cases)
+def test_regex_lexer_matches_dfa(text):
+    assert lexed(RegexLexer, text) == lexed(Lexer, text)
+
+
+def test_regex_lexer_matches_dfa_on_random_inputs():
+    generator = random.Random(4)
+    for _ in range(2000):
+        text = ''.join(generator.choice(pieces) for _ in range(generator.randint(0, 30)))
+        assert lexed(RegexLexer, text) == lexed(Lexer, text), repr(text)
+
+
+def test_end_token_position():
+    # END sits at the end of the text. Newlines inside a comment are not counted as lines, but columns still start
+    # after the last newline.
+    tokens, errors = lexed(RegexLexer, 'x\n  /* c\n */  ')
+    assert tokens[-1] == ('$', 'END', 2, 14, 6, dollar_code)
+    assert errors == []
@@ -0,0 +1,89 @@
+# Sepehr Vahedi
+# 99170615
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from symbols import SymbolTable
+from diagnostics import Diagnostics
+from lexer import Lexer
+from parser import Parser
+from intermediate_code_generator.expression_processor import CodeGenerator
+from intermediate_code_generator.instructions import stack_pointer, first_temporary, word_size
+from optimizer.constants import propagate_constants
+from optimizer.deadcode import remove_dead_code
+from optimizer.peephole import peephole
+from optimizer.temporaries import TemporaryAllocator, temporary_cell_count
+from code_listing import listing
+from interpreter import run
+
+programs = [
+    # Temporaries of nested loops, one of them live from the outer loop across the whole inner one.
+    'void main(void) {\n  int i; int j; int s;\n  i = 0; s = 0;\n  while (i < 4) {\n    j = 0;\n'
+    '    while (j < 3) { s = s + (i + 1) * (j + 2) - (i - j) * (i + j); j = j + 1; }\n'
+    '    output(s * 2 + (i + j) * (s - i));\n    i = i + 1;\n  }\n}\n',
+    # Temporaries live across calls, into functions that use temporaries of their own and call each other.
+    'int sq(int v) { return v * v + 0 * v; }\nint f(int a, int b) { return sq(a + b) - sq(a - b) + a * b; }\n'
+    'void main(void) {\n  int a; int b;\n  a = 3; b = 5;\n'
+    '  output(a * b + f(a + 1, b * 2) * (a - b) + sq(f(b, a) + a));\n'
+    '  while (a < 6) { output((a + b) * f(a, sq(b - a)) - (b - a) * sq(a)); a = a + 1; }\n}\n',
+    # Recursion, where a temporary of one activation must survive the activations it calls.
+    'int fib(int n) {\n  if (n < 2) return n; else return fib(n - 1) + fib(n - 2) * 1 + 0 * n; endif\n}\n'
+    'int fact(int n) { if (n < 2) return 1; else return n * fact(n - 1); endif }\n'
+    'void main(void) {\n  int i;\n  i = 0;\n  while (i < 8) { output(fib(i) * 100 + fact(i) - i * (fib(i) + 1)); '
+    'i = i + 1; }\n}\n',
+    # Arrays, whose element addresses are temporaries used as pointers.
+    'int g[6];\nint sum(int a[], int n) {\n  int i; int s;\n  i = 0; s = 0;\n'
+    '  while (i < n) { s = s + a[i] * (i + 1); i = i + 1; }\n  return s;\n}\n'
+    'void main(void) {\n  int x[4]; int k;\n  k = 0;\n  while (k < 6) { g[k] = k * k + 1; if (k < 4) x[k] = g[k] - k; '
+    'else ; endif k = k + 1; }\n  output(sum(g, 6) + sum(x, 4) * x[3] - g[x[1] + 1]);\n}\n',
+]
+
+
+def compiled(text):
+    diagnostics = Diagnostics(buffered=True)
+    symbol_table = SymbolTable()
+    code_generator = CodeGenerator(symbol_table, diagnostics)
+    Parser(Lexer(text, symbol_table, diagnostics=diagnostics), code_generator, diagnostics).parse()
+    assert not diagnostics.records
+    return code_generator
+
+
+@pytest.mark.parametrize('text', programs)
+def test_reused_temporaries_print_what_the_unoptimized_code_prints(text):
+    expected = run(compiled(text).program_block)
+    assert expected
+
+    allocator = TemporaryAllocator()
+    code_generator = compiled(text)
+    code_generator.optimize(allocator.allocate)
+    assert run(code_generator.program_block) == expected
+    assert allocator.cells_after < allocator.cells_before
+
+    allocator = TemporaryAllocator()
+    code_generator = compiled(text)
+    code_generator.optimize(propagate_constants, remove_dead_code, peephole, allocator.allocate)
+    assert run(code_generator.program_block) == expected
+    assert temporary_cell_count(code_generator.program_block) == allocator.cells_after < \
+        temporary_cell_count(compiled(text).program_block)
+
+
+def test_temporaries_past_the_stack_are_reused_without_being_asked(tmp_path):
+    # A sum of 300 terms needs more temporaries than fit below the stack at 1000.
+    text = 'int f(int a) { return a + 1; }\nvoid main(void) {\n  int a;\n  a = 2;\n' \
+           f'  output({" + ".join(["a * f(a)"] * 150)});\n  output(f(a));\n}}\n'
+    assert compiled(text).builder.temporary_counter > stack_pointer.value
+    (tmp_path / 'input.txt').write_text(text)
+    result = subprocess.run([sys.executable, os.path.abspath('compiler.py'), '--report-temporaries'], cwd=tmp_path,
+                            capture_output=True, text=True)
+    assert result.returncode == 0 and result.stdout == ''
+    before, after = [int(word) for word in result.stderr.replace(',', ' ').split() if word.isdigit()]
+    assert after < before and after < (stack_pointer.value - first_temporary) // word_size.value
+
+    lines = (tmp_path / 'output.txt').read_text().splitlines()
+    code = listing(*[line.split('\t')[1] for line in lines])
+    assert temporary_cell_count(code) == after
+    assert run(code) == [150 * 2 * 3, 3]
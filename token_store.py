@@ -0,0 +1,98 @@
+# Sepehr Vahedi
+# 99170615
+
+from array import array
+from bisect import bisect_right
+
+token_type_names = ['KEYWORD', 'ID', 'NUM', 'SYMBOL', 'END']
+token_type_codes = {name: code for code, name in enumerate(token_type_names)}
+
+
+class Token:
+    __slots__ = ('lexeme', 'type', 'line_number', 'offset', 'column', 'terminal_code')
+
+    def __init__(self, value, token_type, line_number, offset=None, column=None, terminal_code=None):
+        # `terminal_code` is the index of the token's terminal in `symbols.Terminals` (`symbols.terminal_codes`).
+        self.lexeme = value
+        self.type = token_type
+        self.line_number = line_number
+        self.offset = offset
+        self.column = column
+        self.terminal_code = terminal_code
+
+
+class TokenStore:
+    # Keeps every token as one row of parallel integer columns, 14 bytes a row. Lexemes are interned in `lexemes`, so
+    # a token only stores the index of its lexeme, and columns are not stored: `line_starts` holds the offset where
+    # each line with a token starts, in ascending order, and a token's column is its distance from the last of them
+    # at or before its offset. `Token` objects are created on access as views of a row.
+    def __init__(self):
+        self.type_codes = array('b')
+        self.offsets = array('i')
+        self.lexeme_ids = array('i')
+        self.line_numbers = array('i')
+        self.terminal_codes = array('b')
+        self.line_starts = array('i')
+        self.lexemes = []
+        self.__lexeme_ids = {}
+
+    def __add_line_start(self, line_start):
+        if not self.line_starts or line_start > self.line_starts[-1]:
+            self.line_starts.append(line_start)
+
+    def append(self, token: Token):
+        lexeme_id = self.__lexeme_ids.get(token.lexeme)
+        if lexeme_id is None:
+            lexeme_id = self.__lexeme_ids[token.lexeme] = len(self.lexemes)
+            self.lexemes.append(token.lexeme)
+        self.type_codes.append(token_type_codes[token.type])
+        self.offsets.append(-1 if token.offset is None else token.offset)
+        self.lexeme_ids.append(lexeme_id)
+        self.line_numbers.append(token.line_number)
+        self.terminal_codes.append(-1 if token.terminal_code is None else token.terminal_code)
+        if token.offset is not None and token.column is not None:
+            self.__add_line_start(token.offset - token.column + 1)
+
+    def extend(self, other: 'TokenStore', start: int = 0, offset_shift: int = 0, line_shift: int = 0,
+               first_line_start: int = None):
+        # Appends the rows of `other` from `start` on, moved by `offset_shift` characters and `line_shift` lines.
+        # `first_line_start` is where the line that `other` starts in really starts, when `other` was lexed from
+        # the middle of it.
+        lexeme_ids = [self.__lexeme_ids.get(lexeme) for lexeme in other.lexemes]
+        for lexeme_id, lexeme in enumerate(other.lexemes):
+            if lexeme_ids[lexeme_id] is None:
+                lexeme_ids[lexeme_id] = self.__lexeme_ids[lexeme] = len(self.lexemes)
+                self.lexemes.append(lexeme)
+        self.type_codes.extend(other.type_codes[start:])
+        self.offsets.extend(map(offset_shift.__add__, other.offsets[start:]))
+        self.lexeme_ids.extend(map(lexeme_ids.__getitem__, other.lexeme_ids[start:]))
+        self.line_numbers.extend(map(line_shift.__add__, other.line_numbers[start:]))
+        self.terminal_codes.extend(other.terminal_codes[start:])
+        for line_start in other.line_starts:
+            if line_start == 0 and first_line_start is not None:
+                self.__add_line_start(first_line_start)
+            else:
+                self.__add_line_start(line_start + offset_shift)
+
+    def column(self, index):
+        offset = self.offsets[index]
+        line = bisect_right(self.line_starts, offset) - 1
+        if offset < 0 or line < 0:
+            return None
+        return offset - self.line_starts[line] + 1
+
+    def __len__(self):
+        return len(self.type_codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        offset = self.offsets[index]
+        terminal_code = self.terminal_codes[index]
+        return Token(self.lexemes[self.lexeme_ids[index]], token_type_names[self.type_codes[index]],
+                     self.line_numbers[index], None if offset < 0 else offset, self.column(index),
+                     None if terminal_code < 0 else terminal_code)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]